@@ -0,0 +1,207 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds: 1ms growing by 25% per bucket up to ~10 minutes
+BUCKET_BOUNDS = []
+_bound = 0.001
+while _bound < 600:
+    BUCKET_BOUNDS.append(_bound)
+    _bound *= 1.25
+BUCKET_BOUNDS.append(float('inf'))
+
+# Order in which stages are reported
+STAGE_ORDER = [
+    'navigate', 'settle', 'content_extraction', 'static_detect',
+    'dynamic_detect', 'network_detect', 'persist', 'company_total'
+]
+
+class LatencyHistogram:
+    """Fixed log-bucket histogram: constant memory however long the run is."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(BUCKET_BOUNDS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.bucket_counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct):
+        """Approximate percentile (seconds), interpolated inside the matching bucket."""
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        cumulative = 0
+        for position, bucket_count in enumerate(self.bucket_counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = BUCKET_BOUNDS[position - 1] if position else 0.0
+                upper = min(BUCKET_BOUNDS[position], self.max)
+                fraction = (rank - cumulative) / bucket_count
+                return min(lower + (upper - lower) * fraction, self.max)
+            cumulative += bucket_count
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max
+        }
+
+class StageMetrics:
+    """Metrics sink for per-company stage timings plus run counters and gauges."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.gauge_callbacks = {}  # name -> function, only evaluated when scraped
+        self.info = {}
+
+    def increment(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def add_gauge(self, name, amount):
+        self.gauges[name] = self.gauges.get(name, 0) + amount
+
+    def observe(self, stage, seconds):
+        if stage not in self.histograms:
+            self.histograms[stage] = LatencyHistogram()
+        self.histograms[stage].observe(seconds)
+
+    def record_company(self, timings):
+        """Record one company's stage totals (seconds summed over all its pages)."""
+        for stage, seconds in timings.items():
+            self.observe(stage, seconds)
+
+    def ordered_stages(self):
+        known = [stage for stage in STAGE_ORDER if stage in self.histograms]
+        return known + sorted(stage for stage in self.histograms if stage not in STAGE_ORDER)
+
+    def summary(self):
+        """Stage -> count/mean/p50/p95/p99/max (seconds)."""
+        return {stage: self.histograms[stage].summary() for stage in self.ordered_stages()}
+
+    def current_gauges(self):
+        gauges = dict(self.gauges)
+        for name, callback in list(self.gauge_callbacks.items()):
+            try:
+                gauges[name] = callback()
+            except Exception:
+                continue
+        return gauges
+
+    def snapshot(self):
+        """Everything as one JSON-serializable dict."""
+        return {
+            'timestamp': time.time(),
+            'info': dict(self.info),
+            'counters': dict(self.counters),
+            'gauges': self.current_gauges(),
+            'stages': self.summary()
+        }
+
+    def prometheus_text(self, prefix='analyzer'):
+        """Prometheus text exposition format (counters, gauges, stage histograms)."""
+        lines = []
+        if self.info:
+            labels = ','.join(f'{key}="{value}"' for key, value in self.info.items())
+            lines += [f"# TYPE {prefix}_info gauge", f"{prefix}_info{{{labels}}} 1"]
+        for name, value in sorted(self.counters.items()):
+            lines += [f"# TYPE {prefix}_{name} counter", f"{prefix}_{name} {value}"]
+        for name, value in sorted(self.current_gauges().items()):
+            lines += [f"# TYPE {prefix}_{name} gauge", f"{prefix}_{name} {value}"]
+
+        lines.append(f"# TYPE {prefix}_stage_seconds histogram")
+        for stage, histogram in list(self.histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKET_BOUNDS, list(histogram.bucket_counts)):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else f"{bound:.6g}"
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {histogram.total}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def format_table(self):
+        """Text table of stage percentiles for the dashboard and final report."""
+        lines = [f"   {'stage':<20}{'n':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'mean':>10}"]
+        for stage, stats in self.summary().items():
+            lines.append(
+                f"   {stage:<20}{stats['count']:>8}{stats['p50']:>9.3f}s{stats['p95']:>9.3f}s"
+                f"{stats['p99']:>9.3f}s{stats['mean']:>9.3f}s"
+            )
+        return "\n".join(lines)
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """/metrics -> Prometheus text, /metrics.json (or /) -> JSON snapshot."""
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/metrics':
+            body = self.server.metrics.prometheus_text().encode()
+            content_type = 'text/plain; version=0.0.4'
+        elif path in ('/', '/metrics.json'):
+            body = json.dumps(self.server.metrics.snapshot(), default=str).encode()
+            content_type = 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(metrics, port, host='127.0.0.1'):
+    """Serve metrics from a daemon thread; the hot path only updates plain counters.
+    
+    Returns:
+        ThreadingHTTPServer: Call shutdown() to stop serving
+    """
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    server.daemon_threads = True
+    server.metrics = metrics
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def process_tree_rss_mb():
+    """RSS of this process plus all children (Playwright driver and browsers) in MB."""
+    import psutil
+    process = psutil.Process()
+    rss = 0
+    for proc in [process] + process.children(recursive=True):
+        try:
+            rss += proc.memory_info().rss
+        except psutil.Error:
+            continue
+    return rss / 1024**2
+
+@contextmanager
+def stage_timer(timings, stage):
+    """Add the time spent in the block to timings[stage] (no-op when timings is None)."""
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
@@ -1,13 +1,29 @@
 import pandas as pd
 import sys
 from collections import Counter
+from table_io import read_table
 
-def analyze_airtable_duplicates(airtable_csv_path):
+def normalized_ids(df, id_column):
+    """
+    Stripped string ID per row, with null/empty IDs dropped (index = row labels)
+    
+    Args:
+        df (pd.DataFrame): Dataset containing the ID column
+        id_column (str): Name of the ID column
+    
+    Returns:
+        pd.Series: Normalized IDs indexed like df
+    """
+    ids = df[id_column].dropna().astype(str).str.strip()
+    return ids[ids != '']
+
+def analyze_airtable_duplicates(airtable_csv_path, df_airtable=None):
     """
     Task 1: Analyze Airtable CSV for duplicate Apollo Lead IDs
     
     Args:
         airtable_csv_path (str): Path to the Airtable CSV export
+        df_airtable (pd.DataFrame): Already-loaded Airtable export (skips re-reading the CSV)
     
     Returns:
         tuple: (duplicate_ids, duplicate_report)
@@ -16,7 +32,8 @@ def analyze_airtable_duplicates(airtable_csv_path):
     
     try:
         # Read the Airtable CSV
-        df_airtable = pd.read_csv(airtable_csv_path)
+        if df_airtable is None:
+            df_airtable = read_table(airtable_csv_path)
         print(f"Loaded Airtable CSV with {len(df_airtable)} records")
         
         # Check if apollo_lead_id column exists
@@ -26,13 +43,12 @@ def analyze_airtable_duplicates(airtable_csv_path):
             return None, None
         
         # Remove rows where apollo_lead_id is null/empty
-        df_clean = df_airtable.dropna(subset=['apollo_lead_id'])
-        df_clean = df_clean[df_clean['apollo_lead_id'].astype(str).str.strip() != '']
+        airtable_ids = normalized_ids(df_airtable, 'apollo_lead_id')
         
-        print(f"Records with valid Apollo Lead IDs: {len(df_clean)}")
+        print(f"Records with valid Apollo Lead IDs: {len(airtable_ids)}")
         
         # Find duplicates
-        apollo_id_counts = df_clean['apollo_lead_id'].value_counts()
+        apollo_id_counts = airtable_ids.value_counts()
         duplicates = apollo_id_counts[apollo_id_counts > 1]
         
         if len(duplicates) == 0:
@@ -45,9 +61,13 @@ def analyze_airtable_duplicates(airtable_csv_path):
         duplicate_report = []
         duplicate_ids = []
         
+        # One groupby over the duplicated IDs instead of a full-table scan per ID
+        duplicated_ids = airtable_ids[airtable_ids.isin(duplicates.index)]
+        rows_by_id = duplicated_ids.groupby(duplicated_ids, sort=False).groups
+        
         for apollo_id, count in duplicates.items():
             duplicate_ids.append(apollo_id)
-            duplicate_rows = df_clean[df_clean['apollo_lead_id'] == apollo_id]
+            duplicate_rows = df_airtable.loc[rows_by_id[apollo_id]]
             
             print(f"\nDuplicate Apollo Lead ID: {apollo_id} (appears {count} times)")
             duplicate_report.append(f"Apollo Lead ID: {apollo_id} - {count} occurrences")
@@ -66,13 +86,15 @@ def analyze_airtable_duplicates(airtable_csv_path):
         print(f"Error analyzing Airtable duplicates: {e}")
         return None, None
 
-def compare_apollo_datasets(airtable_csv_path, apollo_csv_path):
+def compare_apollo_datasets(airtable_csv_path, apollo_csv_path, df_airtable=None, df_apollo=None):
     """
     Task 2: Compare Airtable and Apollo datasets to find missing records
     
     Args:
         airtable_csv_path (str): Path to the Airtable CSV export
         apollo_csv_path (str): Path to the Apollo CSV export
+        df_airtable (pd.DataFrame): Already-loaded Airtable export (skips re-reading the CSV)
+        df_apollo (pd.DataFrame): Already-loaded Apollo export (skips re-reading the CSV)
     
     Returns:
         tuple: (missing_ids, comparison_report)
@@ -81,8 +103,10 @@ def compare_apollo_datasets(airtable_csv_path, apollo_csv_path):
     
     try:
         # Read both CSV files
-        df_airtable = pd.read_csv(airtable_csv_path)
-        df_apollo = pd.read_csv(apollo_csv_path)
+        if df_airtable is None:
+            df_airtable = read_table(airtable_csv_path)
+        if df_apollo is None:
+            df_apollo = read_table(apollo_csv_path)
         
         print(f"Airtable records: {len(df_airtable)}")
         print(f"Apollo records: {len(df_apollo)}")
@@ -98,12 +122,9 @@ def compare_apollo_datasets(airtable_csv_path, apollo_csv_path):
             return None, None
         
         # Get clean sets of IDs
-        airtable_ids = set(df_airtable.dropna(subset=['apollo_lead_id'])['apollo_lead_id'].astype(str).str.strip())
-        apollo_ids = set(df_apollo.dropna(subset=['id'])['id'].astype(str).str.strip())
-        
-        # Remove empty strings
-        airtable_ids = {id for id in airtable_ids if id != ''}
-        apollo_ids = {id for id in apollo_ids if id != ''}
+        airtable_ids = set(normalized_ids(df_airtable, 'apollo_lead_id'))
+        apollo_id_column = normalized_ids(df_apollo, 'id')
+        apollo_ids = set(apollo_id_column)
         
         print(f"Valid Airtable Apollo Lead IDs: {len(airtable_ids)}")
         print(f"Valid Apollo IDs: {len(apollo_ids)}")
@@ -130,13 +151,17 @@ def compare_apollo_datasets(airtable_csv_path, apollo_csv_path):
             print(f"\n🚨 MISSING APOLLO LEAD IDs (not in Airtable):")
             comparison_report.append("\nMissing Apollo Lead IDs:")
             
+            # Hash index on the Apollo ID: one lookup per missing ID instead of a scan
+            first_row_by_id = apollo_id_column.drop_duplicates()
+            row_by_id = pd.Series(first_row_by_id.index, index=first_row_by_id.values)
+            
             for missing_id in sorted(missing_in_airtable):
                 # Find details from Apollo CSV
-                apollo_record = df_apollo[df_apollo['id'] == missing_id]
-                if not apollo_record.empty:
-                    name = apollo_record.iloc[0].get('name', 'N/A')
-                    email = apollo_record.iloc[0].get('email', 'N/A')
-                    title = apollo_record.iloc[0].get('title', 'N/A')
+                if missing_id in row_by_id.index:
+                    apollo_record = df_apollo.loc[row_by_id[missing_id]]
+                    name = apollo_record.get('name', 'N/A')
+                    email = apollo_record.get('email', 'N/A')
+                    title = apollo_record.get('title', 'N/A')
                     print(f"  {missing_id} - {name} | {email} | {title}")
                     comparison_report.append(f"  {missing_id} - {name} | {email} | {title}")
                 else:
@@ -200,6 +225,13 @@ def save_results_to_file(duplicate_ids, duplicate_report, missing_ids, compariso
     except Exception as e:
         print(f"Error saving results: {e}")
 
+def load_table_or_none(path):
+    """Loaded table, or None when the file is missing or unreadable."""
+    try:
+        return read_table(path)
+    except Exception:
+        return None
+
 def main():
     """Main function to run both analysis tasks"""
     print("🚀 APOLLO LEAD DATA ANALYZER")
@@ -218,11 +250,16 @@ def main():
     airtable_csv = sys.argv[1]
     apollo_csv = sys.argv[2]
     
+    # Load each dataset once; both tasks share the loaded frames. A file that
+    # fails to load is left to the tasks, which report the error themselves.
+    df_airtable = load_table_or_none(airtable_csv)
+    df_apollo = load_table_or_none(apollo_csv)
+    
     # Task 1: Check for duplicates in Airtable
-    duplicate_ids, duplicate_report = analyze_airtable_duplicates(airtable_csv)
+    duplicate_ids, duplicate_report = analyze_airtable_duplicates(airtable_csv, df_airtable)
     
     # Task 2: Compare datasets to find missing records
-    missing_ids, comparison_report = compare_apollo_datasets(airtable_csv, apollo_csv)
+    missing_ids, comparison_report = compare_apollo_datasets(airtable_csv, apollo_csv, df_airtable, df_apollo)
     
     # Save results to files
     save_results_to_file(duplicate_ids, duplicate_report, missing_ids, comparison_report)
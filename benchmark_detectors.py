@@ -0,0 +1,185 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import time
+from datetime import datetime
+
+from continuous_analyzer import ContinuousTourOperatorAnalyzer
+from chatbot_classifier import ChatbotClassifier
+from page_document import PageDocument
+from benchmark_site_farm import generate_sites, render_page
+
+# Page size classes reported separately (upper bound in bytes of HTML)
+SIZE_CLASSES = [('small (<50KB)', 50 * 1024), ('medium (50-500KB)', 500 * 1024), ('large (>500KB)', float('inf'))]
+
+def detector_suite(analyzer, classifier):
+    """Name -> callable(html, text, url) for every CPU-only detector being measured.
+
+    Detectors that read a PageDocument get a fresh one per call, so each
+    timing includes building the views it uses.
+    """
+    return {
+        'analyze_page_content': lambda html, text, url: analyzer.analyze_page_content(html, text, url),
+        '_detect_unknown_chatbot': lambda html, text, url: analyzer._detect_unknown_chatbot(PageDocument(html, text, url)),
+        '_detect_unknown_booking_system': lambda html, text, url: analyzer._detect_unknown_booking_system(PageDocument(html, text, url)),
+        '_detect_unknown_ota_integration': lambda html, text, url: analyzer._detect_unknown_ota_integration(PageDocument(html, text, url)),
+        '_has_chat_ui_elements': lambda html, text, url: analyzer._has_chat_ui_elements(PageDocument(html, text, url)),
+        '_has_booking_widgets': lambda html, text, url: analyzer._has_booking_widgets(PageDocument(html, text, url)),
+        '_count_external_booking_links': lambda html, text, url: analyzer._count_external_booking_links(PageDocument(html, text, url)),
+        'ChatbotClassifier.classify_content': lambda html, text, url: classifier.classify_content(html, text)
+    }
+
+def html_to_text(html_content):
+    """Rough visible text for synthetic pages (stands in for innerText)."""
+    without_scripts = re.sub(r'<(script|style)[^>]*>.*?</\1>', ' ', html_content, flags=re.S | re.I)
+    return re.sub(r'\s+', ' ', re.sub(r'<[^>]+>', ' ', without_scripts)).strip()
+
+def synthetic_corpus(count, seed=7):
+    """Generate (key, html, text) pages with the site farm generator, stretched across size classes."""
+    rng = random.Random(seed)
+    pages = []
+    for site in generate_sites(count, seed):
+        # Spread pages over small, medium and large documents
+        site['filler_paragraphs'] = rng.choice([5, 40, 400, 4000])
+        html_content = render_page(site, '/', random.Random(site['slug'])).decode()
+        pages.append((site['slug'], html_content, html_to_text(html_content)))
+    return pages
+
+def load_corpus(corpus_path):
+    """Load (key, html, text) pages from a ChatbotClassifier page store (directory, .zip or .tar)."""
+    classifier = ChatbotClassifier()
+    index = classifier.index_stored_pages(corpus_path)
+    jobs = sorted(index.items())
+    return [(key, html_content, text_content) for key, html_content, text_content in classifier.read_stored_pages(corpus_path, jobs)]
+
+def size_class(html_content):
+    size = len(html_content.encode('utf-8'))
+    for name, upper in SIZE_CLASSES:
+        if size < upper:
+            return name
+    return SIZE_CLASSES[-1][0]
+
+def time_detector(detector, pages, repeats):
+    """Best-of-repeats seconds per page for one detector."""
+    best = [float('inf')] * len(pages)
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            for position, (key, html_content, text_content) in enumerate(pages):
+                url = f"https://{key}.example.com"
+                start = time.perf_counter()
+                detector(html_content, text_content, url)
+                best[position] = min(best[position], time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best
+
+def summarize(seconds, page_bytes):
+    total_seconds = sum(seconds)
+    total_bytes = sum(page_bytes)
+    return {
+        'pages': len(seconds),
+        'us_per_page': total_seconds / len(seconds) * 1e6 if seconds else None,
+        'mb_per_s': total_bytes / 1024**2 / total_seconds if total_seconds else None
+    }
+
+def run_benchmark(pages, repeats=3, only=None):
+    """Time every detector over the corpus, overall and per page size class."""
+    suite = detector_suite(ContinuousTourOperatorAnalyzer(), ChatbotClassifier())
+    if only:
+        suite = {name: detector for name, detector in suite.items() if name in only}
+
+    page_bytes = [len(html_content.encode('utf-8')) + len(text_content.encode('utf-8')) for _, html_content, text_content in pages]
+    classes = [size_class(html_content) for _, html_content, _ in pages]
+
+    results = {}
+    for name, detector in suite.items():
+        seconds = time_detector(detector, pages, repeats)
+        results[name] = {'overall': summarize(seconds, page_bytes), 'by_size': {}}
+        for class_name, _ in SIZE_CLASSES:
+            members = [position for position, page_class in enumerate(classes) if page_class == class_name]
+            if members:
+                results[name]['by_size'][class_name] = summarize(
+                    [seconds[position] for position in members], [page_bytes[position] for position in members]
+                )
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results, baseline=None):
+    """Print a detector table, with change vs a previous run when given."""
+    print("\n" + "="*96)
+    print("🔬 DETECTOR MICRO-BENCHMARK")
+    print("="*96)
+    header = f"   {'detector':<36}{'µs/page':>12}{'MB/s':>10}"
+    if baseline:
+        header += f"{'baseline µs':>14}{'change':>10}"
+    print(header)
+
+    for name, result in results.items():
+        overall = result['overall']
+        line = f"   {name:<36}{overall['us_per_page']:>12.1f}{overall['mb_per_s']:>10.1f}"
+        previous = (baseline or {}).get(name, {}).get('overall')
+        if previous and previous.get('us_per_page'):
+            change = (overall['us_per_page'] / previous['us_per_page'] - 1) * 100
+            line += f"{previous['us_per_page']:>14.1f}{change:>+9.1f}%"
+        print(line)
+
+    print(f"\n📏 BY PAGE SIZE (µs/page):")
+    for name, result in results.items():
+        by_size = ' | '.join(f"{class_name}: {stats['us_per_page']:.0f}" for class_name, stats in result['by_size'].items())
+        print(f"   {name:<36}{by_size}")
+    print("="*96)
+
+def main():
+    """Run the detector micro-benchmark."""
+    parser = argparse.ArgumentParser(description="CPU-only benchmark of the page content detectors")
+    parser.add_argument('--corpus', help="Page store (directory/.zip/.tar of <key>.html + <key>.txt); default: synthetic pages")
+    parser.add_argument('--synthetic-pages', type=int, default=200, help="Synthetic pages when no corpus is given")
+    parser.add_argument('--repeats', type=int, default=3, help="Runs per page (best time is kept)")
+    parser.add_argument('--only', nargs='*', help="Only these detectors")
+    parser.add_argument('--compare', help="Previous results JSON to compare against")
+    parser.add_argument('--output', default=None, help="Results JSON (default: detector_benchmark_<timestamp>.json)")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.synthetic_pages)
+    corpus_bytes = sum(len(html_content.encode('utf-8')) + len(text_content.encode('utf-8')) for _, html_content, text_content in pages)
+    print(f"📂 Corpus: {len(pages)} pages, {corpus_bytes / 1024**2:.1f} MB ({args.corpus or 'synthetic'})")
+
+    results = run_benchmark(pages, args.repeats, args.only)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    print_results(results, baseline)
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'corpus': {'source': args.corpus or f'synthetic:{args.synthetic_pages}', 'pages': len(pages), 'bytes': corpus_bytes},
+        'repeats': args.repeats,
+        'results': results
+    }
+    output = args.output or f"detector_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"📁 Results saved to: {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from analyzer_metrics import process_tree_rss_mb
+from continuous_analyzer import ContinuousTourOperatorAnalyzer
+from dns_prefilter import DnsPrefilter, StubResolver
+
+try:
+    import psutil
+except ImportError:
+    # Memory figures are skipped without psutil
+    psutil = None
+
+# Share of generated sites per feature (the rest have none of them)
+BOOKING_MIX = [('fareharbor', 0.25), ('bokun', 0.15)]
+CHAT_MIX = [('intercom', 0.15), ('tawk', 0.15)]
+OTA_MIX = [('viator', 0.30), ('getyourguide', 0.20)]
+BEHAVIOR_MIX = [('slow', 0.08), ('error_500', 0.03), ('reset', 0.02)]
+
+BOOKING_SNIPPETS = {
+    'fareharbor': (
+        '<script async src="https://fareharbor.com/embeds/api/v1/?autolightframe=yes"></script>'
+        '<a href="https://fareharbor.com/embeds/book/{slug}/items/?full-items=yes" class="fh-button">Book now</a>'
+    ),
+    'bokun': (
+        '<script async src="https://widgets.bokun.io/assets/javascripts/apps/build/BokunWidgetsLoader.js'
+        '?bookingChannelUUID={slug}"></script><div class="bokunWidget" data-src="https://widgets.bokun.io/online-sales/{slug}"></div>'
+    )
+}
+CHAT_SNIPPETS = {
+    'intercom': '<script>window.intercomSettings = {{app_id: "{slug}"}};</script><script async src="https://widget.intercom.io/widget/{slug}"></script>',
+    'tawk': '<script async src="https://embed.tawk.to/{slug}/default"></script>'
+}
+OTA_SNIPPETS = {
+    'viator': '<a href="https://www.viator.com/tours/{slug}/d123-{slug}">Also on Viator</a>',
+    'getyourguide': '<a href="https://www.getyourguide.com/{slug}-l1/">Tickets on GetYourGuide</a>'
+}
+
+FILLER_SENTENCES = [
+    "Join our small-group walking tour through the historic old town.",
+    "Our local guides share stories you will not find in any guidebook.",
+    "Tours run daily from April to October, weather permitting.",
+    "Private departures are available for families and corporate groups.",
+    "Meet at the fountain in the main square ten minutes before departure.",
+    "All tours include tastings of regional specialities.",
+]
+
+def pick(rng, mix):
+    """Pick one option from a [(name, share)] mix, or None."""
+    roll = rng.random()
+    for name, share in mix:
+        if roll < share:
+            return name
+        roll -= share
+    return None
+
+def generate_sites(count, seed=42):
+    """Generate the site farm spec: one dict per synthetic tour operator."""
+    rng = random.Random(seed)
+    sites = []
+    for number in range(count):
+        slug = f"operator{number:05d}"
+        sites.append({
+            'host': f"{slug}.localhost",
+            'slug': slug,
+            'booking': pick(rng, BOOKING_MIX),
+            'chat': pick(rng, CHAT_MIX),
+            'ota': pick(rng, OTA_MIX),
+            'behavior': pick(rng, BEHAVIOR_MIX) or 'ok',
+            'delay': rng.uniform(2, 8),
+            'filler_paragraphs': int(rng.lognormvariate(3, 1)),  # long tail of heavy pages
+            'subpages': rng.sample(['/tours', '/contact', '/about', '/booking'], rng.randint(1, 4))
+        })
+    return sites
+
+def render_page(site, path, rng):
+    """HTML for one page of a synthetic site."""
+    slug = site['slug']
+    nav = ''.join(f'<a href="{subpage}">{subpage.strip("/").title()}</a>' for subpage in site['subpages'])
+    head = [f"<title>{slug} tours</title>"]
+    body = [f"<nav class=\"menu\">{nav}</nav>", f"<h1>{slug.title()} Tours</h1>"]
+
+    if site['booking']:
+        body.append(BOOKING_SNIPPETS[site['booking']].format(slug=slug))
+    if site['chat']:
+        body.append(CHAT_SNIPPETS[site['chat']].format(slug=slug))
+    if site['ota']:
+        body.append(OTA_SNIPPETS[site['ota']].format(slug=slug))
+    if path == '/contact':
+        body.append('<form action="/contact" method="post"><input name="email"><textarea name="message"></textarea></form>')
+
+    paragraphs = site['filler_paragraphs'] if path == '/' else max(1, site['filler_paragraphs'] // 4)
+    for _ in range(paragraphs):
+        body.append(f"<p>{' '.join(rng.choice(FILLER_SENTENCES) for _ in range(6))}</p>")
+
+    return f"<!DOCTYPE html><html><head>{''.join(head)}</head><body>{''.join(body)}</body></html>".encode()
+
+class SiteFarmHandler(BaseHTTPRequestHandler):
+    """Serves every synthetic site from one port, dispatching on the Host header."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.serve_page(send_body=True)
+
+    def do_HEAD(self):
+        self.serve_page(send_body=False)
+
+    def serve_page(self, send_body):
+        host = (self.headers.get('Host') or '').split(':')[0]
+        site = self.server.sites_by_host.get(host)
+        path = self.path.split('?')[0].rstrip('/') or '/'
+
+        if site is None:
+            self.send_error(404)
+            return
+        if site['behavior'] == 'reset':
+            self.close_connection = True
+            self.connection.close()
+            return
+        if site['behavior'] == 'slow':
+            time.sleep(site['delay'])
+        if site['behavior'] == 'error_500':
+            self.send_error(500)
+            return
+        if path != '/' and path not in site['subpages']:
+            self.send_error(404)
+            return
+
+        body = render_page(site, path, random.Random(f"{host}{path}"))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class SiteFarmServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Browsers giving up on slow sites mid-response is part of the benchmark
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+def start_site_farm(sites, port=0):
+    """Start the farm in a background thread; returns the server (server.server_port is the port).
+    
+    Sites are served as http://operatorNNNNN.localhost:<port>/ - Chromium resolves
+    *.localhost to the loopback address, so no DNS or hosts file changes are needed.
+    """
+    server = SiteFarmServer(('127.0.0.1', port), SiteFarmHandler)
+    server.sites_by_host = {site['host']: site for site in sites}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+async def sample_memory(stop_event, samples, interval=0.5):
+    """Sample RSS of this process plus all children (Playwright driver and browsers) in MB."""
+    if psutil is None:
+        return
+    while not stop_event.is_set():
+        samples.append(process_tree_rss_mb())
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+def score_detection(results, sites):
+    """Compare analyzer output with the farm's ground truth."""
+    truth = pd.DataFrame(sites).set_index('host')
+    results = results.copy()
+    results['host'] = results['Website URL'].str.extract(r'//([^:/]+)')[0]
+    merged = results.set_index('host').join(truth, how='inner')
+    served = merged[merged['behavior'].isin(['ok', 'slow'])]
+
+    detected_chat = served['has_chatbot'].astype(str) == 'True'
+    expected_chat = served['chat'].notna()
+    booking_detail = served['booking_technology_detailed'].fillna('').astype(str)
+    ota_detail = served['ota_dependencies_detailed'].fillna('').astype(str)
+
+    def recall(expected, detail):
+        mask = expected.notna()
+        if not mask.any():
+            return None
+        hits = [name in text for name, text in zip(expected[mask], detail[mask])]
+        return sum(hits) / len(hits)
+
+    return {
+        'sites_scored': int(len(served)),
+        'chatbot_accuracy': float((detected_chat == expected_chat).mean()) if len(served) else None,
+        'chatbot_false_positive_rate': float(detected_chat[~expected_chat].mean()) if (~expected_chat).any() else None,
+        'chatbot_recall': float(detected_chat[expected_chat].mean()) if expected_chat.any() else None,
+        'booking_platform_recall': recall(served['booking'], booking_detail),
+        'ota_recall': recall(served['ota'], ota_detail)
+    }
+
+async def run_benchmark(site_count, seed, concurrency, batch_size, timeout_ms, max_pages, work_dir, extraction_mode='targeted'):
+    """Generate the farm, drive continuous_process against it and collect the report."""
+    sites = generate_sites(site_count, seed)
+    server = start_site_farm(sites)
+    port = server.server_port
+
+    input_csv = os.path.join(work_dir, 'farm_input.csv')
+    output_csv = os.path.join(work_dir, 'farm_output.csv')
+    pd.DataFrame({
+        'Company Name': [site['slug'] for site in sites],
+        'Website URL': [f"http://{site['host']}:{port}/" for site in sites]
+    }).to_csv(input_csv, index=False)
+
+    analyzer = ContinuousTourOperatorAnalyzer(extraction_mode=extraction_mode)
+    # The system resolver may not know *.localhost (Chromium resolves it itself)
+    analyzer.dns_prefilter = DnsPrefilter(resolver=StubResolver(), cache_file=None, canary_hosts=(),
+                                          metrics=analyzer.metrics)
+    for settings in (analyzer.aggressive_settings, analyzer.conservative_settings, analyzer.patient_settings):
+        settings.update({'delay_between_batches': 0, 'timeout': timeout_ms, 'max_pages_per_site': max_pages})
+    analyzer.aggressive_settings.update({'concurrency': concurrency, 'batch_size': batch_size})
+
+    memory_samples = []
+    stop_event = asyncio.Event()
+    sampler = asyncio.create_task(sample_memory(stop_event, memory_samples))
+
+    # Backups, logs and summaries from the run land in work_dir
+    original_dir = os.getcwd()
+    os.chdir(work_dir)
+    start = time.perf_counter()
+    try:
+        await analyzer.continuous_process(input_csv, output_csv)
+    finally:
+        elapsed = time.perf_counter() - start
+        os.chdir(original_dir)
+        stop_event.set()
+        await sampler
+        server.shutdown()
+
+    results = pd.read_csv(output_csv)
+    company_latency = analyzer.metrics.summary().get('company_total', {})
+    pages_analyzed = int(pd.to_numeric(results['pages_analyzed'], errors='coerce').fillna(0).sum())
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'sites': site_count,
+        'seed': seed,
+        'settings': {'concurrency': concurrency, 'batch_size': batch_size, 'timeout_ms': timeout_ms, 'max_pages_per_site': max_pages,
+                     'extraction_mode': extraction_mode},
+        'behavior_mix': pd.Series([site['behavior'] for site in sites]).value_counts().to_dict(),
+        'elapsed_seconds': elapsed,
+        'pages_analyzed': pages_analyzed,
+        'companies_per_minute': site_count / elapsed * 60 if elapsed else None,
+        'pages_per_minute': pages_analyzed / elapsed * 60 if elapsed else None,
+        'company_latency_seconds': company_latency,
+        'stage_timings_seconds': analyzer.metrics.summary(),
+        'peak_rss_mb': max(memory_samples) if memory_samples else None,
+        'mean_rss_mb': sum(memory_samples) / len(memory_samples) if memory_samples else None,
+        'status_counts': results['analysis_status'].value_counts().to_dict(),
+        'detection': score_detection(results, sites)
+    }
+
+def print_report(report):
+    """Print a benchmark report."""
+    print("\n" + "="*80)
+    print("🏁 SITE FARM THROUGHPUT BENCHMARK")
+    print("="*80)
+    print(f"🌐 Sites: {report['sites']:,} | Behaviors: {report['behavior_mix']}")
+    print(f"⚙️  Settings: {report['settings']}")
+    print(f"⏱️  Elapsed: {report['elapsed_seconds']:.1f}s")
+    print(f"📈 Throughput: {report['companies_per_minute']:.1f} companies/min | {report['pages_per_minute']:.1f} pages/min")
+
+    latency = report['company_latency_seconds']
+    if latency:
+        print(f"⏳ Company latency: p50 {latency['p50']:.2f}s | p95 {latency['p95']:.2f}s | p99 {latency['p99']:.2f}s")
+    if report['peak_rss_mb'] is not None:
+        print(f"🧠 Memory: peak {report['peak_rss_mb']:.0f} MB | mean {report['mean_rss_mb']:.0f} MB (process + browsers)")
+
+    print(f"\n🎯 DETECTION ACCURACY:")
+    for name, value in report['detection'].items():
+        print(f"   {name}: {value if value is None or isinstance(value, int) else f'{value*100:.1f}%'}")
+    print("="*80)
+
+def main():
+    """Run the offline throughput benchmark."""
+    parser = argparse.ArgumentParser(description="Offline throughput benchmark for ContinuousTourOperatorAnalyzer")
+    parser.add_argument('--sites', type=int, default=1000, help="Number of synthetic operator sites")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for the site mix")
+    parser.add_argument('--concurrency', type=int, default=45, help="Parallel sites (aggressive phase)")
+    parser.add_argument('--batch-size', type=int, default=80, help="Companies per batch (aggressive phase)")
+    parser.add_argument('--timeout', type=int, default=15000, help="Navigation timeout in ms")
+    parser.add_argument('--max-pages', type=int, default=3, help="Pages per site")
+    parser.add_argument('--extraction', choices=('targeted', 'full'), default='targeted', help="Page extraction mode")
+    parser.add_argument('--work-dir', default='benchmark_runs', help="Directory for CSVs, backups and logs")
+    parser.add_argument('--output', default=None, help="Report JSON (default: <work-dir>/site_farm_<timestamp>.json)")
+    args = parser.parse_args()
+
+    work_dir = os.path.abspath(args.work_dir)
+    os.makedirs(work_dir, exist_ok=True)
+
+    report = asyncio.run(run_benchmark(
+        args.sites, args.seed, args.concurrency, args.batch_size, args.timeout, args.max_pages, work_dir, args.extraction
+    ))
+    print_report(report)
+
+    output = args.output or os.path.join(work_dir, f"site_farm_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"📁 Report saved to: {output}")
+
+if __name__ == "__main__":
+    main()
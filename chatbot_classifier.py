@@ -1,10 +1,20 @@
 import asyncio
 import re
+import os
+import tarfile
+import zipfile
 import pandas as pd
 from urllib.parse import urljoin, urlparse
-from playwright.async_api import async_playwright
+from concurrent.futures import ProcessPoolExecutor
 import logging
 from datetime import datetime
+from table_io import read_table, write_table
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    # Offline classification of stored pages does not need a browser
+    async_playwright = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -14,6 +24,8 @@ class ChatbotClassifier:
     def __init__(self):
         self.timeout = 45000
         self.concurrency = 30
+        self.confidence_threshold = 0.1  # 10% of a type's indicators must match
+        self.page_store_dir = None  # Set to save fetched pages for offline re-classification
         
         # Advanced chatbot classification patterns
         self.chatbot_types = {
@@ -77,7 +89,7 @@ class ChatbotClassifier:
             'adventure finder', 'trip planner', 'experience matcher'
         ]
 
-    async def classify_chatbot_type(self, page, url):
+    async def classify_chatbot_type(self, page, url, store_key=None):
         """Classify the type of chatbot/chat solution."""
         try:
             await page.goto(url, timeout=self.timeout, wait_until='domcontentloaded')
@@ -86,123 +98,157 @@ class ChatbotClassifier:
             # Get page content
             html_content = await page.content()
             text_content = await page.evaluate('document.body.innerText || ""')
-            combined_content = (html_content + " " + text_content).lower()
             
-            classification = {
-                'chatbot_type': 'unknown',
-                'priority_level': 'UNKNOWN',
+            if self.page_store_dir:
+                self.store_page_content(store_key or url, html_content, text_content)
+            
+            return self.classify_content(html_content, text_content)
+            
+        except Exception as e:
+            logger.warning(f"Error classifying {url}: {e}")
+            return {
+                'chatbot_type': 'error',
+                'priority_level': 'ERROR',
                 'features_found': [],
                 'competitive_threat': 'UNKNOWN',
                 'still_prospect': False,
-                'reasoning': []
+                'reasoning': [f"Analysis failed: {str(e)[:100]}"]
             }
+
+    def classify_content(self, html_content, text_content):
+        """Classify chatbot type from already-fetched page content (no browser needed)."""
+        combined_content = (html_content + " " + text_content).lower()
+        
+        classification = {
+            'chatbot_type': 'unknown',
+            'priority_level': 'UNKNOWN',
+            'features_found': [],
+            'competitive_threat': 'UNKNOWN',
+            'still_prospect': False,
+            'reasoning': []
+        }
+        
+        # Check for gamification (your competitive advantage)
+        has_gamification = any(feature in combined_content for feature in self.gamification_features)
+        
+        # Classify chatbot type
+        detected_types = []
+        
+        for chatbot_type, config in self.chatbot_types.items():
+            # Check patterns
+            pattern_matches = sum(1 for pattern in config['patterns'] if pattern in combined_content)
             
-            # Check for gamification (your competitive advantage)
-            has_gamification = any(feature in combined_content for feature in self.gamification_features)
-            
-            # Classify chatbot type
-            detected_types = []
+            # Check services
+            service_matches = sum(1 for service in config['services'] if service in combined_content)
             
-            for chatbot_type, config in self.chatbot_types.items():
-                # Check patterns
-                pattern_matches = sum(1 for pattern in config['patterns'] if pattern in combined_content)
-                
-                # Check services
-                service_matches = sum(1 for service in config['services'] if service in combined_content)
+            # Calculate confidence
+            total_indicators = len(config['patterns']) + len(config['services'])
+            if total_indicators > 0:
+                confidence = (pattern_matches + service_matches * 2) / total_indicators
                 
-                # Calculate confidence
-                total_indicators = len(config['patterns']) + len(config['services'])
-                if total_indicators > 0:
-                    confidence = (pattern_matches + service_matches * 2) / total_indicators
-                    
-                    if confidence > 0.1:  # 10% threshold
-                        detected_types.append({
-                            'type': chatbot_type,
-                            'confidence': confidence,
-                            'priority': config['priority'],
-                            'pattern_matches': pattern_matches,
-                            'service_matches': service_matches
-                        })
+                if confidence > self.confidence_threshold:
+                    detected_types.append({
+                        'type': chatbot_type,
+                        'confidence': confidence,
+                        'priority': config['priority'],
+                        'pattern_matches': pattern_matches,
+                        'service_matches': service_matches
+                    })
+        
+        # Determine primary type
+        if detected_types:
+            # Sort by confidence
+            detected_types.sort(key=lambda x: x['confidence'], reverse=True)
+            primary_type = detected_types[0]
             
-            # Determine primary type
-            if detected_types:
-                # Sort by confidence
-                detected_types.sort(key=lambda x: x['confidence'], reverse=True)
-                primary_type = detected_types[0]
-                
-                classification['chatbot_type'] = primary_type['type']
-                classification['priority_level'] = primary_type['priority']
-                classification['features_found'] = [t['type'] for t in detected_types[:3]]
-                
-                # Determine if still a prospect
-                if primary_type['priority'] in ['LOW_COMPETITION', 'NO_COMPETITION']:
-                    classification['still_prospect'] = True
-                    classification['competitive_threat'] = 'LOW'
-                    classification['reasoning'].append(f"Has {primary_type['type']} - not competitive with AI gamified chatbot")
-                
-                elif primary_type['priority'] == 'MEDIUM_COMPETITION' and not has_gamification:
-                    classification['still_prospect'] = True
-                    classification['competitive_threat'] = 'MEDIUM'
-                    classification['reasoning'].append("Has live agent chat but no gamification - still opportunity")
-                
-                elif primary_type['priority'] == 'HIGH_COMPETITION':
-                    classification['still_prospect'] = False
-                    classification['competitive_threat'] = 'HIGH'
-                    classification['reasoning'].append("Has advanced AI chatbot - strong competition")
-                
-                else:
-                    classification['competitive_threat'] = 'MEDIUM'
+            classification['chatbot_type'] = primary_type['type']
+            classification['priority_level'] = primary_type['priority']
+            classification['features_found'] = [t['type'] for t in detected_types[:3]]
             
-            # Special case: Check for advanced features
-            advanced_features = [
-                'natural language processing', 'machine learning', 'ai powered',
-                'intelligent responses', 'contextual chat', 'conversational ai'
-            ]
+            # Determine if still a prospect
+            if primary_type['priority'] in ['LOW_COMPETITION', 'NO_COMPETITION']:
+                classification['still_prospect'] = True
+                classification['competitive_threat'] = 'LOW'
+                classification['reasoning'].append(f"Has {primary_type['type']} - not competitive with AI gamified chatbot")
             
-            if any(feature in combined_content for feature in advanced_features):
-                classification['still_prospect'] = False
-                classification['competitive_threat'] = 'HIGH'
-                classification['reasoning'].append("Has advanced AI features")
+            elif primary_type['priority'] == 'MEDIUM_COMPETITION' and not has_gamification:
+                classification['still_prospect'] = True
+                classification['competitive_threat'] = 'MEDIUM'
+                classification['reasoning'].append("Has live agent chat but no gamification - still opportunity")
             
-            # Final gamification check
-            if has_gamification:
+            elif primary_type['priority'] == 'HIGH_COMPETITION':
                 classification['still_prospect'] = False
                 classification['competitive_threat'] = 'HIGH'
-                classification['reasoning'].append("Already has gamified experience")
-            
-            return classification
+                classification['reasoning'].append("Has advanced AI chatbot - strong competition")
             
-        except Exception as e:
-            logger.warning(f"Error classifying {url}: {e}")
-            return {
-                'chatbot_type': 'error',
-                'priority_level': 'ERROR',
-                'features_found': [],
-                'competitive_threat': 'UNKNOWN',
-                'still_prospect': False,
-                'reasoning': [f"Analysis failed: {str(e)[:100]}"]
-            }
+            else:
+                classification['competitive_threat'] = 'MEDIUM'
+        
+        # Special case: Check for advanced features
+        advanced_features = [
+            'natural language processing', 'machine learning', 'ai powered',
+            'intelligent responses', 'contextual chat', 'conversational ai'
+        ]
+        
+        if any(feature in combined_content for feature in advanced_features):
+            classification['still_prospect'] = False
+            classification['competitive_threat'] = 'HIGH'
+            classification['reasoning'].append("Has advanced AI features")
+        
+        # Final gamification check
+        if has_gamification:
+            classification['still_prospect'] = False
+            classification['competitive_threat'] = 'HIGH'
+            classification['reasoning'].append("Already has gamified experience")
+        
+        return classification
+
+    def select_chatbot_companies(self, df):
+        """Filter rows flagged as having a chatbot and add the classification columns."""
+        print(f"\n🔍 CSV ANALYSIS")
+        print(f"📊 Total companies in CSV: {len(df)}")
+        print(f"📋 Has chatbot column values: {df['has_chatbot'].value_counts().to_dict()}")
+        
+        # More flexible filtering for companies with chatbots
+        chatbot_companies = df[
+            (df['has_chatbot'] == 'True') | 
+            (df['has_chatbot'] == True) | 
+            (df['has_chatbot'] == 'Yes') |
+            (df['has_chatbot'] == 'true') |
+            (df['has_chatbot'] == 1)
+        ].copy()
+        
+        print(f"\n🔍 CHATBOT CLASSIFICATION ANALYSIS")
+        print(f"📊 Total companies with 'chatbots': {len(chatbot_companies)}")
+        
+        # Add new classification columns
+        new_columns = [
+            'chatbot_type', 'priority_level', 'features_found', 
+            'competitive_threat', 'still_prospect', 'classification_reasoning',
+            'reclassified_date'
+        ]
+        
+        for col in new_columns:
+            if col not in chatbot_companies.columns:
+                chatbot_companies[col] = pd.NA
+        
+        return chatbot_companies
+
+    def apply_classification(self, chatbot_companies, index, classification):
+        """Write one classification result into the companies dataframe."""
+        chatbot_companies.loc[index, 'chatbot_type'] = classification['chatbot_type']
+        chatbot_companies.loc[index, 'priority_level'] = classification['priority_level']
+        chatbot_companies.loc[index, 'features_found'] = '; '.join(classification['features_found'])
+        chatbot_companies.loc[index, 'competitive_threat'] = classification['competitive_threat']
+        chatbot_companies.loc[index, 'still_prospect'] = 'True' if classification['still_prospect'] else 'False'
+        chatbot_companies.loc[index, 'classification_reasoning'] = '; '.join(classification['reasoning'])
+        chatbot_companies.loc[index, 'reclassified_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
     async def process_chatbot_companies(self, input_csv, output_csv, batch_size=50):
         """Process companies that were flagged as having chatbots."""
         try:
-            df = pd.read_csv(input_csv)
-            
-            print(f"\n🔍 CSV ANALYSIS")
-            print(f"📊 Total companies in CSV: {len(df)}")
-            print(f"📋 Has chatbot column values: {df['has_chatbot'].value_counts().to_dict()}")
-            
-            # More flexible filtering for companies with chatbots
-            chatbot_companies = df[
-                (df['has_chatbot'] == 'True') | 
-                (df['has_chatbot'] == True) | 
-                (df['has_chatbot'] == 'Yes') |
-                (df['has_chatbot'] == 'true') |
-                (df['has_chatbot'] == 1)
-            ].copy()
-            
-            print(f"\n🔍 CHATBOT CLASSIFICATION ANALYSIS")
-            print(f"📊 Total companies with 'chatbots': {len(chatbot_companies)}")
+            df = read_table(input_csv, bool_as_str=True)
+            chatbot_companies = self.select_chatbot_companies(df)
             
             if len(chatbot_companies) == 0:
                 print("❌ No companies with chatbots found!")
@@ -211,17 +257,6 @@ class ChatbotClassifier:
             
             print(f"🎯 Starting detailed classification...")
             
-            # Add new classification columns
-            new_columns = [
-                'chatbot_type', 'priority_level', 'features_found', 
-                'competitive_threat', 'still_prospect', 'classification_reasoning',
-                'reclassified_date'
-            ]
-            
-            for col in new_columns:
-                if col not in chatbot_companies.columns:
-                    chatbot_companies[col] = pd.NA
-            
             # Find URL column
             url_columns = ['Website URL', 'website url', 'url', 'domain', 'website', 'company_url', 'site', 'Website', 'URL', 'Domain']
             url_column = None
@@ -242,16 +277,10 @@ class ChatbotClassifier:
             async def classify_with_semaphore(browser, index, company_name, url):
                 async with semaphore:
                     try:
-                        classification = await self.classify_chatbot_type_with_browser(browser, url)
+                        classification = await self.classify_chatbot_type_with_browser(browser, url, store_key=company_name)
                         
                         # Update dataframe
-                        chatbot_companies.loc[index, 'chatbot_type'] = classification['chatbot_type']
-                        chatbot_companies.loc[index, 'priority_level'] = classification['priority_level']
-                        chatbot_companies.loc[index, 'features_found'] = '; '.join(classification['features_found'])
-                        chatbot_companies.loc[index, 'competitive_threat'] = classification['competitive_threat']
-                        chatbot_companies.loc[index, 'still_prospect'] = 'True' if classification['still_prospect'] else 'False'
-                        chatbot_companies.loc[index, 'classification_reasoning'] = '; '.join(classification['reasoning'])
-                        chatbot_companies.loc[index, 'reclassified_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                        self.apply_classification(chatbot_companies, index, classification)
                         
                         prospect_status = "✅ STILL PROSPECT" if classification['still_prospect'] else "❌ NOT PROSPECT"
                         logger.info(f"📋 {company_name}: {classification['chatbot_type']} | {prospect_status}")
@@ -283,7 +312,7 @@ class ChatbotClassifier:
                         await asyncio.gather(*tasks)
                     
                     # Save progress
-                    chatbot_companies.to_csv(output_csv, index=False)
+                    write_table(chatbot_companies, output_csv)
                     
                     # Update unprocessed list
                     unprocessed = chatbot_companies[chatbot_companies['chatbot_type'].isna()].index.tolist()
@@ -301,17 +330,123 @@ class ChatbotClassifier:
             import traceback
             traceback.print_exc()
 
-    async def classify_chatbot_type_with_browser(self, browser, url):
+    async def classify_chatbot_type_with_browser(self, browser, url, store_key=None):
         """Classify chatbot type using browser instance."""
         context = await browser.new_context()
         page = await context.new_page()
         
         try:
-            result = await self.classify_chatbot_type(page, url)
+            result = await self.classify_chatbot_type(page, url, store_key=store_key)
             return result
         finally:
             await context.close()
 
+    def page_storage_key(self, company_name):
+        """Filename-safe key used to store and look up a company's page content."""
+        return re.sub(r'[^a-z0-9]+', '_', str(company_name).lower()).strip('_')
+
+    def store_page_content(self, company_name, html_content, text_content):
+        """Save fetched page content as <key>.html / <key>.txt for offline classification."""
+        os.makedirs(self.page_store_dir, exist_ok=True)
+        key = self.page_storage_key(company_name)
+        with open(os.path.join(self.page_store_dir, f"{key}.html"), 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        with open(os.path.join(self.page_store_dir, f"{key}.txt"), 'w', encoding='utf-8') as f:
+            f.write(text_content)
+
+    def index_stored_pages(self, pages_source):
+        """Map company keys to the .html/.txt entries of a directory or .zip/.tar archive."""
+        if os.path.isdir(pages_source):
+            names = [
+                os.path.relpath(os.path.join(root, name), pages_source)
+                for root, _, files in os.walk(pages_source) for name in files
+            ]
+        elif zipfile.is_zipfile(pages_source):
+            with zipfile.ZipFile(pages_source) as archive:
+                names = archive.namelist()
+        elif tarfile.is_tarfile(pages_source):
+            with tarfile.open(pages_source) as archive:
+                names = [member.name for member in archive.getmembers() if member.isfile()]
+        else:
+            raise ValueError(f"Not a directory or .zip/.tar archive: {pages_source}")
+        
+        index = {}
+        for name in names:
+            stem, ext = os.path.splitext(os.path.basename(name))
+            ext = ext.lower()
+            if ext in ('.html', '.htm'):
+                index.setdefault(self.page_storage_key(stem), {})['html'] = name
+            elif ext == '.txt':
+                index.setdefault(self.page_storage_key(stem), {})['txt'] = name
+        
+        return index
+
+    def read_stored_pages(self, pages_source, jobs):
+        """Yield (index, html, text) for (index, entry) jobs, opening the source only once."""
+        if os.path.isdir(pages_source):
+            def read(name):
+                with open(os.path.join(pages_source, name), encoding='utf-8', errors='ignore') as f:
+                    return f.read()
+            archive = None
+        elif zipfile.is_zipfile(pages_source):
+            archive = zipfile.ZipFile(pages_source)
+            read = lambda name: archive.read(name).decode('utf-8', errors='ignore')
+        else:
+            archive = tarfile.open(pages_source)
+            read = lambda name: archive.extractfile(name).read().decode('utf-8', errors='ignore')
+        
+        try:
+            for index, entry in jobs:
+                html_content = read(entry['html']) if 'html' in entry else ''
+                text_content = read(entry['txt']) if 'txt' in entry else ''
+                yield index, html_content, text_content
+        finally:
+            if archive is not None:
+                archive.close()
+
+    def classify_stored_pages(self, pages_source, input_csv, output_csv, workers=None, window_size=500):
+        """Classify stored page content across a process pool - no browser involved."""
+        df = read_table(input_csv, bool_as_str=True)
+        chatbot_companies = self.select_chatbot_companies(df)
+        
+        if len(chatbot_companies) == 0:
+            print("❌ No companies with chatbots found!")
+            return chatbot_companies
+        
+        stored_pages = self.index_stored_pages(pages_source)
+        print(f"📂 Stored pages found: {len(stored_pages)} companies in {pages_source}")
+        
+        jobs = []
+        missing = 0
+        for index, company_name in chatbot_companies.get('Company Name', pd.Series(dtype=object)).items():
+            entry = stored_pages.get(self.page_storage_key(company_name))
+            if entry:
+                jobs.append((index, entry))
+            else:
+                missing += 1
+        
+        print(f"🎯 Classifying {len(jobs)} companies offline ({missing} without stored pages)")
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Feed the pool a window at a time so only window_size pages sit in memory
+            for start in range(0, len(jobs), window_size):
+                window = list(self.read_stored_pages(pages_source, jobs[start:start + window_size]))
+                indices = [index for index, _, _ in window]
+                htmls = [html for _, html, _ in window]
+                texts = [text for _, _, text in window]
+                del window
+                
+                results = executor.map(self.classify_content, htmls, texts, chunksize=max(1, len(htmls) // 32))
+                for index, classification in zip(indices, results):
+                    self.apply_classification(chatbot_companies, index, classification)
+                
+                print(f"🔄 Classified {min(start + window_size, len(jobs))}/{len(jobs)} companies")
+        
+        write_table(chatbot_companies, output_csv)
+        self.generate_classification_report(chatbot_companies, output_csv)
+        
+        return chatbot_companies
+
     def clean_url(self, url):
         """Clean and validate URL."""
         if not url or pd.isna(url):
@@ -364,10 +499,17 @@ def main():
     
     input_csv = input("Enter your analysis results CSV (default: FULL_analysis_results.csv): ").strip() or 'FULL_analysis_results.csv'
     output_csv = input("Enter output filename (default: chatbot_classification_results.csv): ").strip() or 'chatbot_classification_results.csv'
-    batch_size = int(input("Batch size (default: 50): ").strip() or '50')
+    pages_source = input("Stored pages directory/archive for offline mode (leave blank to crawl live): ").strip()
     
     classifier = ChatbotClassifier()
-    asyncio.run(classifier.process_chatbot_companies(input_csv, output_csv, batch_size))
+    
+    if pages_source:
+        workers = input("Worker processes (default: all CPUs): ").strip()
+        classifier.classify_stored_pages(pages_source, input_csv, output_csv, workers=int(workers) if workers else None)
+    else:
+        batch_size = int(input("Batch size (default: 50): ").strip() or '50')
+        classifier.page_store_dir = input("Save fetched pages to directory (optional): ").strip() or None
+        asyncio.run(classifier.process_chatbot_companies(input_csv, output_csv, batch_size))
     
     print(f"\n🎉 Classification complete!")
     print(f"💡 Check '{output_csv}' for detailed chatbot analysis")
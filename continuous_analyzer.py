@@ -1,7 +1,7 @@
 import asyncio
 import re
 import pandas as pd
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 from playwright.async_api import async_playwright
 import logging
 import json
@@ -9,6 +9,15 @@ import time
 from datetime import datetime
 import os
 import sys
+from url_canonicalizer import URL_COLUMN_CANDIDATES, canonical_site_key, find_url_column, group_rows_by_site
+from table_io import read_table, write_table
+from analyzer_metrics import StageMetrics, stage_timer, start_metrics_server, process_tree_rss_mb
+from memory_admission import MemoryAdmission
+from page_extraction import extract_page_signals
+from page_document import PageDocument
+from crawl_frontier import CrawlFrontier, LINK_CANDIDATES_JS, probe_url
+from site_discovery import SiteDiscovery
+from dns_prefilter import DnsPrefilter, NXDOMAIN
 
 # Set up logging
 logging.basicConfig(
@@ -22,7 +31,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class ContinuousTourOperatorAnalyzer:
-    def __init__(self, ram_gb=48):
+    def __init__(self, ram_gb=48, metrics_port=None, extraction_mode='full', prefilter_dns=True):
         # Adaptive settings based on available RAM
         if ram_gb >= 32:
             self.aggressive_settings = {
@@ -134,8 +143,75 @@ class ContinuousTourOperatorAnalyzer:
             'medium_prospects': 0,
             'non_prospects': 0,
             'start_time': None,
-            'phase': 'Aggressive Processing'
+            'phase': 'Aggressive Processing',
+            'shared_site_rows': 0,
+            'dns_failed': 0
         }
+        
+        # Columns written per company
+        self.analysis_columns = [
+            'has_chatbot', 'chatbot_analysis', 'chatbot_types_detailed',
+            'booking_technology_summary', 'booking_technology_detailed', 
+            'ota_analysis', 'ota_dependencies_detailed',
+            'prospect_evaluation', 'pages_analyzed',
+            'has_contact_form', 'has_online_booking', 'external_booking_links',
+            'analysis_confidence', 'last_analyzed', 'analysis_status'
+        ]
+        
+        # Canonical-site grouping: each site is crawled once and fanned out to every row sharing it
+        self.site_followers = {}    # crawled row index -> other row indices on the same site
+        self.follower_indices = set()
+        self.site_keys = {}         # crawled row index -> canonical site key
+        self.resolved_sites = {}    # canonical key (incl. redirect targets) -> row holding the result
+        
+        # Per-stage timing histograms (navigate, settle, detection, persist, ...)
+        self.metrics = StageMetrics()
+        
+        # Optional live /metrics endpoint (Prometheus text + JSON) for long runs
+        self.metrics_port = metrics_port
+        self.metrics_server = None
+        
+        # 'full' (default) uses page.content() + innerText; 'targeted' (opt-in) pulls only detector
+        # signals from the page in one call - much less data, but some verdicts can differ
+        self.extraction_mode = extraction_mode
+        
+        # Resolve all hostnames up front so dead domains never reach the browser
+        self.dns_prefilter = DnsPrefilter(metrics=self.metrics) if prefilter_dns else None
+        
+        # Sitemap/robots.txt page discovery, cached on disk per host
+        self.site_discovery = SiteDiscovery(metrics=self.metrics)
+        
+        # Pause new browser contexts when the process tree nears the machine's RAM
+        self.memory_admission = MemoryAdmission.for_ram(ram_gb, metrics=self.metrics)
+
+    def start_live_metrics(self):
+        """Serve live counters, gauges and stage histograms on localhost when a port is configured."""
+        if not self.metrics_port:
+            return
+        
+        completed = lambda: self.metrics.counters.get('companies_completed_total', 0)
+        failed = lambda: self.metrics.counters.get('companies_failed_total', 0)
+        self.metrics.gauge_callbacks.update({
+            'companies_total': lambda: self.stats['total_companies'],
+            'error_rate': lambda: failed() / (completed() + failed()) if completed() + failed() else 0.0,
+            'high_value_prospects': lambda: self.stats['high_value_prospects'],
+            'process_tree_rss_mb': process_tree_rss_mb
+        })
+        self.metrics.set_gauge('in_flight', 0)
+        self.metrics.set_gauge('queue_depth', 0)
+        
+        self.metrics_server = start_metrics_server(self.metrics, self.metrics_port)
+        logger.info(f"📡 Live metrics on http://127.0.0.1:{self.metrics_server.server_port}/metrics (JSON: /metrics.json)")
+
+    def stop_live_metrics(self):
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+            self.metrics_server.server_close()
+            self.metrics_server = None
+
+    def set_phase(self, phase):
+        self.stats['phase'] = phase
+        self.metrics.info['phase'] = phase
 
     def print_dashboard(self):
         """Print real-time processing dashboard."""
@@ -177,16 +253,20 @@ class ContinuousTourOperatorAnalyzer:
         print(f"✅ Good prospects: {self.stats['good_prospects']}")
         print(f"⚠️  Medium prospects: {self.stats['medium_prospects']}")
         print(f"❌ Non-prospects (have chatbots): {self.stats['non_prospects']}")
+        print(f"🔗 Rows sharing an already-crawled site: {self.stats['shared_site_rows']}")
+        print(f"🌐 Dead domains skipped (DNS): {self.stats['dns_failed']}")
         
         print(f"\n⏰ RUNTIME: {elapsed_str}")
         print(f"🖥️  CURRENT SETTINGS: {self.current_settings['concurrency']} parallel | {self.current_settings['timeout']/1000}s timeout")
+        
+        if self.metrics.histograms:
+            print(f"\n⏱️  STAGE TIMINGS (per company):")
+            print(self.metrics.format_table())
         print("="*80)
 
     def analyze_page_content(self, html_content, page_text, page_url):
         """Analyze page content for chatbots, booking tech, and OTA dependencies."""
-        html_lower = html_content.lower()
-        text_lower = page_text.lower()
-        combined_content = html_lower + " " + text_lower
+        doc = PageDocument(html_content, page_text, page_url)
         
         results = {
             'has_chatbot': False,
@@ -199,7 +279,7 @@ class ContinuousTourOperatorAnalyzer:
         # 1. KNOWN PATTERN DETECTION
         for chatbot_type, patterns in self.chatbot_patterns.items():
             for pattern in patterns:
-                if pattern in combined_content:
+                if doc.contains(pattern):
                     results['has_chatbot'] = True
                     if chatbot_type not in results['chatbot_types']:
                         results['chatbot_types'].append(chatbot_type)
@@ -207,7 +287,7 @@ class ContinuousTourOperatorAnalyzer:
         
         # 2. BEHAVIORAL CHATBOT DETECTION
         if not results['has_chatbot']:
-            chatbot_indicators = self._detect_unknown_chatbot(html_content, page_text)
+            chatbot_indicators = self._detect_unknown_chatbot(doc)
             if chatbot_indicators['likely_chatbot']:
                 results['has_chatbot'] = True
                 results['chatbot_types'].extend(chatbot_indicators['evidence'])
@@ -215,62 +295,64 @@ class ContinuousTourOperatorAnalyzer:
         # 3. KNOWN BOOKING TECHNOLOGY DETECTION
         for booking_type, patterns in self.booking_patterns.items():
             for pattern in patterns:
-                if pattern in combined_content:
+                if doc.contains(pattern):
                     if booking_type not in results['booking_technology']:
                         results['booking_technology'].append(booking_type)
                     break
         
         # 4. BEHAVIORAL BOOKING DETECTION
-        unknown_booking = self._detect_unknown_booking_system(html_content, page_text)
+        unknown_booking = self._detect_unknown_booking_system(doc)
         results['booking_technology'].extend(unknown_booking)
         
         # 5. KNOWN OTA DETECTION
         for ota_type, patterns in self.ota_patterns.items():
             for pattern in patterns:
-                if pattern in combined_content:
+                if doc.contains(pattern):
                     if ota_type not in results['ota_dependencies']:
                         results['ota_dependencies'].append(ota_type)
                     break
         
         # 6. BEHAVIORAL OTA DETECTION
-        unknown_ota = self._detect_unknown_ota_integration(html_content, page_text, page_url)
+        unknown_ota = self._detect_unknown_ota_integration(doc)
         results['ota_dependencies'].extend(unknown_ota)
         
         # Enhanced analysis
         results['analysis_details'] = {
-            'has_online_booking': any(keyword in combined_content for keyword in 
+            'has_online_booking': any(doc.contains(keyword) for keyword in 
                                     ['book online', 'book now', 'reserve now', 'buy tickets', 'purchase']),
-            'has_contact_form': any(keyword in combined_content for keyword in 
+            'has_contact_form': any(doc.contains(keyword) for keyword in 
                                   ['contact form', 'contact us', 'get in touch', 'enquiry']),
-            'mentions_commission': any(keyword in combined_content for keyword in 
+            'mentions_commission': any(doc.contains(keyword) for keyword in 
                                      ['commission', 'booking fee', 'service fee']),
-            'has_live_chat_ui': self._has_chat_ui_elements(html_content),
-            'has_booking_widgets': self._has_booking_widgets(html_content),
-            'external_booking_links': self._count_external_booking_links(html_content, page_url)
+            'has_live_chat_ui': self._has_chat_ui_elements(doc),
+            'has_booking_widgets': self._has_booking_widgets(doc),
+            'external_booking_links': self._count_external_booking_links(doc)
         }
         
         return results
 
-    def _detect_unknown_chatbot(self, html_content, page_text):
+    def _detect_unknown_chatbot(self, doc):
         """Detect chatbots using behavioral analysis."""
         evidence = []
         score = 0
         
-        chat_ui_indicators = [
-            r'class="[^"]*chat[^"]*"', r'class="[^"]*message[^"]*"',
-            r'class="[^"]*widget[^"]*"', r'class="[^"]*bubble[^"]*"',
-            r'id="[^"]*chat[^"]*"', r'id="[^"]*message[^"]*"',
-            r'<div[^>]*chat[^>]*>', r'<iframe[^>]*chat[^>]*>',
-            r'data-[^=]*chat[^=]*=', r'aria-label="[^"]*chat[^"]*"',
-            r'function[^{]*chat[^{]*{', r'\.chat\s*\(',
-            r'chat\s*:', r'chatbot', r'livechat'
+        # Counted from the page's token index: attribute values, tags and inline script bodies
+        index = doc.index
+        script_text = index.script_text
+        chat_ui_counts = [
+            index.count_values('class', 'chat'), index.count_values('class', 'message'),
+            index.count_values('class', 'widget'), index.count_values('class', 'bubble'),
+            index.count_values('id', 'chat'), index.count_values('id', 'message'),
+            index.count_elements('div', 'chat'), index.count_elements('iframe', 'chat'),
+            index.count_data_attributes('chat'), index.count_values('aria-label', 'chat'),
+            len(re.findall(r'function[^{]*chat[^{]*{', script_text)), len(re.findall(r'\.chat\s*\(', script_text)),
+            len(re.findall(r'chat\s*:', script_text)), doc.html_lower.count('chatbot'), doc.html_lower.count('livechat')
         ]
         
-        for pattern in chat_ui_indicators:
-            matches = re.findall(pattern, html_content, re.IGNORECASE)
-            if matches:
-                score += len(matches)
-                evidence.append(f"chat_ui_elements ({len(matches)} found)")
+        for found in chat_ui_counts:
+            if found:
+                score += found
+                evidence.append(f"chat_ui_elements ({found} found)")
         
         chat_text_indicators = [
             'start chat', 'chat with us', 'live chat', 'chat now',
@@ -280,7 +362,7 @@ class ContinuousTourOperatorAnalyzer:
         ]
         
         for indicator in chat_text_indicators:
-            if indicator in page_text.lower():
+            if indicator in doc.text_lower:
                 score += 2
                 evidence.append(f"chat_text: '{indicator}'")
         
@@ -290,19 +372,19 @@ class ContinuousTourOperatorAnalyzer:
             'evidence': evidence if score >= 5 else []
         }
 
-    def _detect_unknown_booking_system(self, html_content, page_text):
+    def _detect_unknown_booking_system(self, doc):
         """Detect booking systems using behavioral analysis."""
         booking_systems = []
         
-        booking_form_patterns = [
-            r'<form[^>]*book[^>]*>', r'<form[^>]*reserv[^>]*>',
-            r'<form[^>]*ticket[^>]*>', r'input[^>]*date[^>]*',
-            r'select[^>]*guest[^>]*>', r'select[^>]*person[^>]*>',
-            r'input[^>]*quantity[^>]*>', r'button[^>]*book[^>]*>'
+        index = doc.index
+        booking_form_counts = [
+            index.count_elements('form', 'book'), index.count_elements('form', 'reserv'),
+            index.count_elements('form', 'ticket'), index.count_elements('input', 'date'),
+            index.count_elements('select', 'guest'), index.count_elements('select', 'person'),
+            index.count_elements('input', 'quantity'), index.count_elements('button', 'book')
         ]
         
-        form_matches = sum(1 for pattern in booking_form_patterns 
-                          if re.search(pattern, html_content, re.IGNORECASE))
+        form_matches = sum(1 for found in booking_form_counts if found)
         
         if form_matches >= 3:
             booking_systems.append('custom_booking_form')
@@ -312,7 +394,7 @@ class ContinuousTourOperatorAnalyzer:
             'flatpickr', 'pikaday', 'datejs', 'moment.js'
         ]
         
-        if any(pattern in html_content.lower() for pattern in calendar_patterns):
+        if any(pattern in doc.html_lower for pattern in calendar_patterns):
             booking_systems.append('calendar_booking_widget')
         
         payment_patterns = [
@@ -320,61 +402,44 @@ class ContinuousTourOperatorAnalyzer:
             'billing-address', 'cvv', 'expiry'
         ]
         
-        if any(pattern in html_content.lower() for pattern in payment_patterns):
+        if any(pattern in doc.html_lower for pattern in payment_patterns):
             booking_systems.append('integrated_payment_system')
         
         return booking_systems
 
-    def _detect_unknown_ota_integration(self, html_content, page_text, page_url):
+    def _detect_unknown_ota_integration(self, doc):
         """Detect OTA dependencies using behavioral analysis."""
         ota_integrations = []
         
-        try:
-            domain = urlparse(page_url).netloc
-            
-            external_booking_patterns = [
-                r'href="https?://(?!' + re.escape(domain) + r').*book',
-                r'href="https?://(?!' + re.escape(domain) + r').*reserv',
-                r'href="https?://(?!' + re.escape(domain) + r').*ticket',
-            ]
-            
-            external_links = []
-            for pattern in external_booking_patterns:
-                matches = re.findall(pattern, html_content, re.IGNORECASE)
-                external_links.extend(matches)
-            
-            if len(external_links) >= 2:
-                ota_integrations.append('external_booking_redirects')
-        except Exception:
-            pass
+        # One hit per keyword per outbound link. This intentionally differs from the old
+        # greedy href regex, which ran past the link into unrelated markup and counted the
+        # operator's own subdomains as external; some pages lose the verdict as a result.
+        external_links = [link for keyword in ('book', 'reserv', 'ticket') for link in doc.external_links if keyword in link]
+        
+        if len(external_links) >= 2:
+            ota_integrations.append('external_booking_redirects')
         
         return ota_integrations
 
-    def _has_chat_ui_elements(self, html_content):
+    def _has_chat_ui_elements(self, doc):
         """Check for chat UI elements in the HTML."""
         chat_ui_selectors = [
             'chat-widget', 'chat-bubble', 'chat-button',
             'message-input', 'chat-container', 'live-chat'
         ]
-        return any(selector in html_content.lower() for selector in chat_ui_selectors)
+        return any(selector in doc.html_lower for selector in chat_ui_selectors)
 
-    def _has_booking_widgets(self, html_content):
+    def _has_booking_widgets(self, doc):
         """Check for booking widget elements."""
         booking_selectors = [
             'booking-widget', 'reservation-form', 'book-now',
             'date-picker', 'guest-selector', 'booking-calendar'
         ]
-        return any(selector in html_content.lower() for selector in booking_selectors)
+        return any(selector in doc.html_lower for selector in booking_selectors)
 
-    def _count_external_booking_links(self, html_content, page_url):
+    def _count_external_booking_links(self, doc):
         """Count links that redirect to external booking platforms."""
-        try:
-            domain = urlparse(page_url).netloc
-            link_pattern = r'href="(https?://(?!' + re.escape(domain) + r')[^"]*(?:book|reserv|ticket|buy)[^"]*)"'
-            external_booking_links = re.findall(link_pattern, html_content, re.IGNORECASE)
-            return len(external_booking_links)
-        except Exception:
-            return 0
+        return sum(1 for link in doc.external_links if any(keyword in link for keyword in ('book', 'reserv', 'ticket', 'buy')))
 
     def _generate_prospect_evaluation(self, analysis):
         """Generate prospect evaluation based on analysis."""
@@ -433,22 +498,26 @@ class ContinuousTourOperatorAnalyzer:
         else:
             return "None detected"
 
-    async def analyze_page(self, page, url, timeout):
-        """Analyze a single page."""
+    async def analyze_page(self, page, url, timeout, timings=None):
+        """Analyze a single page (stage durations are added to timings when given)."""
         try:
-            await page.goto(url, timeout=timeout, wait_until='domcontentloaded')
-            await page.wait_for_timeout(3000)
+            with stage_timer(timings, 'navigate'):
+                await page.goto(url, timeout=timeout, wait_until='domcontentloaded')
+            with stage_timer(timings, 'settle'):
+                await page.wait_for_timeout(3000)
             
-            html_content = await page.content()
-            text_content = await page.evaluate('document.body.innerText || ""')
+            with stage_timer(timings, 'content_extraction'):
+                html_content, text_content = await self.extract_page(page)
             
-            analysis = self.analyze_page_content(html_content, text_content, url)
+            with stage_timer(timings, 'static_detect'):
+                analysis = self.analyze_page_content(html_content, text_content, url)
             
             # Enhanced dynamic detection
-            await self._detect_dynamic_elements(page, analysis)
+            await self._detect_dynamic_elements(page, analysis, timings)
             
             # Network analysis
-            network_analysis = await self._analyze_network_requests(page)
+            with stage_timer(timings, 'network_detect'):
+                network_analysis = await self._analyze_network_requests(page)
             analysis['chatbot_types'].extend(network_analysis['chatbot_services'])
             analysis['booking_technology'].extend(network_analysis['booking_services'])
             analysis['ota_dependencies'].extend(network_analysis['ota_services'])
@@ -456,10 +525,12 @@ class ContinuousTourOperatorAnalyzer:
             if network_analysis['chatbot_services']:
                 analysis['has_chatbot'] = True
             
+            self.metrics.increment('pages_analyzed_total')
             return analysis
             
         except Exception as e:
             logger.warning(f"Error analyzing {url}: {e}")
+            self.metrics.increment('page_errors_total')
             return {
                 'has_chatbot': None,
                 'chatbot_types': [],
@@ -469,42 +540,58 @@ class ContinuousTourOperatorAnalyzer:
                 'error': str(e)
             }
 
-    async def _detect_dynamic_elements(self, page, analysis):
+    async def extract_page(self, page):
+        """Return (markup, text) for the detectors according to the extraction mode."""
+        if self.extraction_mode == 'full':
+            html_content = await page.content()
+            text_content = await page.evaluate('document.body.innerText || ""')
+        else:
+            html_content, text_content = await extract_page_signals(page)
+        self.metrics.increment('extracted_chars_total', len(html_content) + len(text_content))
+        return html_content, text_content
+
+    async def _detect_dynamic_elements(self, page, analysis, timings=None):
         """Detect dynamic elements."""
         try:
-            await page.wait_for_timeout(2000)
+            with stage_timer(timings, 'settle'):
+                await page.wait_for_timeout(2000)
             
-            chatbot_selectors = [
-                '[class*="chat"]:not([class*="chart"])', '[id*="chat"]:not([id*="chart"])',
-                '[class*="widget"]', '[id*="widget"]',
-                '[class*="messenger"]', '[id*="messenger"]'
-            ]
-            
-            for selector in chatbot_selectors:
-                elements = await page.query_selector_all(selector)
-                if elements:
-                    for element in elements[:3]:
-                        try:
-                            element_text = await element.inner_text()
-                            is_visible = await element.is_visible()
-                            
-                            chat_keywords = [
-                                'start chat', 'chat with', 'live chat', 'support chat',
-                                'help chat', 'message us', 'ask question', 'need help'
-                            ]
-                            
-                            has_chat_keywords = any(keyword in element_text.lower() for keyword in chat_keywords)
-                            
-                            if has_chat_keywords and is_visible:
-                                analysis['has_chatbot'] = True
-                                analysis['chatbot_types'].append('dynamic_chat_widget')
-                                break
-                        except:
-                            continue
+            with stage_timer(timings, 'dynamic_detect'):
+                await self._find_dynamic_chat_widget(page, analysis)
                     
         except Exception:
             pass
 
+    async def _find_dynamic_chat_widget(self, page, analysis):
+        """Look for visible widget elements carrying chat wording."""
+        chatbot_selectors = [
+            '[class*="chat"]:not([class*="chart"])', '[id*="chat"]:not([id*="chart"])',
+            '[class*="widget"]', '[id*="widget"]',
+            '[class*="messenger"]', '[id*="messenger"]'
+        ]
+        
+        for selector in chatbot_selectors:
+            elements = await page.query_selector_all(selector)
+            if elements:
+                for element in elements[:3]:
+                    try:
+                        element_text = await element.inner_text()
+                        is_visible = await element.is_visible()
+                        
+                        chat_keywords = [
+                            'start chat', 'chat with', 'live chat', 'support chat',
+                            'help chat', 'message us', 'ask question', 'need help'
+                        ]
+                        
+                        has_chat_keywords = any(keyword in element_text.lower() for keyword in chat_keywords)
+                        
+                        if has_chat_keywords and is_visible:
+                            analysis['has_chatbot'] = True
+                            analysis['chatbot_types'].append('dynamic_chat_widget')
+                            break
+                    except:
+                        continue
+
     async def _analyze_network_requests(self, page):
         """Analyze network requests."""
         network_analysis = {
@@ -551,7 +638,7 @@ class ContinuousTourOperatorAnalyzer:
         
         return network_analysis
 
-    async def analyze_website(self, browser, url, timeout):
+    async def analyze_website(self, browser, url, timeout, timings=None):
         """Analyze a website across multiple pages."""
         all_results = {
             'has_chatbot': False,
@@ -567,9 +654,15 @@ class ContinuousTourOperatorAnalyzer:
         )
         page = await context.new_page()
         
+        # Read the sitemap while the main page loads
+        discovery = None
+        if self.current_settings['max_pages_per_site'] > 1:
+            discovery = asyncio.create_task(self.site_discovery.discover(url))
+        
         try:
             # Analyze main page
-            main_analysis = await self.analyze_page(page, url, timeout)
+            main_analysis = await self.analyze_page(page, url, timeout, timings)
+            all_results['final_url'] = page.url
             if 'error' not in main_analysis:
                 all_results['has_chatbot'] = main_analysis['has_chatbot']
                 all_results['chatbot_types'].update(main_analysis['chatbot_types'])
@@ -578,32 +671,25 @@ class ContinuousTourOperatorAnalyzer:
                 all_results['analysis_details'] = main_analysis['analysis_details']
                 all_results['pages_analyzed'] += 1
             
-            # Analyze additional pages if settings allow
+            # Analyze the most promising same-site pages if settings allow
             if self.current_settings['max_pages_per_site'] > 1:
                 try:
-                    nav_links = await page.query_selector_all('nav a, .navigation a, #menu a, .menu a')
-                    important_pages = ['/booking', '/book', '/tours', '/experiences']
-                    
-                    pages_to_check = []
-                    for link in nav_links[:5]:
-                        href = await link.get_attribute('href')
-                        if href:
-                            full_url = urljoin(url, href.strip()).rstrip('/')
-                            if full_url.startswith('http') and urlparse(full_url).netloc == urlparse(url).netloc:
-                                pages_to_check.append(full_url)
+                    frontier = CrawlFrontier(page.url if page.url.startswith('http') else url)
+                    frontier.add_links(await page.evaluate(LINK_CANDIDATES_JS, 500))
+                    try:
+                        # Slow sitemaps must not hold the context; the lookup finishes (and caches) in the background
+                        frontier.add_urls(await asyncio.wait_for(discovery, self.site_discovery.max_wait))
+                    except asyncio.TimeoutError:
+                        self.metrics.increment('discovery_timeouts_total')
+                    frontier.add_guesses()
+                    pages_to_check = await frontier.select(
+                        self.current_settings['max_pages_per_site'] - 1,
+                        lambda candidate: self.probe_page(context, candidate)
+                    )
                     
-                    for important_page in important_pages:
-                        potential_url = urljoin(url, important_page).rstrip('/')
-                        pages_to_check.append(potential_url)
-                    
-                    # Analyze up to max_pages_per_site additional pages
-                    pages_checked = 1
-                    for page_url in set(pages_to_check):
-                        if pages_checked >= self.current_settings['max_pages_per_site']:
-                            break
-                        
+                    for page_url in pages_to_check:
                         try:
-                            page_analysis = await self.analyze_page(page, page_url, timeout)
+                            page_analysis = await self.analyze_page(page, page_url, timeout, timings)
                             if 'error' not in page_analysis:
                                 if page_analysis['has_chatbot']:
                                     all_results['has_chatbot'] = True
@@ -612,7 +698,6 @@ class ContinuousTourOperatorAnalyzer:
                                 all_results['ota_dependencies'].update(page_analysis['ota_dependencies'])
                                 all_results['pages_analyzed'] += 1
                             
-                            pages_checked += 1
                             await asyncio.sleep(1)
                             
                         except Exception:
@@ -625,6 +710,8 @@ class ContinuousTourOperatorAnalyzer:
             logger.error(f"Error processing {url}: {e}")
             all_results['error'] = str(e)
         finally:
+            if discovery and not discovery.done():
+                discovery.cancel()
             await context.close()
         
         # Convert sets to lists
@@ -634,9 +721,18 @@ class ContinuousTourOperatorAnalyzer:
             'booking_technology': list(all_results['booking_technology']),
             'ota_dependencies': list(all_results['ota_dependencies']),
             'analysis_details': all_results['analysis_details'],
-            'pages_analyzed': all_results['pages_analyzed']
+            'pages_analyzed': all_results['pages_analyzed'],
+            'final_url': all_results.get('final_url', url)
         }
 
+    async def probe_page(self, context, url):
+        """Cheap status request for a guessed sub-page before spending a navigation on it."""
+        exists = await probe_url(context.request, url)
+        self.metrics.increment('frontier_probes_total')
+        if not exists:
+            self.metrics.increment('frontier_probes_missing_total')
+        return exists
+
     def clean_url(self, url):
         """Clean and validate a URL."""
         if not url or pd.isna(url):
@@ -661,32 +757,16 @@ class ContinuousTourOperatorAnalyzer:
         self.stats['non_prospects'] = len(df[df['prospect_evaluation'] == 'NOT A PROSPECT'])
         
         # Count completed and failed
-        completed_mask = (~df['has_chatbot'].isna()) & (~df['has_chatbot'].str.contains('Error', na=False))
+        completed_mask = (~df['has_chatbot'].isna()) & (~df['has_chatbot'].str.contains('Error', na=False)) & (df['analysis_status'] != 'DNS_FAILED')
         self.stats['completed'] = len(df[completed_mask])
+        self.stats['dns_failed'] = len(df[df['analysis_status'] == 'DNS_FAILED'])
         self.stats['failed'] = len(df[df['has_chatbot'].str.contains('Error', na=False)])
 
-    async def process_batch(self, df, batch_indices, output_csv):
-        """Process a single batch of companies."""
-        batch_data = df.loc[batch_indices].copy()
-        
-        # Find URL column (more flexible matching)
-        url_columns = ['Website URL', 'website url', 'url', 'domain', 'website', 'company_url', 'site', 'Website', 'URL', 'Domain', 'Website Url', 'website_url', 'Company Website', 'Site URL', 'company website', 'Company URL']
-        url_column = None
-        
-        # First try exact match
-        for col in url_columns:
-            if col in df.columns:
-                url_column = col
-                break
-        
-        # If no exact match, try case-insensitive partial match
-        if not url_column:
-            for col in df.columns:
-                col_lower = col.lower()
-                if any(keyword in col_lower for keyword in ['url', 'website', 'site', 'domain']):
-                    url_column = col
-                    print(f"📍 Found URL column: '{col}'")
-                    break
+    def find_url_column(self, df):
+        """Find the website URL column (more flexible matching)."""
+        url_column = find_url_column(df, partial_match=True)
+        if url_column and url_column not in URL_COLUMN_CANDIDATES:
+            print(f"📍 Found URL column: '{url_column}'")
         
         if not url_column:
             print("❌ ERROR: No URL column found in CSV!")
@@ -694,6 +774,81 @@ class ContinuousTourOperatorAnalyzer:
             for i, col in enumerate(df.columns, 1):
                 print(f"   {i}. '{col}'")
             print("\n💡 Please ensure your CSV has a column with 'URL', 'website', or 'site' in the name")
+            return None
+        
+        return url_column
+
+    def build_site_groups(self, df, url_column):
+        """Group rows by canonical site so each site is only crawled once."""
+        groups = group_rows_by_site(df[url_column])
+        
+        self.site_followers = {indices[0]: indices[1:] for indices in groups.values() if len(indices) > 1}
+        self.follower_indices = {index for followers in self.site_followers.values() for index in followers}
+        self.site_keys = {indices[0]: key for key, indices in groups.items()}
+        self.resolved_sites = {}
+        self.stats['shared_site_rows'] = len(self.follower_indices)
+        
+        logger.info(f"🔗 {len(groups)} unique sites across {sum(len(indices) for indices in groups.values())} rows "
+                    f"({len(self.follower_indices)} rows share a site and won't be crawled separately)")
+
+    async def prefilter_dead_domains(self, df, url_column, is_follower):
+        """Mark rows whose hostname does not exist as DNS_FAILED so no phase (or retry) crawls them."""
+        hosts = {}
+        for index, raw_url in df.loc[df['analysis_status'].isna() & ~is_follower, url_column].items():
+            clean_url = self.clean_url(raw_url)
+            try:
+                host = urlparse(clean_url).hostname if clean_url else None
+            except ValueError:
+                host = None
+            if host:
+                hosts[index] = host.rstrip('.')
+        
+        if not hosts:
+            return
+        
+        logger.info(f"🌐 Resolving {len(set(hosts.values()))} hostnames before crawling...")
+        outcomes = await self.dns_prefilter.resolve_all(hosts.values())
+        dead = [index for index, host in hosts.items() if outcomes.get(host) == NXDOMAIN]
+        
+        if dead:
+            df.loc[dead, 'has_chatbot'] = 'DNS lookup failed'
+            df.loc[dead, 'analysis_status'] = 'DNS_FAILED'
+            df.loc[dead, 'last_analyzed'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            for index in dead:
+                self.fan_out_result(df, index)
+        self.update_statistics(df)
+        logger.info(f"🌐 {len(dead)} rows point at domains that do not resolve - marked DNS_FAILED")
+
+    def fan_out_result(self, df, index, source_index=None):
+        """Copy a crawled row's analysis columns to every row sharing its site."""
+        source_index = index if source_index is None else source_index
+        targets = list(self.site_followers.get(index, []))
+        if source_index != index:
+            targets.append(index)
+        
+        if targets:
+            df.loc[targets, self.analysis_columns] = df.loc[source_index, self.analysis_columns].values
+
+    def fan_out_settled_results(self, df):
+        """Fill blank follower rows from leaders that already have a status (e.g. a resumed output)."""
+        filled = 0
+        for index, followers in self.site_followers.items():
+            if pd.isna(df.loc[index, 'analysis_status']):
+                continue
+            blank = [follower for follower in followers if pd.isna(df.loc[follower, 'analysis_status'])]
+            if blank:
+                df.loc[blank, self.analysis_columns] = df.loc[index, self.analysis_columns].values
+                filled += len(blank)
+        
+        if filled:
+            logger.info(f"🔗 {filled} shared-site rows filled from results already in the table")
+
+    async def process_batch(self, df, batch_indices, output_csv):
+        """Process a single batch of companies."""
+        batch_data = df.loc[batch_indices].copy()
+        
+        url_column = self.find_url_column(df)
+        if not url_column:
             return
         
         # Run parallel analysis
@@ -701,10 +856,17 @@ class ContinuousTourOperatorAnalyzer:
         
         async def analyze_with_semaphore(browser, index, company_name, url):
             async with semaphore:
+                site_key = self.site_keys.get(index) or url
+                await self.memory_admission.admit(site_key)
+                timings = {}
+                company_start = time.perf_counter()
+                self.metrics.add_gauge('queue_depth', -1)
+                self.metrics.add_gauge('in_flight', 1)
                 try:
-                    analysis = await self.analyze_website(browser, url, self.current_settings['timeout'])
+                    analysis = await self.analyze_website(browser, url, self.current_settings['timeout'], timings)
                     
                     # Update dataframe with results (ONLY update this specific row)
+                    persist_start = time.perf_counter()
                     df.loc[index, 'has_chatbot'] = 'True' if analysis['has_chatbot'] else 'False'
                     df.loc[index, 'chatbot_analysis'] = self._generate_chatbot_summary(analysis)
                     df.loc[index, 'chatbot_types_detailed'] = '; '.join(analysis['chatbot_types']) if analysis['chatbot_types'] else 'None detected'
@@ -721,7 +883,14 @@ class ContinuousTourOperatorAnalyzer:
                     df.loc[index, 'last_analyzed'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                     df.loc[index, 'analysis_status'] = 'COMPLETED'
                     
+                    # Remember the site (and where it redirected to) so later rows can reuse the result
+                    for resolved_key in (self.site_keys.get(index), canonical_site_key(analysis.get('final_url'))):
+                        if resolved_key:
+                            self.resolved_sites.setdefault(resolved_key, index)
+                    timings['persist'] = time.perf_counter() - persist_start
+                    
                     logger.info(f"✅ COMPLETED: {company_name} | {df.loc[index, 'prospect_evaluation']}")
+                    self.metrics.increment('companies_completed_total')
                     
                 except Exception as e:
                     error_msg = f"Error: {str(e)[:100]}"
@@ -729,6 +898,13 @@ class ContinuousTourOperatorAnalyzer:
                     df.loc[index, 'analysis_status'] = 'FAILED'
                     df.loc[index, 'last_analyzed'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                     logger.error(f"❌ FAILED: {company_name} - {error_msg}")
+                    self.metrics.increment('companies_failed_total')
+                finally:
+                    # Always hand back the admission slot, even when cancelled
+                    self.memory_admission.release(site_key)
+                    timings['company_total'] = time.perf_counter() - company_start
+                    self.metrics.record_company(timings)
+                    self.metrics.add_gauge('in_flight', -1)
 
         async with async_playwright() as p:
             # Try different browsers if chromium fails
@@ -745,6 +921,16 @@ class ContinuousTourOperatorAnalyzer:
             
             for index in batch_indices:
                 row = df.loc[index]
+                
+                # An earlier crawl already landed on this site (e.g. via redirect)
+                resolved_index = self.resolved_sites.get(self.site_keys.get(index))
+                if resolved_index is not None and resolved_index != index:
+                    self.fan_out_result(df, index, source_index=resolved_index)
+                    logger.info(f"🔗 REUSED: {row.get('Company Name', index)} shares a site already analyzed")
+                    self.metrics.increment('shared_site_reuses_total')
+                    self.metrics.add_gauge('queue_depth', -1)
+                    continue
+                
                 clean_url = self.clean_url(row.get(url_column))
                 if clean_url:
                     company_name = row.get('Company Name', f'Company at index {index}')
@@ -752,13 +938,21 @@ class ContinuousTourOperatorAnalyzer:
                 else:
                     df.loc[index, 'has_chatbot'] = 'Invalid URL'
                     df.loc[index, 'analysis_status'] = 'INVALID_URL'
+                    self.metrics.increment('invalid_urls_total')
+                    self.metrics.add_gauge('queue_depth', -1)
             
             if tasks:
                 await asyncio.gather(*tasks)
             await browser.close()
         
+        for index in batch_indices:
+            self.fan_out_result(df, index)
+        
         # Save progress after each batch
-        df.to_csv(output_csv, index=False)
+        save_start = time.perf_counter()
+        write_table(df, output_csv)
+        self.metrics.observe('batch_save', time.perf_counter() - save_start)
+        self.memory_admission.save_peaks()
         self.update_statistics(df)
 
     async def continuous_process(self, input_csv, output_csv):
@@ -766,19 +960,21 @@ class ContinuousTourOperatorAnalyzer:
         logger.info("🚀 Starting continuous processing...")
         
         # Load data
-        df = pd.read_csv(input_csv)
+        df = read_table(input_csv, bool_as_str=True)
         self.stats['total_companies'] = len(df)
         self.stats['start_time'] = time.time()
-        
+        self.start_live_metrics()
+        memory_sampler = asyncio.create_task(self.memory_admission.run())
+        try:
+            await self.process_phases(df, output_csv)
+        finally:
+            memory_sampler.cancel()
+            self.stop_live_metrics()
+
+    async def process_phases(self, df, output_csv):
+        """Run the aggressive, conservative and patient phases over the loaded table."""
         # Initialize new columns if they don't exist (PRESERVE existing data)
-        analysis_columns = [
-            'has_chatbot', 'chatbot_analysis', 'chatbot_types_detailed',
-            'booking_technology_summary', 'booking_technology_detailed', 
-            'ota_analysis', 'ota_dependencies_detailed',
-            'prospect_evaluation', 'pages_analyzed',
-            'has_contact_form', 'has_online_booking', 'external_booking_links',
-            'analysis_confidence', 'last_analyzed', 'analysis_status'
-        ]
+        analysis_columns = self.analysis_columns
         
         for col in analysis_columns:
             if col not in df.columns:
@@ -787,12 +983,23 @@ class ContinuousTourOperatorAnalyzer:
         # Create initial backup
         self.backup_progress(df, "initial")
         
+        # Canonicalize URLs before building the queue so shared sites are crawled once
+        url_column = self.find_url_column(df)
+        if url_column:
+            self.build_site_groups(df, url_column)
+            self.fan_out_settled_results(df)
+        is_follower = df.index.isin(list(self.follower_indices))
+        
+        # Dead domains are settled before Phase 1 and never enter the retry phases
+        if url_column and self.dns_prefilter:
+            await self.prefilter_dead_domains(df, url_column, is_follower)
+        
         # Phase 1: Aggressive Processing
         logger.info("🔥 Phase 1: Aggressive Processing")
-        self.stats['phase'] = 'Aggressive Processing'
+        self.set_phase('Aggressive Processing')
         self.current_settings = self.aggressive_settings.copy()
         
-        unprocessed = df[df['analysis_status'].isna()].index.tolist()
+        unprocessed = df[df['analysis_status'].isna() & ~is_follower].index.tolist()
         
         while unprocessed:
             batch_size = self.current_settings['batch_size']
@@ -801,10 +1008,11 @@ class ContinuousTourOperatorAnalyzer:
             logger.info(f"Processing batch: {len(batch_indices)} companies")
             self.print_dashboard()
             
+            self.metrics.set_gauge('queue_depth', len(unprocessed))
             await self.process_batch(df, batch_indices, output_csv)
             
             # Remove processed companies from unprocessed list
-            unprocessed = df[df['analysis_status'].isna()].index.tolist()
+            unprocessed = df[df['analysis_status'].isna() & ~is_follower].index.tolist()
             
             # Break between batches
             if unprocessed:
@@ -816,11 +1024,11 @@ class ContinuousTourOperatorAnalyzer:
                 self.backup_progress(df, "phase1_progress")
         
         # Phase 2: Conservative Retry for Failed Companies
-        failed_companies = df[df['analysis_status'] == 'FAILED'].index.tolist()
+        failed_companies = df[(df['analysis_status'] == 'FAILED') & ~is_follower].index.tolist()
         
         if failed_companies:
             logger.info("🔄 Phase 2: Conservative Retry for Failed Companies")
-            self.stats['phase'] = 'Conservative Retry'
+            self.set_phase('Conservative Retry')
             self.current_settings = self.conservative_settings.copy()
             
             # Reset failed companies for retry
@@ -835,6 +1043,7 @@ class ContinuousTourOperatorAnalyzer:
                 logger.info(f"Retrying batch: {len(batch_indices)} companies")
                 self.print_dashboard()
                 
+                self.metrics.set_gauge('queue_depth', len(unprocessed))
                 await self.process_batch(df, batch_indices, output_csv)
                 
                 # Remove processed companies from unprocessed list
@@ -845,11 +1054,11 @@ class ContinuousTourOperatorAnalyzer:
                     await asyncio.sleep(self.current_settings['delay_between_batches'])
         
         # Phase 3: Patient Processing for Still-Failed Companies
-        still_failed = df[df['analysis_status'] == 'FAILED'].index.tolist()
+        still_failed = df[(df['analysis_status'] == 'FAILED') & ~is_follower].index.tolist()
         
         if still_failed:
             logger.info("🐌 Phase 3: Patient Processing for Stubborn Sites")
-            self.stats['phase'] = 'Patient Processing'
+            self.set_phase('Patient Processing')
             self.current_settings = self.patient_settings.copy()
             
             # Reset for final retry
@@ -864,6 +1073,7 @@ class ContinuousTourOperatorAnalyzer:
                 logger.info(f"Final attempt batch: {len(batch_indices)} companies")
                 self.print_dashboard()
                 
+                self.metrics.set_gauge('queue_depth', len(unprocessed))
                 await self.process_batch(df, batch_indices, output_csv)
                 
                 # Remove processed companies from unprocessed list  
@@ -883,6 +1093,7 @@ class ContinuousTourOperatorAnalyzer:
         total_completed = len(df[df['analysis_status'] == 'COMPLETED'])
         total_failed = len(df[df['analysis_status'] == 'FAILED'])
         total_invalid = len(df[df['analysis_status'] == 'INVALID_URL'])
+        total_dns_failed = len(df[df['analysis_status'] == 'DNS_FAILED'])
         
         success_rate = (total_completed / len(df) * 100) if len(df) > 0 else 0
         
@@ -896,6 +1107,7 @@ class ContinuousTourOperatorAnalyzer:
         print(f"✅ Successfully analyzed: {total_completed:,} ({success_rate:.1f}%)")
         print(f"❌ Failed to analyze: {total_failed:,}")
         print(f"🚫 Invalid URLs: {total_invalid:,}")
+        print(f"🌐 Dead domains (DNS lookup failed): {total_dns_failed:,}")
         print(f"⏰ Total processing time: {elapsed_str}")
         
         print(f"\n🎯 PROSPECT BREAKDOWN:")
@@ -934,6 +1146,10 @@ class ContinuousTourOperatorAnalyzer:
             for tech, count in sorted(booking_tech_counts.items(), key=lambda x: x[1], reverse=True)[:10]:
                 print(f"   {tech}: {count} companies")
         
+        if self.metrics.histograms:
+            print(f"\n⏱️  STAGE TIMINGS (per company, seconds):")
+            print(self.metrics.format_table())
+        
         print(f"\n📁 RESULTS SAVED TO: {output_csv}")
         print(f"📋 READY FOR AIRTABLE IMPORT!")
         print("="*100)
@@ -949,6 +1165,10 @@ class ContinuousTourOperatorAnalyzer:
             f.write(f"Medium Prospects: {self.stats['medium_prospects']}\n")
             f.write(f"Non-Prospects: {self.stats['non_prospects']}\n")
             f.write(f"Processing Time: {elapsed_str}\n")
+            
+            if self.metrics.histograms:
+                f.write(f"\nStage Timings (seconds per company):\n")
+                f.write(self.metrics.format_table() + "\n")
         
         logger.info(f"Summary report saved to: {summary_file}")
 
@@ -974,8 +1194,13 @@ def main():
     except:
         ram_gb = int(input("Enter your RAM in GB (default: 16): ").strip() or '16')
     
+    metrics_port = input("Live metrics port, e.g. 9108 (blank = off): ").strip()
+    metrics_port = int(metrics_port) if metrics_port else None
+    
+    extraction_mode = 'targeted' if input("Use targeted page extraction (faster, less data)? (y/N): ").strip().lower() == 'y' else 'full'
+    
     # Confirmation
-    df = pd.read_csv(input_csv)
+    df = read_table(input_csv, bool_as_str=True)
     print(f"\n📊 Found {len(df)} companies to analyze")
     print(f"💾 Results will be saved to: {output_csv}")
     print(f"🖥️  System optimized for {ram_gb}GB RAM")
@@ -986,7 +1211,7 @@ def main():
         return
     
     # Start processing
-    analyzer = ContinuousTourOperatorAnalyzer(ram_gb=ram_gb)
+    analyzer = ContinuousTourOperatorAnalyzer(ram_gb=ram_gb, metrics_port=metrics_port, extraction_mode=extraction_mode)
     
     try:
         asyncio.run(analyzer.continuous_process(input_csv, output_csv))
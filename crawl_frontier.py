@@ -0,0 +1,151 @@
+import asyncio
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from url_canonicalizer import registered_domain
+
+# Every anchor in one call: resolved href, trimmed text and whether it sits in navigation
+LINK_CANDIDATES_JS = """
+(maxLinks) => {
+    const links = [];
+    for (const a of document.querySelectorAll('a[href]')) {
+        if (links.length >= maxLinks) break;
+        const text = (a.textContent || a.getAttribute('aria-label') || a.title || '').trim().slice(0, 80);
+        links.push([a.href, text, !!a.closest('nav, header, .navigation, #menu, .menu')]);
+    }
+    return links;
+}
+"""
+
+# Keyword weights, matched in the URL path and in the anchor text
+LINK_SIGNALS = {
+    'book': 5, 'reserv': 5, 'ticket': 4, 'availability': 4, 'checkout': 3, 'buy': 3,
+    'tour': 3, 'experience': 3, 'activit': 3, 'excursion': 3, 'trip': 2, 'itinerar': 2,
+    'price': 2, 'rates': 2, 'contact': 2, 'enquir': 2, 'inquir': 2, 'faq': 1
+}
+LOW_VALUE_SIGNALS = ('blog', 'news', 'privacy', 'terms', 'cookie', 'login', 'account', 'career', 'jobs', 'press', 'wp-json')
+SKIPPED_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.zip', '.mp4', '.mp3', '.doc', '.docx', '.xml')
+
+# Paths worth trying even when no link points at them (checked with a status request first)
+GUESSED_PATHS = ['/booking', '/book', '/tours', '/experiences']
+
+NAV_BONUS = 2
+GUESS_PENALTY = 1
+
+def normalize_link(url):
+    """Drop fragment and trailing slash so the same page is only queued once."""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path.rstrip('/'), parts.query, ''))
+
+def score_link(url, text='', in_nav=False):
+    """Higher is more likely to show booking, tour or contact signals; None means never visit."""
+    parts = urlsplit(url)
+    path = parts.path.lower()
+    if path.endswith(SKIPPED_EXTENSIONS):
+        return None
+    text = (text or '').lower()
+
+    score = sum(weight for keyword, weight in LINK_SIGNALS.items() if keyword in path)
+    score += sum(weight for keyword, weight in LINK_SIGNALS.items() if keyword in text)
+    if any(keyword in path for keyword in LOW_VALUE_SIGNALS):
+        score -= 4
+    if in_nav:
+        score += NAV_BONUS
+    # Prefer shallow pages: /tours over /tours/2019/archive/page-3
+    score -= 0.5 * max(0, len([segment for segment in path.split('/') if segment]) - 2)
+    return score
+
+class CrawlFrontier:
+    """
+    Ranked same-site sub-pages for one website
+
+    Candidates come from the page's links, guessed paths and (optionally)
+    other sources such as a sitemap; each is scored from its URL and anchor
+    text and only the best ones are visited. Guessed URLs must answer a
+    cheap status request before they can be picked.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.base_key = normalize_link(base_url)
+        self.site_domain = registered_domain(urlsplit(base_url).hostname)
+        self.candidates = {}  # normalized url -> {'score', 'order', 'verified'}
+
+    def add(self, url, text='', in_nav=False, bonus=0, verified=True):
+        """Queue a candidate (ignored when off-site, unscoreable or the start page)."""
+        url = urljoin(self.base_url, (url or '').strip())
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or registered_domain(parts.hostname) != self.site_domain:
+            return
+        key = normalize_link(url)
+        if key == self.base_key:
+            return
+        score = score_link(url, text, in_nav)
+        if score is None:
+            return
+        score += bonus
+
+        existing = self.candidates.get(key)
+        if existing:
+            existing['score'] = max(existing['score'], score)
+            existing['verified'] = existing['verified'] or verified
+        else:
+            self.candidates[key] = {'score': score, 'order': len(self.candidates), 'verified': verified}
+
+    def add_links(self, links):
+        """Add [href, text, in_nav] rows from LINK_CANDIDATES_JS."""
+        for href, text, in_nav in links:
+            self.add(href, text, in_nav)
+
+    def add_urls(self, urls, bonus=0):
+        """Add already-known pages (e.g. from the sitemap), no probe needed."""
+        for url in urls:
+            self.add(url, bonus=bonus)
+
+    def add_guesses(self, paths=GUESSED_PATHS):
+        for path in paths:
+            self.add(path, bonus=-GUESS_PENALTY, verified=False)
+
+    def ranked(self):
+        return sorted(self.candidates, key=lambda key: (-self.candidates[key]['score'], self.candidates[key]['order']))
+
+    async def select(self, count, probe):
+        """
+        Best `count` URLs, probing unverified ones just before they would be picked
+
+        Args:
+            count (int): Pages to visit
+            probe (callable): async url -> bool (page exists)
+
+        Returns:
+            list: URLs in visiting order
+        """
+        selected = []
+        ranked = self.ranked()
+        position = 0
+        while len(selected) < count and position < len(ranked):
+            # Probe the unverified URLs among the next few picks together
+            window = ranked[position:position + count - len(selected)]
+            unverified = [key for key in window if not self.candidates[key]['verified']]
+            if unverified:
+                answers = await asyncio.gather(*(probe(key) for key in unverified))
+                for key, exists in zip(unverified, answers):
+                    self.candidates[key]['verified'] = bool(exists)
+            selected.extend(key for key in window if self.candidates[key]['verified'])
+            position += len(window)
+        return selected
+
+async def probe_url(request_context, url, timeout=8000):
+    """True if the URL answers below 400 to a HEAD (or GET when HEAD is refused).
+
+    A guessed path that only redirects to the home page counts as missing.
+    """
+    try:
+        response = await request_context.head(url, timeout=timeout)
+        if response.status in (405, 501):
+            await response.dispose()
+            response = await request_context.get(url, timeout=timeout)
+        exists = response.status < 400 and urlsplit(response.url).path.strip('/') != ''
+        await response.dispose()
+        return exists
+    except Exception:
+        return False
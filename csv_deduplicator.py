@@ -1,5 +1,10 @@
 import pandas as pd
 import os
+import re
+from difflib import SequenceMatcher
+from csv_merger_splitter import CsvPartWriter
+from table_io import read_table, write_table, table_format
+from url_canonicalizer import find_url_column, url_registered_domain
 
 def find_company_column(df):
     """Find the company name column in the dataframe."""
@@ -65,6 +70,38 @@ def analyze_duplicates(df, key_column=None):
         print("✅ No duplicates found!")
         return False, key_column
 
+def score_record_completeness(df, priority_columns):
+    """Score every row's completeness at once (higher = more complete record)."""
+    scores = pd.Series(0, index=df.index)
+    
+    for col in priority_columns:
+        values = df[col]
+        filled = values.notna() & (values.astype(str).str.strip() != '')
+        
+        if col == 'analysis_status':
+            bonus = values == 'COMPLETED'
+            points = 10
+        elif col == 'chatbot_type':
+            bonus = ~values.isin(['', 'unknown', 'error'])
+            points = 5
+        elif col == 'pages_analyzed':
+            bonus = pd.to_numeric(values, errors='coerce') > 0
+            points = 3
+        elif col == 'analysis_confidence':
+            bonus = values == 'High'
+            points = 2
+        else:
+            bonus = pd.Series(False, index=df.index)
+            points = 1
+        
+        scores += filled.astype(int) + (filled & bonus).astype(int) * (points - 1)
+    
+    # Prefer more recent analysis
+    if 'last_analyzed' in df.columns:
+        scores += df['last_analyzed'].notna().astype(int)
+    
+    return scores
+
 def smart_deduplicate(df, key_column, priority_columns=None):
     """Smart deduplication that keeps the most complete record."""
     
@@ -81,58 +118,19 @@ def smart_deduplicate(df, key_column, priority_columns=None):
     existing_priority_cols = [col for col in priority_columns if col in df.columns]
     print(f"📋 Using priority columns: {existing_priority_cols}")
     
-    deduplicated_rows = []
+    scores = score_record_completeness(df, existing_priority_cols)
     
-    # Group by company name
-    grouped = df.groupby(key_column)
+    # One idxmax per company picks its first highest-scoring record (by position, so
+    # duplicate index labels can't confuse it)
+    scores = scores.reset_index(drop=True)
+    best_positions = scores.groupby(df[key_column].values).idxmax()
     
-    for company_name, group in grouped:
-        if len(group) == 1:
-            # No duplicates, keep as is
-            deduplicated_rows.append(group.iloc[0])
-        else:
-            # Multiple records, choose the best one
-            print(f"🔄 Processing duplicates for: {company_name} ({len(group)} records)")
-            
-            # Scoring system to find best record
-            best_record = None
-            best_score = -1
-            
-            for idx, record in group.iterrows():
-                score = 0
-                
-                # Score based on completeness
-                for col in existing_priority_cols:
-                    if pd.notna(record[col]) and str(record[col]).strip() != '':
-                        if col == 'analysis_status' and record[col] == 'COMPLETED':
-                            score += 10
-                        elif col == 'chatbot_type' and record[col] not in ['', 'unknown', 'error']:
-                            score += 5
-                        elif col == 'pages_analyzed' and pd.notna(record[col]) and record[col] > 0:
-                            score += 3
-                        elif col == 'analysis_confidence' and record[col] == 'High':
-                            score += 2
-                        else:
-                            score += 1
-                
-                # Prefer more recent analysis
-                if 'last_analyzed' in record and pd.notna(record['last_analyzed']):
-                    score += 1
-                
-                if score > best_score:
-                    best_score = score
-                    best_record = record
-            
-            if best_record is not None:
-                deduplicated_rows.append(best_record)
-                print(f"   ✅ Kept record with score: {best_score}")
-            else:
-                # Fallback: keep first record
-                deduplicated_rows.append(group.iloc[0])
-                print(f"   ⚠️  Used fallback (first record)")
+    group_sizes = df[key_column].value_counts()
+    duplicated_groups = group_sizes[group_sizes > 1]
+    print(f"🔄 Resolved {len(duplicated_groups)} companies with duplicates ({int(duplicated_groups.sum())} records)")
     
     # Create new dataframe
-    deduplicated_df = pd.DataFrame(deduplicated_rows)
+    deduplicated_df = df.iloc[best_positions.values]
     
     print(f"\n📈 DEDUPLICATION RESULTS:")
     print(f"📊 Original rows: {len(df)}")
@@ -141,7 +139,140 @@ def smart_deduplicate(df, key_column, priority_columns=None):
     
     return deduplicated_df
 
-def clean_and_split_csv(input_csv, max_size_mb=4.5):
+# Legal-form and filler words dropped before comparing company names
+COMPANY_NAME_STOPWORDS = {
+    'ltd', 'limited', 'llc', 'inc', 'incorporated', 'corp', 'corporation', 'co',
+    'company', 'gmbh', 'ag', 'bv', 'nv', 'sa', 'sl', 'srl', 'sas', 'pty', 'plc',
+    'ab', 'as', 'oy', 'aps', 'kg', 'the', 'and'
+}
+
+# Shared platforms: a match on these says nothing about the company
+SHARED_DOMAINS = {
+    'facebook.com', 'instagram.com', 'linkedin.com', 'tripadvisor.com', 'google.com',
+    'linktr.ee', 'youtube.com', 'twitter.com', 'x.com'
+}
+
+def normalize_company_name(name):
+    """Lowercase a company name and strip punctuation and legal-form words."""
+    if pd.isna(name):
+        return ''
+    tokens = re.findall(r'[a-z0-9]+', str(name).lower())
+    return ' '.join(token for token in tokens if token not in COMPANY_NAME_STOPWORDS)
+
+def find_fuzzy_duplicates(df, key_column, url_column=None, similarity_threshold=0.88, max_block_size=50):
+    """Cluster rows that are the same company under different spellings or one domain.
+    
+    Rows are only compared inside blocks (same registered domain, same normalized
+    name, or a shared name token), so cost stays near-linear. Token blocks larger
+    than max_block_size are too generic ('tours', 'travel') and are skipped.
+    
+    Returns:
+        tuple: (cluster label per row as a Series, list of merge dicts)
+    """
+    names = [normalize_company_name(name) for name in df[key_column]]
+    if url_column:
+        domains = [url_registered_domain(url) for url in df[url_column]]
+    else:
+        domains = [''] * len(df)
+    
+    # Union-find over row positions
+    parent = list(range(len(df)))
+    
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    merges = []
+    
+    def union(i, j, reason, similarity):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+            merges.append({'row_a': i, 'row_b': j, 'reason': reason, 'similarity': round(similarity, 3)})
+    
+    # Blocking index
+    domain_blocks = {}
+    name_blocks = {}
+    token_blocks = {}
+    for pos, (name, domain) in enumerate(zip(names, domains)):
+        if domain and domain not in SHARED_DOMAINS:
+            domain_blocks.setdefault(domain, []).append(pos)
+        if name:
+            name_blocks.setdefault(name, []).append(pos)
+            for token in set(name.split()):
+                if len(token) > 2:
+                    token_blocks.setdefault(token, []).append(pos)
+    
+    # Exact keys: same registered domain or same normalized name
+    for domain, positions in domain_blocks.items():
+        for pos in positions[1:]:
+            union(positions[0], pos, 'same_domain', 1.0)
+    for name, positions in name_blocks.items():
+        for pos in positions[1:]:
+            union(positions[0], pos, 'same_normalized_name', 1.0)
+    
+    # Fuzzy: compare distinct names sharing a token
+    compared = set()
+    for token, positions in token_blocks.items():
+        if len(positions) > max_block_size:
+            continue
+        for a_idx in range(len(positions)):
+            for b_idx in range(a_idx + 1, len(positions)):
+                a, b = positions[a_idx], positions[b_idx]
+                if names[a] == names[b] or find(a) == find(b):
+                    continue
+                pair = (names[a], names[b]) if names[a] < names[b] else (names[b], names[a])
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                similarity = SequenceMatcher(None, names[a], names[b]).ratio()
+                if similarity >= similarity_threshold:
+                    union(a, b, 'similar_name', similarity)
+    
+    # Rows without a usable name or domain stay in their own cluster
+    labels = pd.Series([find(pos) for pos in range(len(df))], index=df.index)
+    
+    # Attach names and domains so the report is readable
+    for merge in merges:
+        merge['company_a'] = df[key_column].iloc[merge['row_a']]
+        merge['company_b'] = df[key_column].iloc[merge['row_b']]
+        merge['domain_a'] = domains[merge['row_a']]
+        merge['domain_b'] = domains[merge['row_b']]
+    
+    return labels, merges
+
+def fuzzy_deduplicate(df, key_column, url_column=None, report_csv='fuzzy_merge_report.csv', **kwargs):
+    """Deduplicate on normalized names/domains, keeping the most complete record per cluster."""
+    print(f"\n🧩 FUZZY COMPANY MATCHING")
+    print("=" * 50)
+    
+    if url_column is None:
+        url_column = find_url_column(df)
+    print(f"🔑 Name column: '{key_column}' | 🌐 URL column: '{url_column or 'none'}'")
+    
+    labels, merges = find_fuzzy_duplicates(df, key_column, url_column, **kwargs)
+    
+    reason_counts = pd.Series([merge['reason'] for merge in merges]).value_counts()
+    print(f"🔗 Merges found: {len(merges)}")
+    for reason, count in reason_counts.items():
+        print(f"   {reason}: {count}")
+    
+    # Every merge goes to the report so it can be reviewed before crawling
+    if merges:
+        report_columns = ['company_a', 'company_b', 'domain_a', 'domain_b', 'reason', 'similarity', 'row_a', 'row_b']
+        pd.DataFrame(merges)[report_columns].to_csv(report_csv, index=False)
+        print(f"📋 Merge report saved: {report_csv}")
+        for merge in merges[:10]:
+            print(f"   '{merge['company_a']}' ⇐ '{merge['company_b']}' ({merge['reason']}, {merge['similarity']})")
+    
+    clustered = df.assign(_company_cluster=labels)
+    deduplicated_df = smart_deduplicate(clustered, '_company_cluster')
+    
+    return deduplicated_df.drop(columns=['_company_cluster'])
+
+def clean_and_split_csv(input_csv, max_size_mb=4.5, fuzzy=False):
     """Clean duplicates and split for Airtable import."""
     
     print(f"🧹 CSV CLEANER & SPLITTER")
@@ -149,7 +280,7 @@ def clean_and_split_csv(input_csv, max_size_mb=4.5):
     
     # Load CSV
     print(f"📂 Loading: {input_csv}")
-    df = pd.read_csv(input_csv)
+    df = read_table(input_csv)
     
     print(f"📋 Available columns in CSV:")
     for i, col in enumerate(df.columns, 1):
@@ -164,13 +295,19 @@ def clean_and_split_csv(input_csv, max_size_mb=4.5):
         has_duplicates = result
         key_column = find_company_column(df)
     
-    if has_duplicates:
+    if fuzzy:
+        # Near-duplicates (name variants, same domain) are caught even without exact matches
+        clean_df = fuzzy_deduplicate(df, key_column)
+        has_duplicates = len(clean_df) < len(df)
+    elif has_duplicates:
         # Deduplicate
         clean_df = smart_deduplicate(df, key_column)
-        
+    
+    if has_duplicates:
         # Save clean version
-        clean_filename = input_csv.replace('.csv', '_CLEAN.csv')
-        clean_df.to_csv(clean_filename, index=False)
+        stem, ext = os.path.splitext(input_csv)
+        clean_filename = f"{stem}_CLEAN{ext}"
+        write_table(clean_df, clean_filename)
         print(f"💾 Clean version saved: {clean_filename}")
         
         # Use clean version for splitting
@@ -181,60 +318,35 @@ def clean_and_split_csv(input_csv, max_size_mb=4.5):
         df_to_split = df
         base_filename = input_csv.replace('.csv', '')
     
-    # Check file size and split if needed
-    try:
-        file_size = os.path.getsize(input_csv) / (1024 * 1024) if has_duplicates else 0
-    except:
-        file_size = 0
+    print(f"\n📋 SPLITTING FOR AIRTABLE IMPORT")
+    print("=" * 50)
     
-    if len(df_to_split) > 500:  # Split if more than 500 rows regardless of size
-        print(f"\n📋 SPLITTING FOR AIRTABLE IMPORT")
-        print("=" * 50)
-        
-        # Calculate optimal chunk size
-        total_rows = len(df_to_split)
-        rows_per_chunk = min(500, max(200, total_rows // 3))  # 200-500 rows per chunk
-        
-        num_chunks = (total_rows + rows_per_chunk - 1) // rows_per_chunk
-        
-        print(f"📊 Total rows: {total_rows}")
-        print(f"📦 Creating {num_chunks} chunks with ~{rows_per_chunk} rows each")
-        
-        output_files = []
-        
-        for i in range(num_chunks):
-            start_idx = i * rows_per_chunk
-            end_idx = min((i + 1) * rows_per_chunk, total_rows)
-            
-            chunk_df = df_to_split.iloc[start_idx:end_idx].copy()
-            
-            # Create clean filename
-            chunk_filename = f"airtable_import_CLEAN_part_{i+1}_of_{num_chunks}.csv"
-            chunk_df.to_csv(chunk_filename, index=False)
-            
-            try:
-                chunk_size = os.path.getsize(chunk_filename) / (1024 * 1024)
-            except:
-                chunk_size = 0
-            
-            print(f"📁 Created: {chunk_filename}")
-            print(f"   📊 Rows: {len(chunk_df)} | Size: {chunk_size:.2f} MB")
-            
-            output_files.append({
-                'filename': chunk_filename,
-                'rows': len(chunk_df),
-                'size_mb': chunk_size,
-                'range': f"Companies {start_idx + 1} to {end_idx}"
-            })
-        
-        # Create import instructions
-        create_clean_import_instructions(output_files, total_rows)
-        
-        return output_files
+    # Stream rows into parts cut exactly at the byte budget (no row-count guessing)
+    total_rows = len(df_to_split)
+    part_writer = CsvPartWriter("airtable_import_CLEAN", max_size_mb)
+    for start_idx in range(0, total_rows, 5000):
+        part_writer.write_chunk(df_to_split.iloc[start_idx:start_idx + 5000])
+    output_files = part_writer.close()
     
-    else:
-        print(f"✅ File is ready for direct import ({len(df_to_split)} rows)")
-        return [{'filename': input_csv, 'rows': len(df_to_split)}]
+    ready_file = clean_filename if has_duplicates else input_csv
+    if len(output_files) <= 1 and table_format(ready_file) == 'csv':
+        for file_info in output_files:
+            os.remove(file_info['filename'])
+        print(f"✅ File is ready for direct import ({total_rows} rows, under {max_size_mb} MB)")
+        return [{'filename': ready_file, 'rows': total_rows}]
+    
+    print(f"📊 Total rows: {total_rows}")
+    print(f"📦 Created {len(output_files)} parts of at most {max_size_mb} MB each")
+    
+    for file_info in output_files:
+        file_info['range'] = file_info['companies'].replace('Row', 'Companies', 1)
+        print(f"📁 Created: {file_info['filename']}")
+        print(f"   📊 Rows: {file_info['rows']} | Size: {file_info['size_mb']:.2f} MB")
+    
+    # Create import instructions
+    create_clean_import_instructions(output_files, total_rows)
+    
+    return output_files
 
 def create_clean_import_instructions(output_files, total_companies):
     """Create import instructions for clean files."""
@@ -286,8 +398,10 @@ def main():
         print(f"❌ File not found: {input_csv}")
         return
     
+    fuzzy = input("Also merge name variants / same-domain companies? (y/N): ").strip().lower() == 'y'
+    
     # Clean and split
-    output_files = clean_and_split_csv(input_csv)
+    output_files = clean_and_split_csv(input_csv, fuzzy=fuzzy)
     
     print(f"\n🎉 CLEANING COMPLETED!")
     print(f"📁 Output files: {len(output_files)}")
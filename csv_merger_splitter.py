@@ -1,6 +1,9 @@
 import pandas as pd
 import os
-import math
+import io
+import csv
+from collections import Counter
+from table_io import read_table, write_table, read_table_columns, iter_table_chunks, table_format
 
 def get_file_size_mb(filename):
     """Get file size in MB."""
@@ -19,25 +22,15 @@ def merge_csv_files(main_csv, classification_csv, output_csv):
         
         # Load both CSV files
         print(f"📂 Loading main analysis file: {main_csv}")
-        main_df = pd.read_csv(main_csv)
+        main_df = read_table(main_csv, bool_as_str=True)
         print(f"   📊 Main file: {len(main_df)} rows, {len(main_df.columns)} columns")
         
         print(f"📂 Loading classification file: {classification_csv}")
-        classification_df = pd.read_csv(classification_csv)
+        classification_df = read_table(classification_csv, bool_as_str=True)
         print(f"   📊 Classification file: {len(classification_df)} rows, {len(classification_df.columns)} columns")
         
-        # Check for common columns (merge keys)
-        common_columns = set(main_df.columns).intersection(set(classification_df.columns))
-        print(f"\n🔗 Common columns found: {list(common_columns)}")
-        
         # Identify merge key (usually Company Name or index)
-        merge_key = None
-        potential_keys = ['Company Name', 'Company_Name', 'company_name', 'name']
-        
-        for key in potential_keys:
-            if key in common_columns:
-                merge_key = key
-                break
+        merge_key = find_merge_key(main_df.columns, classification_df.columns)
         
         if not merge_key:
             print("⚠️  No obvious merge key found. Using index-based merge.")
@@ -78,7 +71,7 @@ def merge_csv_files(main_csv, classification_csv, output_csv):
             merged_df = merged_df.drop(columns=['merge_index'])
         
         # Save merged file
-        merged_df.to_csv(output_csv, index=False)
+        write_table(merged_df, output_csv)
         file_size = get_file_size_mb(output_csv)
         
         print(f"\n💾 MERGED FILE SAVED")
@@ -114,55 +107,31 @@ def merge_csv_files(main_csv, classification_csv, output_csv):
         traceback.print_exc()
         return None, 0
 
-def split_csv_for_airtable(input_csv, max_size_mb=4.5, output_prefix="airtable_import"):
+def split_csv_for_airtable(input_csv, max_size_mb=4.5, output_prefix="airtable_import", chunksize=5000):
     """Split CSV into chunks for Airtable import (max 5MB each)."""
     try:
         print(f"\n📋 SPLITTING CSV FOR AIRTABLE IMPORT")
         print("=" * 50)
         
-        df = pd.read_csv(input_csv)
         total_size = get_file_size_mb(input_csv)
         
-        print(f"📊 Input file: {len(df)} rows, {total_size:.2f} MB")
+        print(f"📊 Input file: {total_size:.2f} MB")
         print(f"🎯 Target: Max {max_size_mb} MB per file")
         
-        if total_size <= max_size_mb:
+        # Parquet/Arrow input is always written out as CSV parts for Airtable
+        if table_format(input_csv) == 'csv' and total_size <= max_size_mb:
             print(f"✅ File is already under {max_size_mb} MB - no splitting needed!")
             return [input_csv]
         
-        # Calculate number of chunks needed
-        num_chunks = math.ceil(total_size / max_size_mb)
-        rows_per_chunk = math.ceil(len(df) / num_chunks)
+        # Stream rows into parts; each part is cut exactly at the byte budget
+        part_writer = CsvPartWriter(output_prefix, max_size_mb)
+        for chunk in iter_table_chunks(input_csv, chunksize, bool_as_str=True):
+            part_writer.write_chunk(chunk)
+        output_files = part_writer.close()
         
-        print(f"📈 Will create {num_chunks} files with ~{rows_per_chunk} rows each")
-        
-        output_files = []
-        
-        for i in range(num_chunks):
-            start_idx = i * rows_per_chunk
-            end_idx = min((i + 1) * rows_per_chunk, len(df))
-            
-            chunk_df = df.iloc[start_idx:end_idx].copy()
-            
-            # Create filename
-            chunk_filename = f"{output_prefix}_part_{i+1}_of_{num_chunks}.csv"
-            
-            # Save chunk
-            chunk_df.to_csv(chunk_filename, index=False)
-            chunk_size = get_file_size_mb(chunk_filename)
-            
-            print(f"📁 Created: {chunk_filename}")
-            print(f"   📊 Rows: {len(chunk_df)} | Size: {chunk_size:.2f} MB")
-            
-            # Add metadata to track chunks
-            chunk_info = {
-                'filename': chunk_filename,
-                'rows': len(chunk_df),
-                'size_mb': chunk_size,
-                'companies': f"Row {start_idx + 1} to {end_idx}"
-            }
-            
-            output_files.append(chunk_info)
+        for chunk_info in output_files:
+            print(f"📁 Created: {chunk_info['filename']}")
+            print(f"   📊 Rows: {chunk_info['rows']} | Size: {chunk_info['size_mb']:.2f} MB")
         
         print(f"\n✅ SPLITTING COMPLETED")
         print(f"📋 Created {len(output_files)} files for Airtable import")
@@ -174,6 +143,208 @@ def split_csv_for_airtable(input_csv, max_size_mb=4.5, output_prefix="airtable_i
         print(f"❌ Error splitting file: {e}")
         return []
 
+class CsvPartWriter:
+    """Write CSV rows into numbered part files that never exceed max_size_mb.
+    
+    Each row is serialized exactly once; its encoded byte length decides whether
+    it still fits in the current part, so parts are cut exactly at the budget
+    without writing a file and measuring it afterwards.
+    """
+    
+    def __init__(self, output_prefix, max_size_mb=4.5):
+        self.output_prefix = output_prefix
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.parts = []
+        self.header = None
+        self.current_file = None
+        self.current_bytes = 0
+        self.current_rows = 0
+        self.rows_written = 0
+        self.oversized_rows = 0
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator='\n')
+    
+    def _serialize(self, row):
+        self._writer.writerow(row)
+        data = self._buffer.getvalue().encode('utf-8')
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+    
+    def _open_part(self):
+        filename = f"{self.output_prefix}_part_{len(self.parts) + 1}.csv"
+        self.current_file = open(filename, 'wb')
+        self.current_file.write(self.header)
+        self.current_bytes = len(self.header)
+        self.current_rows = 0
+        self.parts.append({'filename': filename, 'start_row': self.rows_written + 1})
+    
+    def _close_part(self):
+        self.current_file.close()
+        self.current_file = None
+        self.parts[-1].update({
+            'rows': self.current_rows,
+            'size_mb': self.current_bytes / (1024 * 1024),
+            'end_row': self.rows_written
+        })
+    
+    def write_chunk(self, chunk_df):
+        """Append a dataframe chunk row by row, cutting a new part exactly at the byte budget."""
+        if self.header is None:
+            self.header = self._serialize(chunk_df.columns)
+        
+        values = chunk_df.astype(object).where(chunk_df.notna(), '')
+        pending = []
+        
+        for row in values.itertuples(index=False, name=None):
+            data = self._serialize(row)
+            
+            if self.current_file is not None and self.current_rows > 0 and self.current_bytes + len(data) > self.max_bytes:
+                self.current_file.write(b''.join(pending))
+                pending = []
+                self._close_part()
+            if self.current_file is None:
+                self._open_part()
+            
+            if len(self.header) + len(data) > self.max_bytes:
+                # A single row larger than the budget still has to go somewhere
+                self.oversized_rows += 1
+            
+            pending.append(data)
+            self.current_bytes += len(data)
+            self.current_rows += 1
+            self.rows_written += 1
+        
+        if pending:
+            self.current_file.write(b''.join(pending))
+    
+    def close(self):
+        """Finish the last part and rename parts to <prefix>_part_<i>_of_<n>.csv."""
+        if self.current_file is not None:
+            self._close_part()
+        
+        if self.oversized_rows:
+            print(f"⚠️  {self.oversized_rows} rows are larger than the {self.max_bytes / (1024 * 1024):.2f} MB budget on their own")
+        
+        output_files = []
+        for i, part in enumerate(self.parts, 1):
+            final_name = f"{self.output_prefix}_part_{i}_of_{len(self.parts)}.csv"
+            os.replace(part['filename'], final_name)
+            output_files.append({
+                'filename': final_name,
+                'rows': part['rows'],
+                'size_mb': part['size_mb'],
+                'companies': f"Row {part['start_row']} to {part['end_row']}"
+            })
+        
+        return output_files
+
+def find_merge_key(main_columns, classification_columns):
+    """Pick the merge key shared by both files (None means merge by row position)."""
+    common_columns = set(main_columns).intersection(set(classification_columns))
+    print(f"\n🔗 Common columns found: {list(common_columns)}")
+    
+    potential_keys = ['Company Name', 'Company_Name', 'company_name', 'name']
+    for key in potential_keys:
+        if key in common_columns:
+            return key
+    return None
+
+def stream_merge_and_split(main_csv, classification_csv, output_csv=None, max_size_mb=4.5,
+                           output_prefix="airtable_import", chunksize=5000):
+    """Merge and split in a single pass with bounded memory.
+    
+    The classification CSV is loaded once as a hash index on the merge key; the
+    main CSV is streamed in chunks, each chunk is joined against the index and
+    written straight to the merged file and/or the Airtable part files.
+    
+    Args:
+        main_csv (str): Main analysis CSV (streamed)
+        classification_csv (str): Chatbot classification CSV (indexed in memory)
+        output_csv (str): Full merged output, or None to only write parts
+        max_size_mb (float): Part size budget, or None to skip splitting
+        output_prefix (str): Prefix for part filenames
+        chunksize (int): Rows of the main CSV held in memory at once
+    
+    Returns:
+        tuple: (list of part info dicts, total merged rows)
+    """
+    print("🔄 STREAMING MERGE & SPLIT")
+    print("=" * 50)
+    
+    main_columns = read_table_columns(main_csv)
+    print(f"📂 Indexing classification file: {classification_csv}")
+    classification_df = read_table(classification_csv, bool_as_str=True)
+    print(f"   📊 Classification file: {len(classification_df)} rows, {len(classification_df.columns)} columns")
+    
+    merge_key = find_merge_key(main_columns, classification_df.columns)
+    if merge_key:
+        duplicate_keys = classification_df[merge_key].duplicated().sum()
+        if duplicate_keys:
+            print(f"⚠️  {duplicate_keys} repeated '{merge_key}' values in classification file - keeping the first")
+        classification_index = classification_df.drop_duplicates(subset=[merge_key]).set_index(merge_key)
+    else:
+        print("⚠️  No obvious merge key found. Using index-based merge.")
+        classification_index = classification_df.reset_index(drop=True)
+    print(f"🔑 Using merge key: {merge_key or 'row position'}")
+    del classification_df
+    
+    part_writer = CsvPartWriter(output_prefix, max_size_mb) if max_size_mb else None
+    merged_file = open(output_csv, 'w', newline='') if output_csv else None
+    value_counts = {col: Counter() for col in ['has_chatbot', 'prospect_evaluation', 'still_prospect']}
+    total_rows = 0
+    
+    try:
+        for chunk in iter_table_chunks(main_csv, chunksize, bool_as_str=True):
+            if merge_key:
+                merged_chunk = chunk.join(classification_index, on=merge_key, rsuffix='_classified')
+            else:
+                positions = pd.RangeIndex(total_rows, total_rows + len(chunk))
+                matched = classification_index.reindex(positions)
+                matched.index = chunk.index
+                merged_chunk = chunk.join(matched, rsuffix='_classified')
+            
+            # Update original columns with classified data where available
+            for dup_col in [col for col in merged_chunk.columns if col.endswith('_classified')]:
+                original_col = dup_col[:-len('_classified')]
+                if original_col in merged_chunk.columns:
+                    merged_chunk[original_col] = merged_chunk[original_col].fillna(merged_chunk[dup_col])
+                    merged_chunk = merged_chunk.drop(columns=[dup_col])
+            
+            if merged_file:
+                merged_chunk.to_csv(merged_file, index=False, header=(total_rows == 0))
+            if part_writer:
+                part_writer.write_chunk(merged_chunk)
+            
+            for col, counter in value_counts.items():
+                if col in merged_chunk.columns:
+                    counter.update(merged_chunk[col].dropna().tolist())
+            
+            total_rows += len(merged_chunk)
+            print(f"   ✅ Merged {total_rows} rows")
+    finally:
+        if merged_file:
+            merged_file.close()
+    
+    output_files = part_writer.close() if part_writer else []
+    
+    print(f"\n✅ STREAMING MERGE COMPLETED: {total_rows} rows")
+    if output_csv:
+        print(f"📁 Merged file: {output_csv} ({get_file_size_mb(output_csv):.2f} MB)")
+    for file_info in output_files:
+        print(f"📁 Created: {file_info['filename']}")
+        print(f"   📊 Rows: {file_info['rows']} | Size: {file_info['size_mb']:.2f} MB")
+    
+    labels = {'has_chatbot': "💬 Chatbot analysis", 'prospect_evaluation': "🎯 Prospect breakdown",
+              'still_prospect': "🔄 Reclassification results"}
+    for col, counter in value_counts.items():
+        if counter:
+            print(f"{labels[col]}:")
+            for value, count in counter.most_common():
+                print(f"   {value}: {count} companies")
+    
+    return output_files, total_rows
+
 def create_import_instructions(output_files, merged_csv):
     """Create instructions for Airtable import."""
     instructions_file = "AIRTABLE_IMPORT_INSTRUCTIONS.txt"
@@ -238,6 +409,20 @@ def main():
         print(f"❌ Classification CSV file not found: {classification_csv}")
         return
     
+    max_size = 4.5  # MB (slightly under 5MB limit for safety)
+    
+    streaming_choice = input("Merge and split in one streaming pass? (Y/n): ").strip().lower()
+    
+    if streaming_choice != 'n':
+        output_files, total_rows = stream_merge_and_split(main_csv, classification_csv, merged_output, max_size, "airtable_import")
+        if len(output_files) > 1:
+            create_import_instructions(output_files, merged_output)
+        
+        print(f"\n🎉 Process completed!")
+        print(f"📁 Merged file: {merged_output}")
+        print(f"🎯 Ready for Airtable import!")
+        return
+    
     # Step 1: Merge CSV files
     merged_df, file_size = merge_csv_files(main_csv, classification_csv, merged_output)
     
@@ -246,8 +431,6 @@ def main():
         return
     
     # Step 2: Check if splitting is needed
-    max_size = 4.5  # MB (slightly under 5MB limit for safety)
-    
     if file_size > max_size:
         print(f"\n⚠️  File size ({file_size:.2f} MB) exceeds Airtable limit ({max_size} MB)")
         split_choice = input("Split for Airtable import? (y/N): ").strip().lower()
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+
+logger = logging.getLogger(__name__)
+
+# Resolution outcomes
+RESOLVED = 'RESOLVED'
+NXDOMAIN = 'NXDOMAIN'    # name (or any address for it) does not exist - the site cannot load
+TRANSIENT = 'TRANSIENT'  # timeout/SERVFAIL-like failure - let the browser try anyway
+
+# getaddrinfo errors that mean the name definitely has no address
+DEAD_NAME_ERRORS = {socket.EAI_NONAME} | ({socket.EAI_NODATA} if hasattr(socket, 'EAI_NODATA') else set())
+
+# Names that must resolve for the resolver to be trusted at all
+CANARY_HOSTS = ('example.com', 'google.com')
+
+async def getaddrinfo_resolver(host, timeout):
+    """Resolve with the system resolver through the event loop; returns an outcome constant."""
+    loop = asyncio.get_running_loop()
+    try:
+        await asyncio.wait_for(loop.getaddrinfo(host, 443, type=socket.SOCK_STREAM), timeout)
+        return RESOLVED
+    except socket.gaierror as e:
+        return NXDOMAIN if e.errno in DEAD_NAME_ERRORS else TRANSIENT
+    except (asyncio.TimeoutError, OSError, UnicodeError):
+        return TRANSIENT
+
+class StubResolver:
+    """
+    Resolver answering from a fixed table instead of DNS (tests, local benchmarks)
+
+    Hosts listed in `answers` get their outcome; hosts under one of
+    `resolved_suffixes` (e.g. the site farm's *.localhost) resolve; anything
+    else gets `default`.
+    """
+
+    def __init__(self, answers=None, resolved_suffixes=('.localhost',), default=NXDOMAIN):
+        self.answers = {host.lower(): outcome for host, outcome in (answers or {}).items()}
+        self.resolved_suffixes = resolved_suffixes
+        self.default = default
+
+    async def __call__(self, host, timeout):
+        host = host.lower().rstrip('.')
+        if host in self.answers:
+            return self.answers[host]
+        if host == 'localhost' or host.endswith(self.resolved_suffixes):
+            return RESOLVED
+        return self.default
+
+class DnsPrefilter:
+    """
+    Resolve every candidate hostname up front and flag the ones that cannot exist
+
+    Lookups run concurrently (bounded) through an async resolver - the system
+    resolver by default, or any `async (host, timeout) -> outcome` callable,
+    e.g. StubResolver in tests. Definite answers are cached on disk for ttl_hours;
+    transient failures are never cached and never flag a row. If even the
+    canary hosts fail to resolve, the resolver is considered broken (offline
+    machine, DNS outage) and nothing is flagged.
+    """
+
+    def __init__(self, resolver=getaddrinfo_resolver, concurrency=100, timeout=5,
+                 cache_file='dns_cache.json', ttl_hours=24, canary_hosts=CANARY_HOSTS, metrics=None):
+        self.resolver = resolver
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.cache_file = cache_file
+        self.ttl_seconds = ttl_hours * 3600
+        self.canary_hosts = canary_hosts
+        self.metrics = metrics
+        self.cache = self.load_cache()
+
+    def load_cache(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {self.cache_file}: {e}")
+            return {}
+        now = time.time()
+        return {host: entry for host, entry in entries.items() if now - entry[1] <= self.ttl_seconds}
+
+    def save_cache(self):
+        if not self.cache_file:
+            return
+        temp_file = self.cache_file + '.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump(self.cache, f)
+        os.replace(temp_file, self.cache_file)
+
+    async def resolver_is_healthy(self):
+        if not self.canary_hosts:
+            return True
+        outcomes = await asyncio.gather(*(self.resolver(host, self.timeout) for host in self.canary_hosts))
+        return RESOLVED in outcomes
+
+    async def resolve_all(self, hosts):
+        """
+        Outcome per host (RESOLVED, NXDOMAIN or TRANSIENT)
+
+        Args:
+            hosts (iterable): Hostnames (duplicates are resolved once)
+
+        Returns:
+            dict: host -> outcome; everything is TRANSIENT when the resolver looks broken
+        """
+        hosts = list(dict.fromkeys(host.lower().rstrip('.') for host in hosts if host))
+        outcomes = {host: self.cache[host][0] for host in hosts if host in self.cache}
+        pending = [host for host in hosts if host not in outcomes]
+        if not pending:
+            return outcomes
+
+        if not await self.resolver_is_healthy():
+            logger.warning("🌐 DNS canaries did not resolve - skipping the dead-domain prefilter")
+            return {host: TRANSIENT for host in hosts}
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def resolve(host):
+            async with semaphore:
+                return await self.resolver(host, self.timeout)
+
+        now = time.time()
+        for host, outcome in zip(pending, await asyncio.gather(*(resolve(host) for host in pending))):
+            outcomes[host] = outcome
+            if outcome != TRANSIENT:
+                self.cache[host] = [outcome, now]
+            if self.metrics is not None:
+                self.metrics.increment(f'dns_{outcome.lower()}_total')
+
+        try:
+            self.save_cache()
+        except OSError as e:
+            logger.warning(f"Could not save DNS cache: {e}")
+        return outcomes
@@ -2,155 +2,118 @@ import pandas as pd
 import sys
 from pathlib import Path
 
-def filter_missing_apollo_records(apollo_csv_path, output_csv_path=None):
+def load_id_set(ids_path):
+    """
+    Read Apollo Lead IDs from a text file, one per line
+    
+    Title and '====' lines (as written by apollo_analyzer.py) are skipped.
+    
+    Args:
+        ids_path (str): Path to the ID list, e.g. missing_apollo_ids.txt
+    
+    Returns:
+        set: Apollo Lead IDs
+    """
+    ids = set()
+    with open(ids_path) as f:
+        for line in f:
+            line = line.strip()
+            if line and ' ' not in line and set(line) != {'='}:
+                ids.add(line)
+    return ids
+
+def filter_missing_apollo_records(apollo_csv_path, output_csv_path=None, ids_path='missing_apollo_ids.txt', chunksize=50000):
     """
     Filter Apollo CSV to only include records with specific Apollo Lead IDs
     
+    The Apollo export is streamed in chunks and matches are appended to the
+    output, so memory stays constant regardless of the export size.
+    
     Args:
         apollo_csv_path (str): Path to the full Apollo CSV file
         output_csv_path (str): Path for the output CSV (optional)
+        ids_path (str): Text file with the Apollo Lead IDs to keep
+        chunksize (int): Apollo rows held in memory at once
     
     Returns:
         str: Path to the created filtered CSV file
     """
     
-    # The missing Apollo Lead IDs you provided
-    missing_apollo_ids = {
-        "614e968234ce4100014e77fc", "63d0daabd73022000140b28c", "62e8eb006f0e4300018f6c91",
-        "6127c1ccbaaf5b0001865134", "603673a6535e7c0001cf5171", "54a1fa4f7468693cdd237702",
-        "62210f15b5146c0001b6ef9c", "54a3dc8a7468693b8cafb318", "62aeb42d6c8b7a000132c56d",
-        "54ab4ee47468690ae677e601", "5aae12d8a6da98c37693a02f", "64247db5d789440001e582f9",
-        "6226feb86c49ca000102e7ee", "63cd7f29bf33ad0001330698", "60d1e144e7caa9000141e79e",
-        "54a2082a7468692e7175ce06", "631c7460f6a9bc0001e7ddb9", "5d53ceada3ae6133837a0173",
-        "6426c5aa40be1e000178964b", "684eabd0ccaa2800010307d3", "54a1baca74686945fa3ac50b",
-        "5d4ca548a3ae61c3115b4177", "6707872a17d90a0001121a69", "6125f1b6bfc15f0001925c24",
-        "54a4c5c17468692abff93962", "54a81822746869682990f75f", "66fd4f299d0924000150dc68",
-        "54a2b47474686930c22bc636", "5570639c736964375f8f1c00", "6604866b36cf780006e393fc",
-        "6139fc610d929700017696a2", "605fc14b5d8e2c0001547dc0", "6814a52c0edec50001f330a8",
-        "5e5e681c542a2b00018ecb59", "5ddeb6216f4af00001ff71de", "62e662210b4e500001b8a9a6",
-        "674ca3469d988c000157dbc1", "5d46bf6c80f93e2c722e876b", "683b729753182e0001bedf1e",
-        "684d69c0e0bb14000179f813", "639d4e7e29f7d10001c85d04", "674127a111f0d90001eb715d",
-        "64a4774373eb2f0001f27124", "5e865c43cbe2280001c60731", "57e14e36a6da987d9c479a10",
-        "5ae17406a6da984c94200c0e", "54a20f2f74686933184f0b09", "653e1ee4338b090001018c46",
-        "5f0a7339cf027b0001a6623d", "610a56de0b01a60001e426d8", "61693559a1b96b0001935cbb",
-        "686f9869b1064e000157e163", "54a1293a69702dcef9977f01", "54a30cc674686935beac9f50",
-        "61990f17ea4718000114d757", "54aa5cf07468692366012c02", "67006ccf5b1370000123b4b0",
-        "5f6f00933969f5000139f95c", "66f3bf8a9ea8310001ecf19b", "5fccff773d34460001f2a138",
-        "54a3063c7468693fda029d4e", "5c45772380f93e50791d94e5", "54a5d2237468692abf235eab",
-        "557144cd736964585c8d0d00", "67f0bb888b6b5100012b884a", "67ccc970e6228200017b87ba",
-        "63dd4e123ba375000195b5f4", "67e1c24a06b20500012f7287", "667d010fcc240a000113f004",
-        "54aad1a17468690377c1961a", "5d53fe9aa3ae614effd211ad", "57d784dfa6da981a6720f7db",
-        "54a73526746869730ae4151f", "626bbf296223de0001939ba9", "57da9573a6da984a9c3484d8",
-        "64a6c9b5ad78c30001e68a68", "671c864298a33d0001cc413e", "6746bd6b172a840001dbba70",
-        "674231cad7d5ba00012d16fc", "626fb15c7b512f00019a0db0", "5d526d5080f93e4393302926",
-        "6766a401c1290300015a8ab1", "66b5c9a11cafde0001f84b2d", "57db1deaa6da984bd876277c",
-        "54c272837468697af7cf6d9a", "54a2ccfe74686933184bb23d", "613ad5569862a50001586f63",
-        "54c1ba6a7468691639e1b53c", "605a5559245c520001282761", "6604a2a5b347600007db51e3",
-        "64a5b204c87ff600018a42bb", "5e752a853d2dc00001103ba0", "54a40d147468692fa2cc6e28",
-        "5ffb0e65d4af800001fe9e5e", "640f42b63e47880001194460", "54eba78c7468694311ac2607",
-        "5e73a42f824769000182aece", "55708dd773696425ae941200", "66f015715ca57f0001dd1cc8",
-        "5ee54fc24e107f00012bcdcf", "67ae2055e57f2200016dd0d9", "54a46dc27468692abfc25046",
-        "63daf97fea4bb90001adaff7", "60c065f07df5920001620ad8", "54a90b7274686933997f700b",
-        "65ca570acc5fec0001381a34", "54a58ec37468693209bd539b", "6650209d09748e000103cb11",
-        "670149ebfd76940001b91cde", "57d6f6b6a6da986af50e18b7", "600911065d78180001acd625",
-        "673ad1d709a5160001da8e3d", "616930702ea01800011e0369", "6353dbf28d3a3c000171cce8",
-        "6410b8c7f482d700018534cf", "57e0408da6da980e0bd2b83d", "6426e93f74203f0001186f72",
-        "5f07cdafb85f52000125559e", "54a5de6f7468692abf1574af", "676d25914d0b2600014f5586",
-        "57d48282a6da9853ce982c93", "54a50fba7468692cf0ffbb79", "61168ad0cbef4600010bde5b",
-        "56498225a6da9835b00079b9", "54a5a4987468692cf01bb09e", "5e8287dc9812a300016c7697",
-        "6565d34f6cff2c00018f482f", "607098ac162a640001bcb64a", "5ae414fba6da98d43bba6656",
-        "5e8196952410170001b76408", "67453e926451da000178cf82", "54a4bcad746869344240aa5f",
-        "615e0b1cbe9690000176ee88", "67629767001c920001924a02", "6758532463ec1600016dbad7",
-        "686342cc8c2d990001ce8acc", "613b0ea94d54c90001bf1fd0", "64f32e9126029b00019631d0",
-        "5abc28b7a6da984144b39552", "620c20043a055c0001cbe854", "54a702a6746869705ab5010d",
-        "54a3f79d7468693209cfcf21", "610ccf543d10af0001a12f63", "674e0cbe1acdb50001938c80",
-        "64a45cb8bd6a3e0001b40ae2", "5d25b648f6512515036beb4c", "628377d4b5c3020001c65862",
-        "5e82ff7f715e7a00015c0e41", "5f57856d4d9ff900015187aa", "673eeac9dc40cc00011fd514",
-        "64e68b97e886000001742632", "67efab1070ff2f0001a952f8", "6005d731d3001b0001e59222",
-        "54a236ef7468692e71b3d916", "68675d9094686100017c0f62", "671a5c8ff2305a0001f3ebf1",
-        "54eba741746869431156e506", "668d38fb8e08e900010a541b", "5d665991f65125afd12c76cd",
-        "54a82334746869705a7aea62", "66fb93d3a1344e0001affbd2", "6867a9ad48491a000136ba02",
-        "54a5e2b77468692fa2adf2b0", "54a754e374686962207cc82a", "60e4ab424a4bb60001da9f64",
-        "670e101c7214b8000127b0d2", "5b237c11a6da988034cf991b", "54a4ccb67468693442bf7264",
-        "67b9add4cd489700017e1848", "60c65f9533d1ce00013af90e", "54ec44ab7468694311085c73",
-        "54a5d74d74686938aca523ad", "54ebc8f27468694311cea724", "6426e2de39217e0001f07bf1",
-        "66f9ffb6d1c6fd0001886498", "68544527e54dc80001826dec", "54a3e43a7468693676986f1b",
-        "54a181bb69702da232550a00", "64f1f041029a010001e6370c", "6477a6b22b0e7900011b0fc2",
-        "54a1b1d774686942d302e108", "60abb528d7e5ae0001bdf8ed", "60468ba5216ee80001f7562f",
-        "67a456534e14260001701af0", "60350c1ec207350001e7630f", "57dbf364a6da9868bb004d11",
-        "63165e0b47cd2b0001cd4ddb", "66fb7cbcc76fc400011c0784", "651aa8ac40d9100001ecf49d",
-        "54a596a9746869344278b09c", "5f65db3ce96efe0001534ac6", "6483608125e6fa0001121423",
-        "54abe5a5746869332de3d214", "5ac22cf7a6da981d22568f15", "54a2c2d374686933183b9e3a",
-        "54a7e6e87468696829016656", "54a7732774686965d979eb35", "57d325dba6da9865c9b9d462",
-        "5bdeebf680f93e6c94a4fa59", "5dbaabd540d64e0001bb9cab", "57e1b082a6da98572faef0b1",
-        "5571317c73696453d5690c00", "60f568cdde9b980001a5e8db", "6874faa136cc020001dfc71e",
-        "55c9c07df3e5bb4f28004b41"
-    }
+    missing_apollo_ids = load_id_set(ids_path)
     
-    print(f"🔍 Filtering Apollo CSV for {len(missing_apollo_ids)} missing Lead IDs")
+    print(f"🔍 Filtering Apollo CSV for {len(missing_apollo_ids)} missing Lead IDs (from {ids_path})")
     
     try:
-        # Read the Apollo CSV file
-        print(f"📂 Reading Apollo CSV: {apollo_csv_path}")
-        df_apollo = pd.read_csv(apollo_csv_path)
-        print(f"✅ Loaded {len(df_apollo)} total Apollo records")
-        
         # Check if 'id' column exists (this should be the Apollo Lead ID column)
-        if 'id' not in df_apollo.columns:
+        columns = pd.read_csv(apollo_csv_path, nrows=0).columns
+        if 'id' not in columns:
             print("❌ ERROR: 'id' column not found in Apollo CSV")
-            print("Available columns:", list(df_apollo.columns))
+            print("Available columns:", list(columns))
             return None
         
-        # Clean the data - remove NaN and empty values from id column
-        df_clean = df_apollo.dropna(subset=['id'])
-        df_clean = df_clean[df_clean['id'].astype(str).str.strip() != '']
-        print(f"📊 Records with valid IDs: {len(df_clean)}")
+        # Create output filename if not provided
+        if output_csv_path is None:
+            input_path = Path(apollo_csv_path)
+            output_csv_path = input_path.parent / f"missing_apollo_records_{input_path.stem}.csv"
         
-        # Convert Apollo IDs in CSV to strings for comparison
-        df_clean['id_str'] = df_clean['id'].astype(str).str.strip()
+        print(f"📂 Streaming Apollo CSV: {apollo_csv_path}")
+        total_records = 0
+        valid_records = 0
+        matched_records = 0
+        found_ids = set()
+        sample_rows = []
         
-        # Filter to only include missing records
-        df_missing = df_clean[df_clean['id_str'].isin(missing_apollo_ids)]
+        for chunk in pd.read_csv(apollo_csv_path, chunksize=chunksize, dtype={'id': str}):
+            total_records += len(chunk)
+            
+            # Clean the data - remove NaN and empty values from id column
+            id_str = chunk['id'].dropna().str.strip()
+            id_str = id_str[id_str != '']
+            valid_records += len(id_str)
+            
+            # Filter to only include missing records
+            matched = id_str[id_str.isin(missing_apollo_ids)]
+            if matched.empty:
+                continue
+            
+            df_missing = chunk.loc[matched.index]
+            df_missing.to_csv(output_csv_path, mode='w' if matched_records == 0 else 'a',
+                              header=(matched_records == 0), index=False)
+            
+            matched_records += len(df_missing)
+            found_ids.update(matched)
+            if len(sample_rows) < 3:
+                sample_rows.extend(row for _, row in df_missing.head(3 - len(sample_rows)).iterrows())
         
-        print(f"🎯 Found {len(df_missing)} missing records in Apollo CSV")
+        print(f"✅ Scanned {total_records} total Apollo records")
+        print(f"📊 Records with valid IDs: {valid_records}")
+        print(f"🎯 Found {matched_records} missing records in Apollo CSV")
         
-        if len(df_missing) == 0:
+        if matched_records == 0:
             print("⚠️  No matching records found! This could mean:")
             print("   - The Apollo Lead IDs don't exist in this CSV")
             print("   - The ID format is different")
             print("   - Column name is different")
             return None
         
-        # Remove the temporary id_str column
-        df_missing = df_missing.drop('id_str', axis=1)
-        
-        # Create output filename if not provided
-        if output_csv_path is None:
-            input_path = Path(apollo_csv_path)
-            output_csv_path = input_path.parent / f"missing_apollo_records_{input_path.stem}.csv"
-        
-        # Save the filtered records
-        df_missing.to_csv(output_csv_path, index=False)
         print(f"💾 Saved filtered records to: {output_csv_path}")
         
         # Print summary statistics
         print(f"\n📈 SUMMARY:")
         print(f"   Total missing IDs requested: {len(missing_apollo_ids)}")
-        print(f"   Found in Apollo CSV: {len(df_missing)}")
-        print(f"   Still missing: {len(missing_apollo_ids) - len(df_missing)}")
+        print(f"   Found in Apollo CSV: {matched_records}")
+        print(f"   Still missing: {len(missing_apollo_ids) - len(found_ids)}")
         
         # Show some sample records
-        if len(df_missing) > 0:
-            print(f"\n📋 SAMPLE RECORDS (first 3):")
-            for idx, row in df_missing.head(3).iterrows():
-                name = row.get('name', f"{row.get('first_name', '')} {row.get('last_name', '')}").strip()
-                email = row.get('email', 'N/A')
-                company = row.get('organization_name', 'N/A')
-                apollo_id = row.get('id', 'N/A')
-                print(f"   {apollo_id} | {name} | {email} | {company}")
+        print(f"\n📋 SAMPLE RECORDS (first 3):")
+        for row in sample_rows:
+            name = row.get('name', f"{row.get('first_name', '')} {row.get('last_name', '')}").strip()
+            email = row.get('email', 'N/A')
+            company = row.get('organization_name', 'N/A')
+            apollo_id = row.get('id', 'N/A')
+            print(f"   {apollo_id} | {name} | {email} | {company}")
         
         # Check for any IDs that weren't found
-        found_ids = set(df_missing['id'].astype(str))
         not_found_ids = missing_apollo_ids - found_ids
         
         if not_found_ids:
@@ -173,23 +136,30 @@ def main():
     
     # Check command line arguments
     if len(sys.argv) < 2:
-        print("Usage: python filter_missing_apollo.py <apollo_csv_file> [output_csv_file]")
+        print("Usage: python filter_missing_apollo.py <apollo_csv_file> [output_csv_file] [ids_file]")
         print("\nExample:")
         print("python filter_missing_apollo.py apollo_full_dataset.csv")
         print("python filter_missing_apollo.py apollo_full_dataset.csv filtered_missing_records.csv")
+        print("python filter_missing_apollo.py apollo_full_dataset.csv filtered_missing_records.csv duplicate_apollo_ids.txt")
         print("\nThe Apollo CSV should have an 'id' column containing Apollo Lead IDs")
+        print("The IDs file defaults to missing_apollo_ids.txt (written by apollo_analyzer.py)")
         return
     
     apollo_csv_path = sys.argv[1]
     output_csv_path = sys.argv[2] if len(sys.argv) > 2 else None
+    ids_path = sys.argv[3] if len(sys.argv) > 3 else 'missing_apollo_ids.txt'
     
-    # Check if input file exists
+    # Check if input files exist
     if not Path(apollo_csv_path).exists():
         print(f"❌ Error: File '{apollo_csv_path}' not found")
         return
     
+    if not Path(ids_path).exists():
+        print(f"❌ Error: IDs file '{ids_path}' not found (run apollo_analyzer.py first)")
+        return
+    
     # Run the filtering
-    result_path = filter_missing_apollo_records(apollo_csv_path, output_csv_path)
+    result_path = filter_missing_apollo_records(apollo_csv_path, output_csv_path, ids_path)
     
     if result_path:
         print(f"\n✅ SUCCESS! Filtered CSV created: {result_path}")
@@ -0,0 +1,86 @@
+import re
+from collections import Counter
+
+# Opening/closing tag; the attribute text runs to the next '>' so the scan stays linear
+TAG_PATTERN = re.compile(r'<(/?)([a-z][a-z0-9:-]*)([^>]*)>')
+# name="value", name='value', name=value or a bare name
+ATTRIBUTE_PATTERN = re.compile(r'''([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+)))?''')
+
+# Elements whose body is not markup
+RAW_TEXT_TAGS = ('script', 'style')
+
+class HtmlIndex:
+    """
+    Token index of one page's markup, built in a single pass
+
+    Holds, with counts: the attribute text of every element per tag,
+    attribute values per attribute name, class tokens, data-* attribute
+    names, script/iframe sources and the bodies of inline scripts. Detectors
+    then look up tags and attributes instead of running regexes over the
+    whole document, so their cost follows the number of distinct elements.
+    Attribute values may be double-, single- or un-quoted.
+    """
+
+    def __init__(self, html_lower):
+        self.tag_counts = Counter()
+        self.tag_attributes = {}        # tag -> Counter of raw attribute text
+        self.attribute_values = {}      # attribute name -> Counter of values
+        self.class_tokens = Counter()
+        self.data_attributes = Counter()
+        self.sources = {}               # tag -> list of src values (script, iframe, img, ...)
+        self.inline_scripts = []
+        self.build(html_lower)
+
+    def build(self, html):
+        position = 0
+        while True:
+            match = TAG_PATTERN.search(html, position)
+            if not match:
+                break
+            position = match.end()
+            if match.group(1):
+                continue
+
+            tag, attribute_text = match.group(2), match.group(3)
+            self.tag_counts[tag] += 1
+            self.tag_attributes.setdefault(tag, Counter())[attribute_text] += 1
+            if '=' in attribute_text:
+                self.index_attributes(tag, attribute_text)
+
+            # Skip script/style bodies; an unclosed one (e.g. in an extraction digest) swallows nothing
+            if tag in RAW_TEXT_TAGS and 'src=' not in attribute_text:
+                end = html.find('</' + tag, position)
+                if end == -1:
+                    continue
+                if tag == 'script':
+                    self.inline_scripts.append(html[position:end])
+                position = end
+
+    def index_attributes(self, tag, attribute_text):
+        for name, double_quoted, single_quoted, unquoted in ATTRIBUTE_PATTERN.findall(attribute_text):
+            value = double_quoted or single_quoted or unquoted
+            self.attribute_values.setdefault(name, Counter())[value] += 1
+            if name == 'class':
+                self.class_tokens.update(value.split())
+            elif name == 'src':
+                self.sources.setdefault(tag, []).append(value)
+            elif name.startswith('data-'):
+                self.data_attributes[name] += 1
+
+    def count_elements(self, tag, keyword):
+        """Elements of this tag whose attribute text contains the keyword."""
+        return sum(count for text, count in self.tag_attributes.get(tag, {}).items() if keyword in text)
+
+    def count_values(self, name, keyword):
+        """Values of this attribute that contain the keyword."""
+        return sum(count for value, count in self.attribute_values.get(name, {}).items() if keyword in value)
+
+    def values(self, name):
+        return list(self.attribute_values.get(name, Counter()).elements())
+
+    def count_data_attributes(self, keyword):
+        return sum(count for name, count in self.data_attributes.items() if keyword in name)
+
+    @property
+    def script_text(self):
+        return "\n".join(self.inline_scripts)
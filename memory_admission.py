@@ -0,0 +1,150 @@
+import asyncio
+import json
+import logging
+import os
+import time
+
+from analyzer_metrics import process_tree_rss_mb
+
+logger = logging.getLogger(__name__)
+
+class MemoryAdmission:
+    """
+    Gate new browser contexts on the memory of this process and its browsers.
+
+    A sampler measures the RSS of the whole process tree (Python, Playwright
+    driver, Chromium renderers). Above the high-water mark no new contexts are
+    admitted until usage falls back below the low-water mark. Each site's peak
+    footprint is remembered, and a new site is only admitted when its expected
+    footprint fits under the high-water mark next to the sites already open,
+    so known-heavy domains wait for room instead of tipping the browser into swap.
+    """
+
+    def __init__(self, high_water_mb, low_water_mb, sample_interval=1.0, default_site_mb=150,
+                 peaks_file='site_memory_peaks.json', rss_sampler=process_tree_rss_mb, metrics=None):
+        self.high_water_mb = high_water_mb
+        self.low_water_mb = low_water_mb
+        self.sample_interval = sample_interval
+        self.default_site_mb = default_site_mb
+        self.peaks_file = peaks_file
+        self.rss_sampler = rss_sampler
+        self.metrics = metrics
+
+        self.enabled = True     # switched off when RSS cannot be measured (no psutil)
+        self.current_mb = 0.0
+        self.baseline_mb = None  # footprint with no site open (Python + idle browser)
+        self.last_sample = 0.0
+        self.paused = False
+        self.in_flight = {}  # site key -> (count, peak share in MB during this visit)
+        self.site_peaks = self.load_peaks()
+
+    @classmethod
+    def for_ram(cls, ram_gb, **kwargs):
+        """High water at 70% and low water at 55% of the machine's RAM."""
+        return cls(high_water_mb=ram_gb * 1024 * 0.70, low_water_mb=ram_gb * 1024 * 0.55, **kwargs)
+
+    def load_peaks(self):
+        if not self.peaks_file or not os.path.exists(self.peaks_file):
+            return {}
+        try:
+            with open(self.peaks_file) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {self.peaks_file}: {e}")
+            return {}
+
+    def save_peaks(self):
+        if not self.peaks_file:
+            return
+        temp_file = self.peaks_file + '.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump(self.site_peaks, f, indent=1, sort_keys=True)
+        os.replace(temp_file, self.peaks_file)
+
+    def expected_mb(self, site_key):
+        """Remembered peak for the site, or the default for sites never seen."""
+        return self.site_peaks.get(site_key, self.default_site_mb)
+
+    def projected_mb(self):
+        """Current usage, or what the open sites are expected to grow to if that is higher."""
+        expected = (self.baseline_mb or 0.0) + sum(
+            max(self.expected_mb(site_key), peak) * count for site_key, (count, peak) in self.in_flight.items()
+        )
+        return max(self.current_mb, expected)
+
+    async def sample(self):
+        """Measure RSS (off the event loop), update the pause state and per-site peaks."""
+        if not self.enabled:
+            return self.current_mb
+        try:
+            self.current_mb = await asyncio.to_thread(self.rss_sampler)
+        except ImportError as e:
+            self.enabled = False
+            self.paused = False
+            logger.warning(f"🧠 Memory admission control disabled - cannot measure RSS ({e}); install psutil to enable it")
+            return self.current_mb
+        except Exception as e:
+            logger.debug(f"Memory sample failed: {e}")
+            return self.current_mb
+        self.last_sample = time.monotonic()
+
+        if not self.paused and self.current_mb >= self.high_water_mb:
+            self.paused = True
+            logger.warning(f"🧠 Memory high-water mark reached ({self.current_mb:.0f} MB >= {self.high_water_mb:.0f} MB) - pausing new sites")
+        elif self.paused and self.current_mb <= self.low_water_mb:
+            self.paused = False
+            logger.info(f"🧠 Memory back below low-water mark ({self.current_mb:.0f} MB) - resuming")
+
+        # Contexts share the browser, so each in-flight site is charged an equal share of the growth
+        open_sites = sum(count for count, _ in self.in_flight.values())
+        if not open_sites or self.baseline_mb is None:
+            self.baseline_mb = self.current_mb
+        if open_sites:
+            share = max(self.current_mb - self.baseline_mb, 0.0) / open_sites
+            for site_key, (count, peak) in self.in_flight.items():
+                self.in_flight[site_key] = (count, max(peak, share))
+
+        if self.metrics is not None:
+            self.metrics.set_gauge('admission_paused', int(self.paused))
+            self.metrics.set_gauge('admission_rss_mb', round(self.current_mb, 1))
+        return self.current_mb
+
+    async def run(self):
+        """Sample continuously until cancelled (or until sampling turns out to be unavailable)."""
+        while self.enabled:
+            await self.sample()
+            await asyncio.sleep(self.sample_interval)
+
+    def has_room(self, site_key):
+        # Waiting cannot free memory when nothing is open, so one site at a time still goes through
+        if not self.enabled or not self.in_flight:
+            return True
+        if self.paused:
+            return False
+        return self.projected_mb() + self.expected_mb(site_key) <= self.high_water_mb
+
+    async def admit(self, site_key):
+        """Wait until memory allows another browser context for this site."""
+        if time.monotonic() - self.last_sample > self.sample_interval:
+            await self.sample()
+
+        if not self.has_room(site_key):
+            if self.metrics is not None:
+                self.metrics.increment('admission_waits_total')
+            wait_start = time.perf_counter()
+            while not self.has_room(site_key):
+                await asyncio.sleep(self.sample_interval)
+                await self.sample()
+            if self.metrics is not None:
+                self.metrics.observe('admission_wait', time.perf_counter() - wait_start)
+
+        count, peak = self.in_flight.get(site_key, (0, 0.0))
+        self.in_flight[site_key] = (count + 1, peak)
+
+    def release(self, site_key):
+        """Mark the site's context closed and remember its peak share."""
+        count, peak = self.in_flight.pop(site_key, (1, 0.0))
+        if count > 1:
+            self.in_flight[site_key] = (count - 1, peak)
+        if peak:
+            self.site_peaks[site_key] = round(max(self.site_peaks.get(site_key, 0), peak), 1)
@@ -0,0 +1,64 @@
+from functools import cached_property
+from urllib.parse import urlsplit
+
+from html_index import HtmlIndex
+from url_canonicalizer import registered_domain
+
+class PageDocument:
+    """
+    One analyzed page with views shared by every detector
+
+    Each view (lowercase HTML/text, host, links, token index) is computed
+    on first use and cached, so a page's multi-MB strings are lowercased and
+    tokenized once per page instead of scanned once per detector.
+    """
+
+    def __init__(self, html, text, url):
+        self.html = html
+        self.text = text
+        self.url = url
+
+    @cached_property
+    def html_lower(self):
+        return self.html.lower()
+
+    @cached_property
+    def text_lower(self):
+        return self.text.lower()
+
+    def contains(self, pattern):
+        """Lowercase pattern appears in the HTML or the text."""
+        return pattern in self.html_lower or pattern in self.text_lower
+
+    @cached_property
+    def host(self):
+        return urlsplit(self.url).netloc
+
+    @cached_property
+    def registered_domain(self):
+        return registered_domain(urlsplit(self.url).hostname)
+
+    @cached_property
+    def index(self):
+        """Tags, attributes, class tokens and scripts of the markup (see HtmlIndex)."""
+        return HtmlIndex(self.html_lower)
+
+    @cached_property
+    def links(self):
+        """Every href value (lowercased)."""
+        return self.index.values('href')
+
+    @cached_property
+    def external_links(self):
+        """Absolute http(s) links (lowercased) pointing outside the page's registered domain."""
+        external = []
+        for link in self.links:
+            if not link.startswith(('http://', 'https://')):
+                continue
+            try:
+                host = urlsplit(link).hostname
+            except ValueError:
+                continue
+            if host and registered_domain(host) != self.registered_domain:
+                external.append(link)
+        return external
@@ -0,0 +1,96 @@
+# Caps on what one page may send back over the CDP pipe
+EXTRACTION_LIMITS = {
+    'maxElements': 20000,       # elements walked in document order
+    'maxAttrValue': 300,        # characters kept per attribute value
+    'maxText': 100000,          # characters of visible-ish text
+    'maxInlineScripts': 40,     # inline <script> bodies sampled
+    'maxInlineScriptChars': 2000
+}
+
+# One injected call returning only what the detectors read: per-element
+# signatures (tag + class/id/src/href/action/name/type/data-*/aria-*),
+# deduplicated with counts, the head of inline scripts, and textContent
+# gathered without forcing layout (unlike innerText).
+EXTRACT_SIGNALS_JS = """
+(limits) => {
+    const KEEP = new Set(['class', 'id', 'href', 'src', 'action', 'method', 'name', 'type', 'for', 'placeholder', 'role', 'rel']);
+    const ALWAYS = new Set(['form', 'input', 'select', 'button', 'iframe', 'textarea']);
+    const SKIP_TEXT = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+    const quote = (value) => value.slice(0, limits.maxAttrValue).replace(/"/g, '&quot;');
+
+    const counts = new Map();
+    const all = document.getElementsByTagName('*');
+    const elementTotal = Math.min(all.length, limits.maxElements);
+    const inlineScripts = [];
+    for (let i = 0; i < elementTotal; i++) {
+        const el = all[i];
+        const tag = el.tagName.toLowerCase();
+        let attrs = '';
+        for (const attr of el.attributes) {
+            const name = attr.name.toLowerCase();
+            if (KEEP.has(name) || name.startsWith('data-') || name.startsWith('aria-')) {
+                attrs += ' ' + name + '="' + quote(attr.value) + '"';
+            }
+        }
+        if (tag === 'script' && !el.src && inlineScripts.length < limits.maxInlineScripts) {
+            const body = (el.textContent || '').trim();
+            if (body) inlineScripts.push(body.slice(0, limits.maxInlineScriptChars));
+        }
+        if (!attrs && !ALWAYS.has(tag)) continue;
+        const signature = '<' + tag + attrs + '>';
+        counts.set(signature, (counts.get(signature) || 0) + 1);
+    }
+
+    const parts = [];
+    let length = 0;
+    if (document.body) {
+        const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT, {
+            acceptNode: (node) => {
+                const parent = node.parentNode;
+                return parent && SKIP_TEXT.has(parent.nodeName.toUpperCase()) ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT;
+            }
+        });
+        while (length < limits.maxText && walker.nextNode()) {
+            const value = walker.currentNode.nodeValue.trim();
+            if (value) {
+                parts.push(value);
+                length += value.length + 1;
+            }
+        }
+    }
+
+    return {
+        elements: Array.from(counts.entries()),
+        inline_scripts: inlineScripts,
+        text: parts.join(' ').slice(0, limits.maxText),
+        truncated: all.length > limits.maxElements || length >= limits.maxText
+    };
+}
+"""
+
+def signals_to_markup(signals):
+    """
+    Rebuild a compact markup digest from extracted signals
+
+    Each element signature is repeated by its count so per-element match
+    counts carry over from the full document; inline script heads follow
+    as <script> blocks. Text nodes, stylesheets and attributes the detectors
+    never look at are left out.
+
+    Args:
+        signals (dict): Result of EXTRACT_SIGNALS_JS
+
+    Returns:
+        str: Digest the string-based detectors can scan like page.content()
+    """
+    lines = []
+    for signature, count in signals.get('elements', []):
+        lines.extend([signature] * count)
+    for body in signals.get('inline_scripts', []):
+        lines.append(f"<script>{body}</script>")
+    return "\n".join(lines)
+
+async def extract_page_signals(page, limits=None):
+    """Run the extraction script once and return (markup digest, text)."""
+    signals = await page.evaluate(EXTRACT_SIGNALS_JS, limits or EXTRACTION_LIMITS)
+    return signals_to_markup(signals), signals.get('text', '')
@@ -1,6 +1,36 @@
 import pandas as pd
 import numpy as np
+import json
+import re
+from bisect import bisect_right
+from functools import lru_cache
 from math import ceil
+from table_io import read_table, write_table
+
+# Price category signals (substring matches, checked in this order)
+PREMIUM_BOOKING_TECH = ('fareharbor', 'regiondo', 'trekksoft', 'bokun')
+MID_BOOKING_TECH = ('bookeo', 'checkfront', 'rezdy', 'shopify')
+BASIC_BOOKING_TECH = ('woocommerce', 'stripe')
+PREMIUM_OTAS = ('viator', 'getyourguide', 'tripadvisor')
+PREMIUM_MARKETS = ('US', 'UK', 'AU', 'CH', 'NO', 'DK')
+MID_MARKETS = ('CA', 'DE', 'FR', 'NL', 'SE')
+
+def factorize_as_str(values):
+    """Codes per row plus the distinct values as strings (str() applied once per distinct value)."""
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=False)
+    return codes, pd.Series([str(value) for value in uniques], dtype=object)
+
+def column_quantiles(values, quantiles):
+    """Linear-interpolated quantiles down axis 0 (np.quantile's default), via one sort."""
+    ordered = np.sort(values, axis=0)
+    positions = np.asarray(quantiles) * (len(ordered) - 1)
+    lower = np.floor(positions).astype(int)
+    upper = np.ceil(positions).astype(int)
+    fraction = (positions - lower)[:, None]
+    below, above = ordered[lower], ordered[upper]
+    # Equal neighbours (e.g. every payback infinite) would give inf * 0 = NaN in the interpolation
+    with np.errstate(invalid='ignore'):
+        return np.where(below == above, below, below + (above - below) * fraction)
 
 class GamificationPricingCalculator:
     def __init__(self):
@@ -40,6 +70,15 @@ class GamificationPricingCalculator:
             }
         }
         
+        # Uncertainty around the point estimates above, used by simulate_roi
+        # ('triangular', low, mode, high) | ('uniform', low, high) | ('normal', mean, std)
+        self.uncertainty = {
+            'baseline_conversion_rate': ('triangular', 0.01, 0.02, 0.035),
+            'gamification_lift': ('triangular', 0.15, 0.40, 0.60),
+            'ota_commission_shift': ('uniform', -0.05, 0.05),  # Added to every OTA rate
+            'ota_reduction': ('uniform', 0.15, 0.35)  # Share of OTA commissions won back
+        }
+        
         # Base pricing tiers
         self.base_pricing = {
             'setup_fee_base': 2500,  # Base implementation fee
@@ -52,41 +91,59 @@ class GamificationPricingCalculator:
                 (50000, float('inf')): {'multiplier': 5.5, 'name': 'Enterprise'}
             }
         }
+        
+        self.build_lookup_tables()
+
+    def build_lookup_tables(self):
+        """Precompute the tier boundaries and reset the price category cache.
+        
+        Call again after editing base_pricing['traffic_tiers'] or price_ranges.
+        """
+        tiers = sorted(self.base_pricing['traffic_tiers'].items(), key=lambda item: item[0][0])
+        self.tier_lower_bounds = [min_traffic for (min_traffic, _), _ in tiers]
+        self.tier_upper_bounds = [max_traffic for (_, max_traffic), _ in tiers]
+        self.tier_infos = [tier_info for _, tier_info in tiers]
+        self.tier_fallback = self.base_pricing['traffic_tiers'][(0, 1000)]
+        
+        # Only a few hundred distinct (booking tech, OTA, country) combinations exist in practice
+        self.cached_price_category = lru_cache(maxsize=4096)(self.score_tour_price_category)
 
     def calculate_traffic_tier(self, monthly_visits):
         """Determine pricing tier based on monthly traffic."""
-        for (min_traffic, max_traffic), tier_info in self.base_pricing['traffic_tiers'].items():
-            if min_traffic <= monthly_visits < max_traffic:
-                return tier_info
-        return self.base_pricing['traffic_tiers'][(0, 1000)]  # Fallback
+        position = bisect_right(self.tier_lower_bounds, monthly_visits) - 1
+        if position >= 0 and monthly_visits < self.tier_upper_bounds[position]:
+            return self.tier_infos[position]
+        return self.tier_fallback  # Fallback
 
     def estimate_tour_price_category(self, booking_tech, ota_deps, country=None):
-        """Estimate tour price category based on booking technology and market."""
+        """Estimate tour price category based on booking technology and market (cached per input)."""
+        try:
+            hash((booking_tech, ota_deps, country))
+        except TypeError:
+            # Unhashable input can't be a cache key - score it directly
+            return self.score_tour_price_category(booking_tech, ota_deps, country)
+        return self.cached_price_category(booking_tech, ota_deps, country)
+
+    def score_tour_price_category(self, booking_tech, ota_deps, country=None):
+        """Score booking technology, OTA presence and market into a price category."""
         score = 0
         
         # Booking technology sophistication
-        premium_tech = ['fareharbor', 'regiondo', 'trekksoft', 'bokun']
-        mid_tech = ['bookeo', 'checkfront', 'rezdy', 'shopify']
-        
-        if any(tech in booking_tech for tech in premium_tech):
+        if any(tech in booking_tech for tech in PREMIUM_BOOKING_TECH):
             score += 3
-        elif any(tech in booking_tech for tech in mid_tech):
+        elif any(tech in booking_tech for tech in MID_BOOKING_TECH):
             score += 2
-        elif 'woocommerce' in booking_tech or 'stripe' in booking_tech:
+        elif any(tech in booking_tech for tech in BASIC_BOOKING_TECH):
             score += 1
         
         # OTA presence (premium OTAs = higher price point)
-        premium_otas = ['viator', 'getyourguide', 'tripadvisor']
-        if any(ota in ota_deps for ota in premium_otas):
+        if any(ota in ota_deps for ota in PREMIUM_OTAS):
             score += 2
         
         # Market indicators (if available)
-        premium_markets = ['US', 'UK', 'AU', 'CH', 'NO', 'DK']
-        mid_markets = ['CA', 'DE', 'FR', 'NL', 'SE']
-        
-        if country in premium_markets:
+        if country in PREMIUM_MARKETS:
             score += 2
-        elif country in mid_markets:
+        elif country in MID_MARKETS:
             score += 1
         
         # Categorize based on score
@@ -237,6 +294,421 @@ class GamificationPricingCalculator:
             }
         }
 
+    def traffic_tier_table(self):
+        """Traffic tiers as sorted arrays: (lower bounds, upper bounds, multipliers, names, fallback position)."""
+        lower_bounds = np.array(self.tier_lower_bounds, dtype=float)
+        upper_bounds = np.array(self.tier_upper_bounds, dtype=float)
+        multipliers = np.array([tier_info['multiplier'] for tier_info in self.tier_infos], dtype=float)
+        names = np.array([tier_info['name'] for tier_info in self.tier_infos], dtype=object)
+        fallback = self.tier_infos.index(self.tier_fallback)
+        return lower_bounds, upper_bounds, multipliers, names, fallback
+
+    def calculate_traffic_tier_indices(self, monthly_visits):
+        """Vectorized calculate_traffic_tier: tier position per visit count (searchsorted)."""
+        visits = np.asarray(monthly_visits, dtype=float)
+        lower_bounds, upper_bounds, _, _, fallback = self.traffic_tier_table()
+        
+        tier_idx = np.searchsorted(lower_bounds, visits, side='right') - 1
+        # Outside every tier (negative, NaN or a gap) -> same fallback as the scalar lookup
+        inside = (tier_idx >= 0) & (visits < upper_bounds[np.clip(tier_idx, 0, None)])
+        return np.where(inside, tier_idx, fallback)
+
+    def estimate_tour_price_categories(self, booking_tech, ota_deps):
+        """Vectorized estimate_tour_price_category (without country) for whole columns.
+        
+        Only the distinct strings are scanned; results are mapped back per row.
+        
+        Returns:
+            tuple: (category names array, average tour price array)
+        """
+        def contains_any(values, tokens):
+            return values.str.contains('|'.join(re.escape(token) for token in tokens), regex=True).to_numpy()
+        
+        tech_codes, tech_values = factorize_as_str(booking_tech)
+        tech_scores = np.select(
+            [contains_any(tech_values, PREMIUM_BOOKING_TECH), contains_any(tech_values, MID_BOOKING_TECH),
+             contains_any(tech_values, BASIC_BOOKING_TECH)],
+            [3, 2, 1], default=0
+        )
+        
+        ota_codes, ota_values = factorize_as_str(ota_deps)
+        ota_scores = np.where(contains_any(ota_values, PREMIUM_OTAS), 2, 0)
+        
+        score = tech_scores[tech_codes] + ota_scores[ota_codes]
+        
+        categories = np.array(['budget', 'mid_range', 'premium', 'luxury'], dtype=object)
+        category_idx = np.searchsorted([2, 4, 6], score, side='right')
+        avg_prices = np.array([np.mean(self.benchmarks['price_ranges'][category]) for category in categories])
+        return categories[category_idx], avg_prices[category_idx]
+
+    def ota_token_matrix(self, ota_deps):
+        """Which OTA tokens each row mentions, plus its OTA booking share.
+        
+        Each distinct dependency string is matched against every OTA token once.
+        
+        Returns:
+            tuple: (rows x tokens boolean matrix, OTA booking share array)
+        """
+        codes, values = factorize_as_str(ota_deps)
+        
+        tokens = list(self.benchmarks['ota_commission_rates'].keys())
+        lowered = values.str.lower()
+        detected = np.column_stack([lowered.str.contains(token, regex=False).to_numpy() for token in tokens])
+        
+        dependent = ((values != '') & (values != 'None detected')).to_numpy()
+        ota_shares = np.where(dependent, 0.60, 0.30)
+        return detected[codes], ota_shares[codes]
+
+    def average_commission_rates(self, detected, rates):
+        """Average detected commission rate per row via the token-to-rate matrix.
+        
+        Args:
+            detected (np.ndarray): rows x tokens matrix from ota_token_matrix
+            rates (np.ndarray): Rate per token, or samples x tokens for simulated rates
+        
+        Returns:
+            np.ndarray: Rate per row, or samples x rows
+        """
+        tokens = list(self.benchmarks['ota_commission_rates'].keys())
+        average_rate = rates[..., tokens.index('average')]
+        detected_count = detected.sum(axis=1)
+        rate_sum = rates @ detected.T.astype(float)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(detected_count > 0, rate_sum / detected_count, np.expand_dims(average_rate, -1))
+
+    def ota_commission_arrays(self, ota_deps):
+        """Vectorized OTA inputs: (OTA booking share, average commission rate) per row."""
+        detected, ota_shares = self.ota_token_matrix(ota_deps)
+        rates = np.array(list(self.benchmarks['ota_commission_rates'].values()), dtype=float)
+        return ota_shares, self.average_commission_rates(detected, rates)
+
+    def benefit_arrays(self, visits, avg_tour_prices, ota_shares, commission_rates):
+        """Vectorized gamification value and OTA savings (inputs broadcast against each other).
+        
+        Returns:
+            dict: current_monthly_revenue, additional_monthly_revenue,
+                annual_commission_loss and total_annual_benefit arrays
+        """
+        # OTA savings
+        baseline_conversion = self.benchmarks['baseline_conversion_rate']
+        ota_bookings = visits * baseline_conversion * ota_shares
+        annual_commission_loss = ota_bookings * avg_tour_prices * commission_rates * 12
+        
+        # Gamification value
+        current_monthly_revenue = visits * baseline_conversion * avg_tour_prices
+        improved_conversion_rate = baseline_conversion * (1 + self.benchmarks['gamification_lift'])
+        improved_monthly_revenue = visits * improved_conversion_rate * avg_tour_prices
+        additional_monthly_revenue = improved_monthly_revenue - current_monthly_revenue
+        
+        return {
+            'current_monthly_revenue': current_monthly_revenue,
+            'additional_monthly_revenue': additional_monthly_revenue,
+            'annual_commission_loss': annual_commission_loss,
+            'total_annual_benefit': additional_monthly_revenue * 12 + annual_commission_loss * 0.25  # 25% reduction in OTA dependency
+        }
+
+    def tier_fee_arrays(self, tier_idx):
+        """Setup and monthly fees per tier position ('moderate' complexity, calculate_pricing rounding)."""
+        _, _, multipliers, _, _ = self.traffic_tier_table()
+        complexity_multiplier = self.benchmarks['complexity_multipliers']['moderate']
+        setup_fees = self.base_pricing['setup_fee_base'] * multipliers[tier_idx] * complexity_multiplier
+        monthly_fees = self.base_pricing['monthly_base'] * multipliers[tier_idx]
+        setup_fees = (np.ceil(setup_fees / 100) * 100).astype(np.int64)
+        monthly_fees = (np.ceil(monthly_fees / 25) * 25).astype(np.int64)
+        return setup_fees, monthly_fees
+
+    def calculate_value_propositions(self, prospects):
+        """
+        Batch generate_value_proposition over a whole prospect frame
+        
+        Every step runs as column operations: tiers via searchsorted, OTA rates via
+        a token-to-rate matrix and fee rounding via np.ceil.
+        
+        Args:
+            prospects (pd.DataFrame): Columns company_name, monthly_visits,
+                booking_technology and ota_dependencies (see prospect_frame)
+        
+        Returns:
+            pd.DataFrame: One flat value proposition row per prospect
+        """
+        visits = prospects['monthly_visits'].to_numpy(dtype=float)
+        price_categories, avg_tour_prices = self.estimate_tour_price_categories(
+            prospects['booking_technology'], prospects['ota_dependencies']
+        )
+        
+        ota_shares, avg_commission_rates = self.ota_commission_arrays(prospects['ota_dependencies'])
+        benefits = self.benefit_arrays(visits, avg_tour_prices, ota_shares, avg_commission_rates)
+        current_monthly_revenue = benefits['current_monthly_revenue']
+        additional_monthly_revenue = benefits['additional_monthly_revenue']
+        annual_commission_loss = benefits['annual_commission_loss']
+        total_annual_benefit = benefits['total_annual_benefit']
+        
+        # Pricing ('moderate' complexity, no custom features)
+        _, _, _, names, _ = self.traffic_tier_table()
+        tier_idx = self.calculate_traffic_tier_indices(visits)
+        setup_fees, monthly_fees = self.tier_fee_arrays(tier_idx)
+        total_year_1 = setup_fees + monthly_fees * 12
+        
+        # ROI
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roi_percentage = (total_annual_benefit / total_year_1) * 100
+            payback_months = total_year_1 / (total_annual_benefit / 12)
+        
+        return pd.DataFrame({
+            'Company_Name': prospects['company_name'].to_numpy(),
+            'Monthly_Visits': prospects['monthly_visits'].to_numpy(),
+            'Price_Category': price_categories,
+            'Avg_Tour_Price': avg_tour_prices,
+            'Current_Monthly_Revenue': current_monthly_revenue,
+            'Additional_Monthly_Revenue': additional_monthly_revenue,
+            'Additional_Annual_Revenue': additional_monthly_revenue * 12,
+            'Annual_OTA_Loss': annual_commission_loss,
+            'Tier_Name': names[tier_idx],
+            'Setup_Fee': setup_fees,
+            'Monthly_Fee': monthly_fees,
+            'Total_Year_1_Cost': total_year_1,
+            'Total_Annual_Benefit': total_annual_benefit,
+            'ROI_Percentage': roi_percentage,
+            'Payback_Months': payback_months,
+            'Profitable_Year_1': total_annual_benefit > total_year_1
+        }, index=prospects.index)
+
+    def draw_assumption(self, rng, name, size):
+        """Draw samples of one uncertain assumption from its configured distribution."""
+        kind, *params = self.uncertainty[name]
+        if kind == 'triangular':
+            return rng.triangular(*params, size=size)
+        if kind == 'uniform':
+            return rng.uniform(*params, size=size)
+        if kind == 'normal':
+            return rng.normal(*params, size=size)
+        raise ValueError(f"Unknown distribution '{kind}' for {name}")
+
+    def sample_assumptions(self, n_samples, seed=None):
+        """
+        Draw n_samples market scenarios (one value per assumption per scenario)
+        
+        Returns:
+            dict: conversion, lift and ota_reduction arrays (samples,) and
+                commission_rates (samples x OTA tokens)
+        """
+        rng = np.random.default_rng(seed)
+        base_rates = np.array(list(self.benchmarks['ota_commission_rates'].values()), dtype=float)
+        commission_shift = self.draw_assumption(rng, 'ota_commission_shift', n_samples)
+        
+        return {
+            'conversion': np.clip(self.draw_assumption(rng, 'baseline_conversion_rate', n_samples), 0, None),
+            'lift': self.draw_assumption(rng, 'gamification_lift', n_samples),
+            'commission_rates': np.clip(base_rates + commission_shift[:, None], 0, 1),
+            'ota_reduction': np.clip(self.draw_assumption(rng, 'ota_reduction', n_samples), 0, 1)
+        }
+
+    def simulate_roi(self, prospects, n_samples=10000, seed=None, percentiles=(5, 50, 95), max_block_cells=2_000_000):
+        """
+        Monte Carlo ROI sensitivity for every prospect
+        
+        Each sample is one market scenario drawn from self.uncertainty and is shared
+        by all prospects. ROI and payback are evaluated as samples x prospects
+        arrays, processed in prospect blocks of at most max_block_cells values so
+        10k prospects x 10k samples peaks at about 125 MB.
+        
+        Args:
+            prospects (pd.DataFrame): Prospect frame (see prospect_frame)
+            n_samples (int): Scenarios to draw
+            seed (int): Random seed for reproducible runs
+            percentiles (tuple): ROI/payback percentiles to report
+            max_block_cells (int): Upper bound on samples x prospects per block
+        
+        Returns:
+            pd.DataFrame: ROI_P*/Payback_P* columns and Prob_Profitable_Year_1 per prospect
+        """
+        visits = prospects['monthly_visits'].to_numpy(dtype=float)
+        _, avg_tour_prices = self.estimate_tour_price_categories(
+            prospects['booking_technology'], prospects['ota_dependencies']
+        )
+        detected, ota_shares = self.ota_token_matrix(prospects['ota_dependencies'])
+        
+        # Fees do not depend on the uncertain assumptions
+        pricing = self.calculate_value_propositions(prospects)
+        total_year_1 = pricing['Total_Year_1_Cost'].to_numpy(dtype=float)
+        
+        draws = self.sample_assumptions(n_samples, seed)
+        conversion = draws['conversion'][:, None]
+        lift = draws['lift'][:, None]
+        ota_reduction = draws['ota_reduction'][:, None]
+        
+        quantiles = np.asarray(percentiles, dtype=float) / 100
+        roi_percentiles = np.empty((len(quantiles), len(prospects)))
+        payback_percentiles = np.empty((len(quantiles), len(prospects)))
+        prob_profitable = np.empty(len(prospects))
+        
+        block_size = max(1, max_block_cells // max(n_samples, 1))
+        for start in range(0, len(prospects), block_size):
+            block = slice(start, start + block_size)
+            commission_rates = self.average_commission_rates(detected[block], draws['commission_rates'])
+            
+            # Annual benefit = extra bookings from the lift + recovered OTA commissions
+            monthly_bookings = conversion * (visits[block] * avg_tour_prices[block])
+            annual_benefit = 12 * monthly_bookings * (lift + ota_shares[block] * commission_rates * ota_reduction)
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                roi = annual_benefit / total_year_1[block] * 100
+                payback = total_year_1[block] / (annual_benefit / 12)
+            
+            roi_percentiles[:, block] = column_quantiles(roi, quantiles)
+            payback_percentiles[:, block] = column_quantiles(payback, quantiles)
+            prob_profitable[block] = (annual_benefit > total_year_1[block]).mean(axis=0)
+        
+        columns = {'Company_Name': prospects['company_name'].to_numpy()}
+        for position, percentile in enumerate(percentiles):
+            columns[f'ROI_P{percentile:g}'] = roi_percentiles[position]
+        for position, percentile in enumerate(percentiles):
+            columns[f'Payback_P{percentile:g}'] = payback_percentiles[position]
+        columns['Prob_Profitable_Year_1'] = prob_profitable
+        return pd.DataFrame(columns, index=prospects.index)
+
+    def sweep_pricing(self, prospects, setup_fee_base=None, monthly_base=None, tier_multipliers=None):
+        """
+        What-if sweep over pricing parameters for the whole prospect set
+        
+        Every combination of the given values is one grid point. Fees for all grid
+        points and prospects are computed in one broadcast (grid x prospects);
+        benefits do not depend on pricing and are computed once.
+        
+        Args:
+            prospects (pd.DataFrame): Prospect frame (see prospect_frame)
+            setup_fee_base (list): Setup fee bases to try (default: current)
+            monthly_base (list): Monthly bases to try (default: current)
+            tier_multipliers (dict): Tier name -> list of multipliers to try
+        
+        Returns:
+            dict: 'grid' (one summary row per grid point), 'roi' and 'payback'
+                (grid x prospects arrays) and 'company_names'
+        """
+        _, _, multipliers, names, _ = self.traffic_tier_table()
+        tier_names = list(names)
+        tier_multipliers = tier_multipliers or {}
+        unknown = set(tier_multipliers) - set(tier_names)
+        if unknown:
+            raise ValueError(f"Unknown traffic tiers: {', '.join(sorted(unknown))}")
+        
+        # Cartesian grid of parameter values (one row per grid point)
+        axes = {
+            'setup_fee_base': setup_fee_base or [self.base_pricing['setup_fee_base']],
+            'monthly_base': monthly_base or [self.base_pricing['monthly_base']]
+        }
+        for position, name in enumerate(tier_names):
+            axes[f'{name}_multiplier'] = tier_multipliers.get(name, [multipliers[position]])
+        mesh = np.meshgrid(*[np.asarray(values, dtype=float) for values in axes.values()], indexing='ij')
+        grid = pd.DataFrame({name: values.ravel() for name, values in zip(axes, mesh)})
+        
+        # Benefits and tiers per prospect do not change across the grid
+        value_props = self.calculate_value_propositions(prospects)
+        annual_benefit = value_props['Total_Annual_Benefit'].to_numpy(dtype=float)
+        tier_idx = self.calculate_traffic_tier_indices(prospects['monthly_visits'].to_numpy(dtype=float))
+        
+        # grid x prospects fees ('moderate' complexity, same rounding as calculate_pricing)
+        grid_multipliers = grid[[f'{name}_multiplier' for name in tier_names]].to_numpy()[:, tier_idx]
+        complexity_multiplier = self.benchmarks['complexity_multipliers']['moderate']
+        setup_fees = grid['setup_fee_base'].to_numpy()[:, None] * grid_multipliers * complexity_multiplier
+        monthly_fees = grid['monthly_base'].to_numpy()[:, None] * grid_multipliers
+        total_year_1 = np.ceil(setup_fees / 100) * 100 + np.ceil(monthly_fees / 25) * 25 * 12
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roi = annual_benefit / total_year_1 * 100
+            payback = total_year_1 / (annual_benefit / 12)
+        
+        grid['Avg_ROI_Percentage'] = np.nanmean(roi, axis=1)
+        grid['Median_ROI_Percentage'] = np.nanmedian(roi, axis=1)
+        grid['Median_Payback_Months'] = np.nanmedian(payback, axis=1)
+        grid['Profitable_Year_1_Share'] = (annual_benefit > total_year_1).mean(axis=1)
+        grid['Total_Year_1_Revenue'] = total_year_1.sum(axis=1)
+        
+        return {
+            'grid': grid,
+            'roi': roi,
+            'payback': payback,
+            'company_names': prospects['company_name'].to_numpy()
+        }
+
+    def build_roi_lookup_table(self, visit_points=None, price_points=None):
+        """
+        Precompute the model over a traffic x tour price grid for interactive_ROI_calculator.html
+        
+        The annual benefit is bilinear in (visits, price), so bilinear interpolation
+        of the grid reproduces the model exactly; fees are a step function of the
+        traffic tier and are stored per tier.
+        
+        Args:
+            visit_points (list): Monthly visit grid (default: log-spaced 100 - 1M plus tier bounds)
+            price_points (list): Tour price grid (default: 10 - 1000 plus price range bounds)
+        
+        Returns:
+            dict: JSON-serializable lookup table
+        """
+        if visit_points is None:
+            tier_bounds = [bound for bound in self.tier_lower_bounds + self.tier_upper_bounds if np.isfinite(bound)]
+            visit_points = np.concatenate([np.logspace(2, 6, 41), tier_bounds])
+        if price_points is None:
+            range_bounds = [bound for price_range in self.benchmarks['price_ranges'].values() for bound in price_range]
+            price_points = np.concatenate([np.linspace(10, 1000, 34), range_bounds])
+        visits = np.unique(np.asarray(visit_points, dtype=float))
+        prices = np.unique(np.asarray(price_points, dtype=float))
+        
+        _, _, multipliers, names, fallback = self.traffic_tier_table()
+        setup_fees, monthly_fees = self.tier_fee_arrays(np.arange(len(names)))
+        average_rate = self.benchmarks['ota_commission_rates']['average']
+        
+        ota_profiles = {}
+        for profile, ota_share in (('ota_dependent', 0.60), ('independent', 0.30)):
+            benefits = self.benefit_arrays(visits[:, None], prices[None, :], ota_share, average_rate)
+            ota_profiles[profile] = {
+                'ota_share': ota_share,
+                'commission_rate': average_rate,
+                'annual_benefit': np.round(benefits['total_annual_benefit'], 4).tolist()
+            }
+        
+        return {
+            'generated_by': 'pricing_value_calculator.py',
+            'model': {
+                'baseline_conversion_rate': self.benchmarks['baseline_conversion_rate'],
+                'gamification_lift': self.benchmarks['gamification_lift'],
+                'ota_reduction': 0.25,
+                'complexity': 'moderate'
+            },
+            'tiers': [
+                {
+                    'name': names[position],
+                    'min_visits': self.tier_lower_bounds[position],
+                    'max_visits': self.tier_upper_bounds[position] if np.isfinite(self.tier_upper_bounds[position]) else None,
+                    'multiplier': float(multipliers[position]),
+                    'setup_fee': int(setup_fees[position]),
+                    'monthly_fee': int(monthly_fees[position]),
+                    'total_year_1': int(setup_fees[position] + monthly_fees[position] * 12)
+                }
+                for position in range(len(names))
+            ],
+            'fallback_tier': fallback,
+            'price_categories': [
+                {'name': category, 'min_price': low, 'max_price': high, 'avg_tour_price': float(np.mean((low, high)))}
+                for category, (low, high) in self.benchmarks['price_ranges'].items()
+            ],
+            'visits': visits.tolist(),
+            'prices': prices.tolist(),
+            'ota_profiles': ota_profiles
+        }
+
+    def export_roi_lookup_table(self, output_json='roi_lookup_table.json', visit_points=None, price_points=None):
+        """Write build_roi_lookup_table to JSON for the interactive calculator page."""
+        table = self.build_roi_lookup_table(visit_points, price_points)
+        with open(output_json, 'w') as f:
+            json.dump(table, f, separators=(',', ':'))
+        
+        print(f"✅ ROI lookup table: {len(table['visits'])} traffic x {len(table['prices'])} price points, {len(table['tiers'])} tiers")
+        print(f"📁 Saved to: {output_json} (place it next to interactive_ROI_calculator.html)")
+        return table
+
     def create_proposal_summary(self, value_prop):
         """Create a formatted proposal summary."""
         vp = value_prop
@@ -286,53 +758,47 @@ class GamificationPricingCalculator:
 """
         return summary
 
-def process_prospect_csv(csv_file, output_file):
-    """Process a CSV of prospects and generate value propositions."""
+def prospect_frame(df):
+    """Pick the calculator inputs out of a prospect table (same defaults as the per-row path)."""
+    def column_or(names, default):
+        for name in names:
+            if name in df.columns:
+                return df[name]
+        return pd.Series(default, index=df.index)
+    
+    fallback_names = [f'Company {index+1}' for index in df.index]
+    
+    return pd.DataFrame({
+        'company_name': column_or(['Company Name'], fallback_names),
+        'monthly_visits': column_or(['Monthly_Visits', 'monthly_visits'], 2000),
+        'booking_technology': column_or(['booking_technology_detailed'], '').map(str),
+        'ota_dependencies': column_or(['ota_dependencies_detailed'], '').map(str)
+    }, index=df.index)
+
+def process_prospect_csv(csv_file, output_file, n_samples=0, seed=None):
+    """Process a CSV of prospects and generate value propositions.
+    
+    With n_samples > 0, Monte Carlo ROI/payback percentiles are added per company.
+    """
     calculator = GamificationPricingCalculator()
     
     # Load data
-    df = pd.read_csv(csv_file)
+    df = read_table(csv_file)
+    prospects = prospect_frame(df)
     
-    results = []
+    # Whole frame at once - no per-row value proposition calls
+    results_df = calculator.calculate_value_propositions(prospects)
+    results_df = results_df.drop(columns=['Tier_Name'])
     
-    for index, row in df.iterrows():
-        # Extract relevant data
-        company_data = {
-            'company_name': row.get('Company Name', f'Company {index+1}'),
-            'monthly_visits': row.get('Monthly_Visits', row.get('monthly_visits', 2000)),
-            'booking_technology': str(row.get('booking_technology_detailed', '')),
-            'ota_dependencies': str(row.get('ota_dependencies_detailed', ''))
-        }
-        
-        # Generate value proposition
-        value_prop = calculator.generate_value_proposition(company_data)
-        
-        # Flatten for CSV output
-        result_row = {
-            'Company_Name': value_prop['company_name'],
-            'Monthly_Visits': value_prop['monthly_visits'],
-            'Price_Category': value_prop['price_category'],
-            'Avg_Tour_Price': value_prop['avg_tour_price'],
-            'Current_Monthly_Revenue': value_prop['gamification_value']['current_monthly_revenue'],
-            'Additional_Monthly_Revenue': value_prop['gamification_value']['additional_monthly_revenue'],
-            'Additional_Annual_Revenue': value_prop['gamification_value']['additional_annual_revenue'],
-            'Annual_OTA_Loss': value_prop['ota_analysis']['annual_commission_loss'],
-            'Setup_Fee': value_prop['pricing']['setup_fee'],
-            'Monthly_Fee': value_prop['pricing']['monthly_fee'],
-            'Total_Year_1_Cost': value_prop['pricing']['total_year_1'],
-            'Total_Annual_Benefit': value_prop['roi_analysis']['total_annual_benefit'],
-            'ROI_Percentage': value_prop['roi_analysis']['roi_percentage'],
-            'Payback_Months': value_prop['roi_analysis']['payback_months'],
-            'Profitable_Year_1': value_prop['roi_analysis']['break_even_year_1']
-        }
-        
-        results.append(result_row)
+    if n_samples:
+        print(f"🎲 Simulating {n_samples:,} scenarios per company...")
+        simulation = calculator.simulate_roi(prospects, n_samples=n_samples, seed=seed)
+        results_df = results_df.join(simulation.drop(columns=['Company_Name']))
     
     # Save results
-    results_df = pd.DataFrame(results)
-    results_df.to_csv(output_file, index=False)
+    write_table(results_df, output_file)
     
-    print(f"✅ Value propositions generated for {len(results)} companies")
+    print(f"✅ Value propositions generated for {len(results_df)} companies")
     print(f"📁 Results saved to: {output_file}")
     
     # Print summary statistics
@@ -341,18 +807,58 @@ def process_prospect_csv(csv_file, output_file):
     avg_payback = results_df['Payback_Months'].mean()
     
     print(f"\n📊 SUMMARY STATISTICS:")
-    print(f"   Profitable in Year 1: {profitable_companies}/{len(results)} companies ({profitable_companies/len(results)*100:.1f}%)")
+    print(f"   Profitable in Year 1: {profitable_companies}/{len(results_df)} companies ({profitable_companies/len(results_df)*100:.1f}%)")
     print(f"   Average ROI: {avg_roi:.0f}%")
     print(f"   Average Payback: {avg_payback:.1f} months")
     
+    if n_samples:
+        print(f"   Median ROI range (P5-P95): {results_df['ROI_P5'].median():.0f}% - {results_df['ROI_P95'].median():.0f}%")
+        print(f"   Average chance of Year 1 profit: {results_df['Prob_Profitable_Year_1'].mean()*100:.1f}%")
+    
     return results_df
 
+def sweep_prospect_csv(csv_file, output_prefix, setup_fee_base=None, monthly_base=None, tier_multipliers=None):
+    """Run a pricing what-if sweep over a prospect CSV.
+    
+    Saves {output_prefix}_summary.csv (one row per grid point) and
+    {output_prefix}_cube.npz (ROI/payback arrays, grid x prospects).
+    """
+    calculator = GamificationPricingCalculator()
+    prospects = prospect_frame(read_table(csv_file))
+    
+    sweep = calculator.sweep_pricing(prospects, setup_fee_base, monthly_base, tier_multipliers)
+    grid = sweep['grid']
+    
+    summary_file = f"{output_prefix}_summary.csv"
+    cube_file = f"{output_prefix}_cube.npz"
+    write_table(grid, summary_file)
+    np.savez_compressed(
+        cube_file,
+        roi=sweep['roi'].astype(np.float32),
+        payback=sweep['payback'].astype(np.float32),
+        company_names=sweep['company_names'].astype(str),
+        grid_columns=np.array(grid.columns, dtype=str),
+        grid=grid.to_numpy(dtype=float)
+    )
+    
+    print(f"✅ Evaluated {len(grid)} pricing scenarios x {len(prospects)} companies")
+    print(f"📁 Summary saved to: {summary_file}")
+    print(f"📁 ROI/payback cube saved to: {cube_file}")
+    
+    print(f"\n📊 SCENARIOS:")
+    for _, point in grid.iterrows():
+        print(f"   Setup base ${point['setup_fee_base']:,.0f} | Monthly base ${point['monthly_base']:,.0f} | "
+              f"Median ROI {point['Median_ROI_Percentage']:.0f}% | Profitable {point['Profitable_Year_1_Share']*100:.1f}% | "
+              f"Year 1 revenue ${point['Total_Year_1_Revenue']:,.0f}")
+    
+    return sweep
+
 def main():
     """Main function for value calculation."""
     print("💰 GAMIFICATION PRICING & VALUE CALCULATOR")
     print("=" * 60)
     
-    choice = input("Choose option:\n1. Single company analysis\n2. Process CSV file\nEnter choice (1 or 2): ").strip()
+    choice = input("Choose option:\n1. Single company analysis\n2. Process CSV file\n3. Process CSV file with ROI uncertainty (Monte Carlo)\n4. Pricing what-if sweep over CSV file\n5. Export ROI lookup table for interactive_ROI_calculator.html\nEnter choice (1-5): ").strip()
     
     if choice == '1':
         # Single company analysis
@@ -385,6 +891,32 @@ def main():
         
         process_prospect_csv(csv_file, output_file)
     
+    elif choice == '3':
+        # CSV processing with Monte Carlo sensitivity
+        csv_file = input("Enter CSV filename: ").strip()
+        output_file = input("Output filename (default: value_propositions_simulated.csv): ").strip() or 'value_propositions_simulated.csv'
+        n_samples = int(input("Scenarios per company (default: 10000): ").strip() or 10000)
+        
+        process_prospect_csv(csv_file, output_file, n_samples=n_samples)
+    
+    elif choice == '4':
+        # Pricing what-if sweep
+        csv_file = input("Enter CSV filename: ").strip()
+        setup_values = input("Setup fee bases to try, comma separated (default: current): ").strip()
+        monthly_values = input("Monthly bases to try, comma separated (default: current): ").strip()
+        output_prefix = input("Output prefix (default: pricing_sweep): ").strip() or 'pricing_sweep'
+        
+        sweep_prospect_csv(
+            csv_file, output_prefix,
+            setup_fee_base=[float(value) for value in setup_values.split(',')] if setup_values else None,
+            monthly_base=[float(value) for value in monthly_values.split(',')] if monthly_values else None
+        )
+    
+    elif choice == '5':
+        # Lookup table for the interactive calculator page
+        output_json = input("Output filename (default: roi_lookup_table.json): ").strip() or 'roi_lookup_table.json'
+        GamificationPricingCalculator().export_roi_lookup_table(output_json)
+    
     else:
         print("Invalid choice")
 
@@ -0,0 +1,170 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36'
+
+# Child sitemaps worth reading first when a site publishes a sitemap index
+SITEMAP_PREFERENCES = ('tour', 'product', 'experience', 'activit', 'page', 'booking')
+SITEMAP_LOW_VALUE = ('post', 'image', 'video', 'author', 'tag', 'category')
+
+class SiteDiscovery:
+    """
+    Learn a site's pages from robots.txt and its sitemaps, without a browser
+
+    Fetches run on a small dedicated thread pool so slow servers never hold
+    the event loop or the default executor; callers wait at most max_wait
+    seconds for a site. Parsed URL lists (already filtered by robots.txt) are
+    cached on disk per host for ttl_hours, so a repeat run reuses them. Only
+    definite answers are cached: a lookup where any fetch timed out or failed
+    to connect is retried on the next run.
+    """
+
+    def __init__(self, cache_dir='site_discovery_cache', ttl_hours=168, timeout=10, max_wait=5, max_urls=5000,
+                 max_sitemaps=5, max_bytes=10 * 1024**2, max_workers=16, metrics=None):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_hours * 3600
+        self.timeout = timeout
+        self.max_wait = max_wait
+        self.max_urls = max_urls
+        self.max_sitemaps = max_sitemaps
+        self.max_bytes = max_bytes
+        self.metrics = metrics
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='site-discovery')
+
+    def _increment(self, name):
+        if self.metrics is not None:
+            self.metrics.increment(name)
+
+    def cache_path(self, host):
+        return os.path.join(self.cache_dir, re.sub(r'[^a-z0-9.-]', '_', host.lower()) + '.json')
+
+    def read_cache(self, host):
+        path = self.cache_path(host)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get('fetched_at', 0) > self.ttl_seconds:
+            return None
+        return entry.get('urls', [])
+
+    def write_cache(self, host, urls):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.cache_path(host)
+        temp_file = f"{path}.{os.getpid()}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump({'fetched_at': time.time(), 'urls': urls}, f)
+        os.replace(temp_file, path)
+
+    def fetch(self, url):
+        """
+        Fetch one robots.txt or sitemap
+
+        Returns:
+            tuple: (body of a 2xx response, gunzipped when needed, or None;
+                    True when the answer is definite - a 2xx or a 404)
+        """
+        request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read(self.max_bytes)
+                gzipped = response.headers.get('Content-Encoding') == 'gzip' or url.endswith('.gz')
+        except urllib.error.HTTPError as e:
+            logger.debug(f"Discovery fetch failed for {url}: {e}")
+            return None, e.code == 404
+        except Exception as e:
+            logger.debug(f"Discovery fetch failed for {url}: {e}")
+            return None, False
+        if gzipped or body[:2] == b'\x1f\x8b':
+            try:
+                body = gzip.decompress(body)
+            except OSError:
+                return None, True
+        return body, True
+
+    def parse_sitemap(self, body):
+        """(page URLs, child sitemap URLs) from a urlset or sitemapindex document."""
+        try:
+            root = ET.fromstring(body)
+        except ET.ParseError:
+            return [], []
+        locs = [element.text.strip() for element in root.iter() if element.tag.endswith('loc') and element.text]
+        if root.tag.endswith('sitemapindex'):
+            return [], locs
+        return locs, []
+
+    def rank_sitemaps(self, sitemap_urls):
+        def preference(url):
+            url = url.lower()
+            return (sum(keyword in url for keyword in SITEMAP_PREFERENCES)
+                    - sum(keyword in url for keyword in SITEMAP_LOW_VALUE))
+        return sorted(sitemap_urls, key=preference, reverse=True)
+
+    def discover_sync(self, base_url):
+        """Fetch robots.txt and sitemaps for the site's host (blocking); returns (urls, definite)."""
+        parts = urlsplit(base_url)
+        origin = f"{parts.scheme or 'https'}://{parts.netloc}"
+
+        robots = RobotFileParser()
+        robots_body, definite = self.fetch(urljoin(origin, '/robots.txt'))
+        robots.parse(robots_body.decode('utf-8', 'replace').splitlines() if robots_body else [])
+        sitemap_queue = list(robots.site_maps() or []) or [urljoin(origin, '/sitemap.xml')]
+
+        urls = []
+        fetched = 0
+        while sitemap_queue and fetched < self.max_sitemaps and len(urls) < self.max_urls:
+            body, sitemap_definite = self.fetch(sitemap_queue.pop(0))
+            definite = definite and sitemap_definite
+            fetched += 1
+            if not body:
+                continue
+            page_urls, child_sitemaps = self.parse_sitemap(body)
+            urls.extend(page_urls)
+            sitemap_queue = self.rank_sitemaps(sitemap_queue + child_sitemaps)
+
+        allowed = [url for url in urls[:self.max_urls] if robots.can_fetch(USER_AGENT, url)]
+        return list(dict.fromkeys(allowed)), definite
+
+    def lookup(self, base_url):
+        """Cached URL list for the site, fetching and caching it when missing or stale."""
+        host = urlsplit(base_url).netloc
+        if not host:
+            return []
+        cached = self.read_cache(host)
+        if cached is not None:
+            self._increment('discovery_cache_hits_total')
+            return cached
+
+        self._increment('discovery_fetches_total')
+        urls, definite = self.discover_sync(base_url)
+        if not definite:
+            # A timeout or connection error says nothing about the site - try again next run
+            return urls
+        try:
+            self.write_cache(host, urls)
+        except OSError as e:
+            logger.warning(f"Could not cache discovery for {host}: {e}")
+        return urls
+
+    async def discover(self, base_url):
+        """Same-host page URLs listed in the site's sitemaps (robots.txt permitting)."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, self.lookup, base_url)
+        except Exception as e:
+            logger.debug(f"Discovery failed for {base_url}: {e}")
+            return []
@@ -0,0 +1,132 @@
+import os
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    # Parquet/Arrow working files are optional - CSV always works
+    pa = None
+
+# Intermediate files between pipeline stages can be typed and columnar;
+# the final Airtable export stays CSV.
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+
+# Boolean flags as the stages write them; only these spellings are stored as booleans, since
+# they are also what reading back produces ('Yes'/'No' and 'true'/'false' stay strings)
+BOOLEAN_STRINGS = {'True': True, 'False': False}
+
+def table_format(path):
+    """Return 'parquet', 'arrow' or 'csv' based on the file extension."""
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext in PARQUET_EXTENSIONS:
+        return 'parquet'
+    if ext in ARROW_EXTENSIONS:
+        return 'arrow'
+    return 'csv'
+
+def _require_pyarrow(path):
+    if pa is None:
+        raise ImportError(f"pyarrow is required to read/write {path} - pip install pyarrow, or use a .csv file")
+
+def _to_typed_frame(df):
+    """Give every column a type Arrow can store without guessing.
+
+    Columns holding only 'True'/'False' strings become nullable booleans;
+    object columns mixing numbers with other types become strings. Ints
+    mixed with floats are left to Arrow, which stores them as floats.
+    """
+    typed = df.copy()
+    for col in typed.columns:
+        series = typed[col]
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            continue
+
+        values = series.dropna()
+        if len(values) and values.map(lambda value: isinstance(value, bool) or value in BOOLEAN_STRINGS).all():
+            typed[col] = series.map(lambda value: value if pd.isna(value) or isinstance(value, bool) else BOOLEAN_STRINGS[value]).astype('boolean')
+        elif series.dtype == object and pd.api.types.infer_dtype(values, skipna=True) not in ('string', 'empty', 'integer', 'floating', 'mixed-integer-float', 'boolean'):
+            typed[col] = series.map(lambda value: value if pd.isna(value) else str(value)).astype('string')
+    return typed
+
+def _from_typed_frame(df, bool_as_str):
+    """Optionally turn nullable boolean columns back into the 'True'/'False' strings the stages compare against."""
+    if not bool_as_str:
+        return df
+    for col in df.columns:
+        if pd.api.types.is_bool_dtype(df[col]):
+            df[col] = df[col].map(lambda value: pd.NA if pd.isna(value) else str(bool(value))).astype(object)
+    return df
+
+def read_table(path, columns=None, bool_as_str=False):
+    """
+    Load a pipeline table from CSV, Parquet or Arrow IPC (chosen by extension)
+
+    Args:
+        path (str): Table file
+        columns (list): Only load these columns (column projection)
+        bool_as_str (bool): Return boolean columns as 'True'/'False' strings, for
+            stages that compare against those strings (default: typed booleans)
+
+    Returns:
+        pd.DataFrame: Loaded table
+    """
+    fmt = table_format(path)
+    if fmt == 'csv':
+        return pd.read_csv(path, usecols=columns)
+
+    _require_pyarrow(path)
+    if fmt == 'parquet':
+        df = pq.read_table(path, columns=columns).to_pandas()
+    else:
+        df = feather.read_table(path, columns=columns).to_pandas()
+    return _from_typed_frame(df, bool_as_str)
+
+def write_table(df, path):
+    """
+    Save a pipeline table as CSV, Parquet or Arrow IPC (chosen by extension)
+
+    Args:
+        df (pd.DataFrame): Table to save
+        path (str): Output file
+    """
+    fmt = table_format(path)
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+        return
+
+    _require_pyarrow(path)
+    table = pa.Table.from_pandas(_to_typed_frame(df), preserve_index=False)
+    if fmt == 'parquet':
+        pq.write_table(table, path)
+    else:
+        feather.write_feather(table, path)
+
+def read_table_columns(path):
+    """Column names of a table file without loading its rows."""
+    fmt = table_format(path)
+    if fmt == 'csv':
+        return pd.read_csv(path, nrows=0).columns
+
+    _require_pyarrow(path)
+    if fmt == 'parquet':
+        return pd.Index(pq.read_schema(path).names)
+    return pd.Index(feather.read_table(path, memory_map=True).schema.names)
+
+def iter_table_chunks(path, chunksize, columns=None, bool_as_str=False):
+    """Yield a table file as dataframes of at most chunksize rows."""
+    fmt = table_format(path)
+    if fmt == 'csv':
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=columns)
+        return
+
+    _require_pyarrow(path)
+    if fmt == 'parquet':
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns)
+    else:
+        batches = feather.read_table(path, columns=columns, memory_map=True).to_batches(max_chunksize=chunksize)
+
+    for batch in batches:
+        yield _from_typed_frame(batch.to_pandas(), bool_as_str)
@@ -0,0 +1,34 @@
+import pytest
+
+from page_document import PageDocument
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from continuous_analyzer import ContinuousTourOperatorAnalyzer
+    return ContinuousTourOperatorAnalyzer(prefilter_dns=False)
+
+def ota_verdict(analyzer, html, url='https://www.acme.com/'):
+    return analyzer._detect_unknown_ota_integration(PageDocument(html, '', url))
+
+def test_two_outbound_booking_links_are_a_redirect(analyzer):
+    html = '<a href="https://fareharbor.com/acme/book">Book</a><a href="https://tickets.example.org/acme">Tickets</a>'
+    assert ota_verdict(analyzer, html) == ['external_booking_redirects']
+
+def test_each_keyword_in_one_link_counts_once(analyzer):
+    html = '<a href="https://partner.example.org/book-tickets">Book tickets</a>'
+    assert ota_verdict(analyzer, html) == ['external_booking_redirects']
+
+def test_one_outbound_booking_link_is_not_enough(analyzer):
+    html = '<a href="https://partner.example.org/booking">Book</a><a href="/booking">Book here</a>'
+    assert ota_verdict(analyzer, html) == []
+
+def test_own_subdomains_are_not_external(analyzer):
+    html = '<a href="https://book.acme.com/">Book</a><a href="https://tickets.acme.com/reserve">Reserve</a>'
+    assert ota_verdict(analyzer, html) == []
+
+def test_keywords_outside_the_link_do_not_count(analyzer):
+    # The old greedy href regex matched 'book' anywhere after an external link
+    html = ('<a href="https://www.instagram.com/acme">Instagram</a><p>Book a tour today</p>'
+            '<a href="https://www.facebook.com/acme">Facebook</a><div class="booking-widget"></div>')
+    assert ota_verdict(analyzer, html) == []
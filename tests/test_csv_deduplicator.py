@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from csv_deduplicator import find_fuzzy_duplicates, fuzzy_deduplicate, score_record_completeness, smart_deduplicate
+
+@pytest.mark.parametrize('first, second', [
+    ('https://alpine.ne.jp', 'https://www.sakura.ne.jp/'),
+    ('acme.or.kr', 'kayak.or.kr'),
+    ('http://acme.gov.uk/tours', 'http://rivers.gov.uk'),
+    ('https://a.b.ac.at', 'https://c.d.ac.at'),
+    ('https://acme.co.uk', 'https://tours.co.uk'),
+])
+def test_distinct_companies_under_multi_part_suffix_are_not_merged(first, second):
+    df = pd.DataFrame({'Company Name': ['Alpine Tours', 'Sakura Kayak'], 'Website URL': [first, second]})
+    labels, merges = find_fuzzy_duplicates(df, 'Company Name', 'Website URL')
+    assert merges == []
+    assert labels.nunique() == 2
+
+def test_same_company_under_multi_part_suffix_is_merged():
+    df = pd.DataFrame({
+        'Company Name': ['Alpine Tours', 'Alpine Adventures KK'],
+        'Website URL': ['https://alpine.ne.jp', 'https://booking.alpine.ne.jp/en/']
+    })
+    labels, merges = find_fuzzy_duplicates(df, 'Company Name', 'Website URL')
+    assert [merge['reason'] for merge in merges] == ['same_domain']
+    assert labels.nunique() == 1
+
+def test_fuzzy_deduplicate_keeps_leads_sharing_only_a_suffix(tmp_path):
+    df = pd.DataFrame({
+        'Company Name': ['Alpine Tours', 'Sakura Kayak'],
+        'Website URL': ['https://alpine.ne.jp', 'https://sakura.ne.jp']
+    })
+    deduplicated = fuzzy_deduplicate(df, 'Company Name', report_csv=str(tmp_path / 'report.csv'))
+    assert list(deduplicated['Company Name']) == ['Alpine Tours', 'Sakura Kayak']
+
+def reference_best_rows(df, key_column, priority_columns):
+    """Row labels the original per-record loop kept (first strictly best score per company)."""
+    kept = []
+    for _, group in df.groupby(key_column):
+        best_label, best_score = None, -1
+        for label, record in group.iterrows():
+            score = 0
+            for col in priority_columns:
+                if pd.notna(record[col]) and str(record[col]).strip() != '':
+                    if col == 'analysis_status' and record[col] == 'COMPLETED':
+                        score += 10
+                    elif col == 'chatbot_type' and record[col] not in ['', 'unknown', 'error']:
+                        score += 5
+                    elif col == 'pages_analyzed' and pd.notna(record[col]) and record[col] > 0:
+                        score += 3
+                    elif col == 'analysis_confidence' and record[col] == 'High':
+                        score += 2
+                    else:
+                        score += 1
+            if pd.notna(record['last_analyzed']):
+                score += 1
+            if score > best_score:
+                best_label, best_score = label, score
+        kept.append(best_label)
+    return kept
+
+def random_leads(seed, rows=400):
+    rng = np.random.default_rng(seed)
+    pick = lambda options: rng.choice(np.array(options, dtype=object), rows)
+    df = pd.DataFrame({
+        'Company Name': pick([f'Company {n}' for n in range(120)] + [None]),
+        'analysis_status': pick(['COMPLETED', 'FAILED', '', '  ', None]),
+        'chatbot_type': pick(['intercom', 'unknown', 'error', '', None]),
+        'prospect_evaluation': pick(['GOOD PROSPECT', 'NOT A PROSPECT', None]),
+        'pages_analyzed': pick([0, 1, 3, None]),
+        'last_analyzed': pick(['2024-05-01 10:00:00', None]),
+        'analysis_confidence': pick(['High', 'Low', None])
+    })
+    df.index = rng.permutation(rows) + 1000
+    return df
+
+@pytest.mark.parametrize('seed', range(5))
+def test_smart_deduplicate_keeps_the_same_rows_as_the_record_loop(seed):
+    df = random_leads(seed)
+    priority_columns = ['analysis_status', 'chatbot_type', 'prospect_evaluation',
+                        'pages_analyzed', 'last_analyzed', 'analysis_confidence']
+    deduplicated = smart_deduplicate(df, 'Company Name')
+    assert list(deduplicated.index) == reference_best_rows(df, 'Company Name', priority_columns)
+
+def test_score_record_completeness_weights():
+    df = pd.DataFrame({
+        'analysis_status': ['COMPLETED', 'FAILED', None],
+        'chatbot_type': ['intercom', 'unknown', ''],
+        'pages_analyzed': [3, 0, None],
+        'analysis_confidence': ['High', 'Low', None],
+        'last_analyzed': ['2024-05-01', None, None]
+    })
+    scores = score_record_completeness(df, list(df.columns))
+    assert scores.tolist() == [10 + 5 + 3 + 2 + 1 + 1, 1 + 1 + 1 + 1, 0]
@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from csv_merger_splitter import CsvPartWriter, merge_csv_files, stream_merge_and_split
+
+def write_inputs(tmp_path, seed, with_key=True):
+    rng = np.random.default_rng(seed)
+    rows = 250
+    key = 'Company Name' if with_key else 'company'
+    main = pd.DataFrame({
+        key: [f'Company {n}' for n in range(rows)],
+        'Website URL': [f'https://company{n}.com' for n in range(rows)],
+        'has_chatbot': rng.choice(np.array(['True', 'False', None], dtype=object), rows),
+        'prospect_evaluation': rng.choice(np.array(['GOOD PROSPECT', 'NOT A PROSPECT', None], dtype=object), rows),
+        'pages_analyzed': rng.integers(0, 4, rows)
+    })
+    classified = main.sample(frac=0.4, random_state=seed)[[key]].copy()
+    if not with_key:
+        classified = main[[]].head(100).assign(note='x')
+    classified['has_chatbot'] = rng.choice(np.array(['True', 'False'], dtype=object), len(classified))
+    classified['still_prospect'] = rng.choice(np.array(['True', 'False', None], dtype=object), len(classified))
+    classified['chatbot_type'] = rng.choice(np.array(['intercom', 'basic_faq', 'unknown'], dtype=object), len(classified))
+
+    main_csv, classification_csv = tmp_path / 'main.csv', tmp_path / 'classified.csv'
+    main.to_csv(main_csv, index=False)
+    classified.to_csv(classification_csv, index=False)
+    return str(main_csv), str(classification_csv)
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('chunksize', [7, 5000])
+@pytest.mark.parametrize('with_key', [True, False])
+def test_stream_merge_equals_in_memory_merge(tmp_path, seed, chunksize, with_key):
+    main_csv, classification_csv = write_inputs(tmp_path, seed, with_key)
+    expected_csv, streamed_csv = tmp_path / 'expected.csv', tmp_path / 'streamed.csv'
+
+    merge_csv_files(main_csv, classification_csv, str(expected_csv))
+    _, total_rows = stream_merge_and_split(main_csv, classification_csv, str(streamed_csv), max_size_mb=None,
+                                           chunksize=chunksize)
+
+    expected, streamed = pd.read_csv(expected_csv), pd.read_csv(streamed_csv)
+    assert total_rows == len(expected)
+    pd.testing.assert_frame_equal(streamed, expected)
+
+def leads_frame(rows=300):
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        'Company Name': [f'Company {n}, "the" tour ✈' for n in range(rows)],
+        'notes': ['line one\nline two' if n % 17 == 0 else 'x' * int(rng.integers(0, 120)) for n in range(rows)],
+        'pages_analyzed': rng.choice(np.array([1, 2, None], dtype=object), rows)
+    })
+
+@pytest.mark.parametrize('chunk_rows', [1, 13, 300])
+def test_part_writer_respects_the_byte_budget_exactly(tmp_path, chunk_rows):
+    df = leads_frame()
+    max_size_mb = 4096 / (1024 * 1024)
+    writer = CsvPartWriter(str(tmp_path / 'leads'), max_size_mb)
+    for start in range(0, len(df), chunk_rows):
+        writer.write_chunk(df.iloc[start:start + chunk_rows])
+    parts = writer.close()
+
+    assert len(parts) > 1
+    assert sum(part['rows'] for part in parts) == len(df)
+    payloads = [open(part['filename'], 'rb').read() for part in parts]
+    header = payloads[0].split(b'\n', 1)[0] + b'\n'
+    for payload in payloads:
+        assert payload.startswith(header)
+        assert len(payload) <= writer.max_bytes
+
+    # Each part was cut only because its next row would not have fitted
+    bodies = [payload[len(header):] for payload in payloads]
+    for payload, next_part in zip(payloads[:-1], parts[1:]):
+        next_row = df.iloc[[int(next_part['companies'].split()[1]) - 1]]
+        next_bytes = next_row.to_csv(index=False, header=False, lineterminator='\n').encode('utf-8')
+        assert len(payload) + len(next_bytes) > writer.max_bytes
+
+    # The parts concatenate back to the original CSV
+    original = df.to_csv(index=False, lineterminator='\n').encode('utf-8')
+    assert header + b''.join(bodies) == original
+    assert os.path.basename(parts[0]['filename']) == f'leads_part_1_of_{len(parts)}.csv'
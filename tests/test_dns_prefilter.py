@@ -0,0 +1,100 @@
+import asyncio
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from dns_prefilter import NXDOMAIN, RESOLVED, TRANSIENT, DnsPrefilter, StubResolver
+
+class CountingResolver(StubResolver):
+    """StubResolver that remembers which hosts it was asked about."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queried = []
+
+    async def __call__(self, host, timeout):
+        self.queried.append(host)
+        return await super().__call__(host, timeout)
+
+ANSWERS = {'example.com': RESOLVED, 'alive.com': RESOLVED, 'dead.com': NXDOMAIN, 'flaky.com': TRANSIENT}
+
+def test_resolve_all_reports_each_outcome():
+    prefilter = DnsPrefilter(resolver=StubResolver(ANSWERS), cache_file=None, canary_hosts=('example.com',))
+    outcomes = asyncio.run(prefilter.resolve_all(['alive.com', 'DEAD.com.', 'flaky.com', 'operator1.localhost']))
+    assert outcomes == {'alive.com': RESOLVED, 'dead.com': NXDOMAIN, 'flaky.com': TRANSIENT, 'operator1.localhost': RESOLVED}
+
+def test_failing_canaries_report_everything_as_transient(tmp_path):
+    cache_file = tmp_path / 'dns_cache.json'
+    prefilter = DnsPrefilter(resolver=StubResolver({'dead.com': NXDOMAIN}), cache_file=str(cache_file),
+                             canary_hosts=('example.com', 'google.com'))
+    outcomes = asyncio.run(prefilter.resolve_all(['dead.com', 'alive.com']))
+    assert outcomes == {'dead.com': TRANSIENT, 'alive.com': TRANSIENT}
+    assert not cache_file.exists()
+
+def test_transient_answers_are_never_cached(tmp_path):
+    cache_file = tmp_path / 'dns_cache.json'
+    prefilter = DnsPrefilter(resolver=StubResolver(ANSWERS), cache_file=str(cache_file), canary_hosts=())
+    asyncio.run(prefilter.resolve_all(['alive.com', 'dead.com', 'flaky.com']))
+    assert set(json.loads(cache_file.read_text())) == {'alive.com', 'dead.com'}
+
+    # A second run asks the resolver about the transient host again, and only about it
+    resolver = CountingResolver(ANSWERS)
+    again = DnsPrefilter(resolver=resolver, cache_file=str(cache_file), canary_hosts=())
+    outcomes = asyncio.run(again.resolve_all(['alive.com', 'dead.com', 'flaky.com']))
+    assert resolver.queried == ['flaky.com']
+    assert outcomes['dead.com'] == NXDOMAIN
+
+def test_cached_answers_expire_after_ttl(tmp_path):
+    cache_file = tmp_path / 'dns_cache.json'
+    now = time.time()
+    cache_file.write_text(json.dumps({'fresh.com': [NXDOMAIN, now - 3600], 'stale.com': [NXDOMAIN, now - 25 * 3600]}))
+
+    resolver = CountingResolver({'fresh.com': RESOLVED, 'stale.com': RESOLVED})
+    prefilter = DnsPrefilter(resolver=resolver, cache_file=str(cache_file), ttl_hours=24, canary_hosts=())
+    outcomes = asyncio.run(prefilter.resolve_all(['fresh.com', 'stale.com']))
+    assert resolver.queried == ['stale.com']
+    assert outcomes == {'fresh.com': NXDOMAIN, 'stale.com': RESOLVED}
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch):
+    # Backups, caches and peak files land in the temporary directory
+    monkeypatch.chdir(tmp_path)
+    from continuous_analyzer import ContinuousTourOperatorAnalyzer
+
+    analyzer = ContinuousTourOperatorAnalyzer()
+    analyzer.dns_prefilter = DnsPrefilter(resolver=StubResolver(ANSWERS), cache_file=None, canary_hosts=())
+    for settings in (analyzer.aggressive_settings, analyzer.conservative_settings, analyzer.patient_settings):
+        settings['delay_between_batches'] = 0
+    analyzer.stats['start_time'] = time.time()
+    return analyzer
+
+def test_dead_domains_never_reach_any_phase(analyzer, monkeypatch):
+    df = pd.DataFrame({
+        'Company Name': ['Alive', 'Dead', 'Dead again', 'Flaky', 'Alive mirror'],
+        'Website URL': ['https://alive.com', 'https://dead.com', 'http://www.dead.com/', 'https://flaky.com', 'alive.com/']
+    })
+    batches = []
+
+    async def fake_process_batch(df, batch_indices, output_csv):
+        # Every crawled row fails once so the conservative and patient retries run too
+        batches.append(list(batch_indices))
+        attempts = sum(batch.count(batch_indices[0]) for batch in batches)
+        for index in batch_indices:
+            df.loc[index, 'has_chatbot'] = 'False' if attempts >= 3 else 'Error: timeout'
+            df.loc[index, 'analysis_status'] = 'COMPLETED' if attempts >= 3 else 'FAILED'
+            analyzer.fan_out_result(df, index)
+
+    monkeypatch.setattr(analyzer, 'process_batch', fake_process_batch)
+    asyncio.run(analyzer.process_phases(df, 'out.csv'))
+
+    crawled = [index for batch in batches for index in batch]
+    assert len(batches) == 3  # phase 1, conservative retry, patient retry
+    assert 1 not in crawled and 2 not in crawled
+    assert sorted(set(crawled)) == [0, 3]
+
+    assert list(df['analysis_status']) == ['COMPLETED', 'DNS_FAILED', 'DNS_FAILED', 'COMPLETED', 'COMPLETED']
+    # The follower on the dead site got the leader's result through fan_out_result
+    assert df.loc[2, 'has_chatbot'] == 'DNS lookup failed'
+    assert analyzer.stats['dns_failed'] == 2
@@ -0,0 +1,12 @@
+from page_document import PageDocument
+
+def test_external_links_use_the_shared_registrable_domain():
+    html = '''
+        <a href="https://book.acme.ne.jp/tours">Own booking subdomain</a>
+        <a href="https://www.sakura.ne.jp/">Other operator on the same suffix</a>
+        <a href="https://www.viator.com/acme">Viator</a>
+        <a href="/contact">Contact</a>
+    '''
+    doc = PageDocument(html, '', 'https://www.acme.ne.jp/')
+    assert doc.registered_domain == 'acme.ne.jp'
+    assert doc.external_links == ['https://www.sakura.ne.jp/', 'https://www.viator.com/acme']
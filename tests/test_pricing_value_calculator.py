@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricing_value_calculator import GamificationPricingCalculator, column_quantiles
+
+BOOKING_TECH = ['', 'fareharbor', 'FareHarbor', 'rezdy', 'bookeo, stripe', 'woocommerce', 'wix', 'regiondo/shopify']
+OTA_DEPENDENCIES = ['', 'None detected', 'viator', 'Viator, GetYourGuide', 'klook', 'expedia|tiqets', 'tripadvisor klook', 'airbnb']
+
+def random_prospects(seed, rows=300):
+    """Prospects mixing tier boundaries, OTA/booking token combinations and letter case."""
+    rng = np.random.default_rng(seed)
+    boundaries = [1, 999, 1000, 4999, 5000, 15000, 49999, 50000, 250000]
+    visits = np.where(rng.random(rows) < 0.3, rng.choice(boundaries, rows), rng.integers(1, 120000, rows))
+    return pd.DataFrame({
+        'company_name': [f'Company {index}' for index in range(rows)],
+        'monthly_visits': visits,
+        'booking_technology': rng.choice(BOOKING_TECH, rows),
+        'ota_dependencies': rng.choice(OTA_DEPENDENCIES, rows)
+    })
+
+@pytest.fixture
+def calculator():
+    return GamificationPricingCalculator()
+
+def test_price_category_accepts_unhashable_input(calculator):
+    assert calculator.estimate_tour_price_category(['fareharbor'], ['viator'], 'US')[0] == 'luxury'
+    assert calculator.estimate_tour_price_category('fareharbor', 'viator', 'US')[0] == 'luxury'
+
+def test_scorer_errors_surface_once(calculator, monkeypatch):
+    calls = []
+
+    def failing_scorer(booking_tech, ota_deps, country=None):
+        calls.append(booking_tech)
+        raise TypeError("scorer bug")
+
+    monkeypatch.setattr(calculator, 'score_tour_price_category', failing_scorer)
+    calculator.build_lookup_tables()
+    with pytest.raises(TypeError, match='scorer bug'):
+        calculator.estimate_tour_price_category('fareharbor', 'viator')
+    assert calls == ['fareharbor']
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_batch_value_propositions_match_per_row_path(calculator, seed):
+    prospects = random_prospects(seed)
+    batch = calculator.calculate_value_propositions(prospects)
+    
+    for index, row in prospects.iterrows():
+        vp = calculator.generate_value_proposition(row.to_dict())
+        got = batch.loc[index]
+        assert got['Price_Category'] == vp['price_category']
+        assert got['Tier_Name'] == vp['pricing']['tier_name']
+        assert got['Setup_Fee'] == vp['pricing']['setup_fee']
+        assert got['Monthly_Fee'] == vp['pricing']['monthly_fee']
+        assert got['Total_Year_1_Cost'] == vp['pricing']['total_year_1']
+        assert got['Profitable_Year_1'] == vp['roi_analysis']['break_even_year_1']
+        expected = [
+            vp['avg_tour_price'],
+            vp['gamification_value']['current_monthly_revenue'],
+            vp['gamification_value']['additional_monthly_revenue'],
+            vp['gamification_value']['additional_annual_revenue'],
+            vp['ota_analysis']['annual_commission_loss'],
+            vp['roi_analysis']['total_annual_benefit'],
+            vp['roi_analysis']['roi_percentage'],
+            vp['roi_analysis']['payback_months']
+        ]
+        columns = ['Avg_Tour_Price', 'Current_Monthly_Revenue', 'Additional_Monthly_Revenue',
+                   'Additional_Annual_Revenue', 'Annual_OTA_Loss', 'Total_Annual_Benefit',
+                   'ROI_Percentage', 'Payback_Months']
+        np.testing.assert_allclose(got[columns].to_numpy(dtype=float), expected, rtol=1e-9)
+
+def test_column_quantiles_match_numpy():
+    rng = np.random.default_rng(7)
+    values = rng.normal(size=(101, 6))
+    values[:, 1] = np.inf
+    values[::3, 2] = np.inf
+    values[::2, 3] = -np.inf
+    quantiles = np.array([0.05, 0.5, 0.95])
+    
+    got = column_quantiles(values, quantiles)
+    with np.errstate(invalid='ignore'):
+        expected = np.quantile(values, quantiles, axis=0)
+    finite = np.isfinite(expected)
+    np.testing.assert_allclose(got[finite], expected[finite])
+    # np.quantile gives NaN between equal infinite neighbours; column_quantiles keeps the infinity
+    assert np.isposinf(got[:, 1]).all()
+    assert not np.isnan(got).any()
+
+def test_simulate_roi_is_reproducible_and_block_independent(calculator):
+    prospects = random_prospects(3, rows=40)
+    prospects.loc[0, 'monthly_visits'] = 0  # No benefit at all: payback never arrives
+    
+    whole = calculator.simulate_roi(prospects, n_samples=500, seed=11)
+    blocked = calculator.simulate_roi(prospects, n_samples=500, seed=11, max_block_cells=1700)
+    pd.testing.assert_frame_equal(whole, blocked)
+    
+    assert list(whole.columns) == ['Company_Name', 'ROI_P5', 'ROI_P50', 'ROI_P95',
+                                   'Payback_P5', 'Payback_P50', 'Payback_P95', 'Prob_Profitable_Year_1']
+    assert np.isposinf(whole.loc[0, ['Payback_P5', 'Payback_P50', 'Payback_P95']].to_numpy(dtype=float)).all()
+    assert whole.loc[0, 'Prob_Profitable_Year_1'] == 0
+    assert not whole.drop(columns='Company_Name').isna().any().any()
+    assert (whole['ROI_P5'] <= whole['ROI_P50']).all() and (whole['ROI_P50'] <= whole['ROI_P95']).all()
+    
+    other_seed = calculator.simulate_roi(prospects, n_samples=500, seed=12)
+    assert not np.allclose(whole['ROI_P50'], other_seed['ROI_P50'])
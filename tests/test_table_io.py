@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from table_io import iter_table_chunks, read_table, write_table
+
+pytest.importorskip('pyarrow')
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'Company Name': ['Acme', 'Bravo', 'Charlie'],
+        'has_chatbot': ['True', 'False', None],
+        'answer': ['Yes', 'No', 'Yes'],
+        'pages_analyzed': [3, 1, 0]
+    })
+
+@pytest.mark.parametrize('extension', ['parquet', 'feather'])
+def test_booleans_stay_typed_by_default(tmp_path, frame, extension):
+    path = tmp_path / f'stage.{extension}'
+    write_table(frame, path)
+    loaded = read_table(path)
+    assert pd.api.types.is_bool_dtype(loaded['has_chatbot'])
+    assert loaded['has_chatbot'].tolist()[:2] == [True, False]
+    assert list(loaded['answer']) == ['Yes', 'No', 'Yes']
+    assert all(pd.api.types.is_bool_dtype(chunk['has_chatbot']) for chunk in iter_table_chunks(path, 2))
+
+def test_string_booleans_on_request(tmp_path, frame):
+    path = tmp_path / 'stage.parquet'
+    write_table(frame, path)
+    loaded = read_table(path, bool_as_str=True)
+    assert loaded['has_chatbot'].tolist()[:2] == ['True', 'False']
+    assert pd.isna(loaded.loc[2, 'has_chatbot'])
+    chunks = list(iter_table_chunks(path, 2, bool_as_str=True))
+    assert chunks[0]['has_chatbot'].tolist() == ['True', 'False']
+    assert pd.isna(chunks[1]['has_chatbot'].iloc[0])
+
+@pytest.mark.parametrize('extension', ['parquet', 'feather'])
+def test_csv_round_trip_through_typed_file_is_unchanged(tmp_path, extension):
+    source = tmp_path / 'source.csv'
+    source.write_text('yn,tf,lc,num,mixed,n\nYes,True,true,1,1,1\nNo,False,false,2.5,Error,2\n,,true,,,3\n')
+    direct, round_trip = tmp_path / 'direct.csv', tmp_path / 'round_trip.csv'
+    write_table(read_table(source), direct)
+
+    typed = tmp_path / f'stage.{extension}'
+    write_table(read_table(source), typed)
+    write_table(read_table(typed), round_trip)
+    assert round_trip.read_text() == direct.read_text()
@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from url_canonicalizer import (
+    canonical_site_key, find_url_column, group_rows_by_site, registered_domain, url_registered_domain
+)
+
+@pytest.mark.parametrize('host, expected', [
+    ('www.tours.acme.co.uk', 'acme.co.uk'),
+    ('acme.ne.jp', 'acme.ne.jp'),
+    ('shop.acme.or.kr', 'acme.or.kr'),
+    ('acme.gov.uk', 'acme.gov.uk'),
+    ('a.b.ac.at', 'b.ac.at'),
+    ('book.acme.com.au', 'acme.com.au'),
+    ('www.acme.com', 'acme.com'),
+    ('acme.travel', 'acme.travel'),
+    ('ACME.COM.', 'acme.com'),
+    ('127.0.0.1', '127.0.0.1'),
+    ('localhost', 'localhost'),
+])
+def test_registered_domain(host, expected):
+    assert registered_domain(host) == expected
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://www.acme.ne.jp/en/', 'acme.ne.jp'),
+    ('acme.com/tours', 'acme.com'),
+    ('', ''),
+    (None, ''),
+    ('http://[broken', ''),
+])
+def test_url_registered_domain(url, expected):
+    assert url_registered_domain(url) == expected
+
+def test_find_url_column_prefers_known_names():
+    df = pd.DataFrame(columns=['Company Name', 'linkedin', 'Website', 'URL'])
+    assert find_url_column(df) == 'Website'
+
+def test_find_url_column_partial_match_is_opt_in():
+    df = pd.DataFrame(columns=['Company Name', 'Homepage Website Link'])
+    assert find_url_column(df) is None
+    assert find_url_column(df, partial_match=True) == 'Homepage Website Link'
+
+@pytest.mark.parametrize('url, expected', [
+    ('http://www.Acme.com/?utm_source=x', 'acme.com'),
+    ('acme.com', 'acme.com'),
+    ('https://acme.com:443/', 'acme.com'),
+    ('http://acme.com:80', 'acme.com'),
+    ('https://acme.com:8443/', 'acme.com:8443'),
+    ('https://acme.com./tours/', 'acme.com/tours'),
+    ('https://acme.com//tours//index.html#top', 'acme.com/tours'),
+    ('https://acme.com/Index.PHP', 'acme.com'),
+    ('https://acme.com/?b=2&a=1&gclid=x&UTM_medium=y', 'acme.com?a=1&b=2'),
+    ('https://acme.com/?ref=partner', 'acme.com'),
+    ('  https://tours.acme.com/Kayak  ', 'tours.acme.com/Kayak'),
+    ('https://wwwacme.com', 'wwwacme.com'),
+    ('', None),
+    ('   ', None),
+    (None, None),
+    (float('nan'), None),
+    ('http://[broken', None),
+    ('https://acme.com:notaport/', None),
+    ('https://', None),
+])
+def test_canonical_site_key(url, expected):
+    assert canonical_site_key(url) == expected
+
+def test_group_rows_by_site_keeps_the_first_row_first():
+    urls = pd.Series(['https://acme.com', 'bravo.com', 'http://www.acme.com/', None, 'acme.com/?utm_campaign=x'],
+                     index=[10, 11, 12, 13, 14])
+    assert group_rows_by_site(urls) == {'acme.com': [10, 12, 14], 'bravo.com': [11]}
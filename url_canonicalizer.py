@@ -0,0 +1,134 @@
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import pandas as pd
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {
+    'gclid', 'fbclid', 'msclkid', 'dclid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref', 'referrer'
+}
+
+# Paths that serve the same page as the directory they live in
+INDEX_PAGES = ('index.html', 'index.htm', 'index.php', 'default.aspx')
+
+# Second-level labels under which registrations happen one level deeper
+# (acme.co.uk, acme.com.au, acme.ne.jp, acme.or.kr, acme.gov.uk, acme.ac.at)
+SECOND_LEVEL_LABELS = {
+    'co', 'com', 'net', 'org', 'gov', 'ac', 'edu', 'or', 'ne', 'go', 'gob', 'mil', 'sch', 'nic', 'ltd', 'plc'
+}
+
+def registered_domain(host):
+    """Best-effort registrable domain of a hostname: www.tours.acme.co.uk -> acme.co.uk.
+
+    Any two-letter country code under one of SECOND_LEVEL_LABELS keeps a third
+    label, so companies under a shared suffix (alpine.ne.jp, sakura.ne.jp)
+    never reduce to the suffix itself. IP addresses are returned unchanged.
+    """
+    labels = (host or '').lower().rstrip('.').split('.')
+    if all(label.isdigit() for label in labels):
+        return '.'.join(labels)
+    if len(labels) >= 3 and labels[-2] in SECOND_LEVEL_LABELS and len(labels[-1]) == 2:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+def url_registered_domain(url):
+    """Registrable domain of a URL or bare domain ('' when there is none)."""
+    if url is None or pd.isna(url) or not str(url).strip():
+        return ''
+    url = str(url).strip()
+    if '://' not in url:
+        url = 'http://' + url
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return ''
+    return registered_domain(host) if host else ''
+
+def canonical_site_key(url):
+    """Canonical form of a URL used to spot rows that point at the same site.
+
+    Scheme, 'www.', default ports, fragments, tracking parameters, index pages
+    and trailing slashes are ignored; the remaining query is sorted.
+    http://www.Acme.com/?utm_source=x and acme.com both become 'acme.com'.
+    """
+    if url is None or pd.isna(url):
+        return None
+    url = str(url).strip()
+    if not url:
+        return None
+    if '://' not in url:
+        url = 'https://' + url
+
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or '').rstrip('.')
+        port = parts.port
+    except ValueError:
+        return None
+
+    if not host:
+        return None
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    path = '/'.join(segment for segment in parts.path.split('/') if segment)
+    if path.lower().endswith(INDEX_PAGES):
+        path = path.rsplit('/', 1)[0] if '/' in path else ''
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ]
+
+    key = host
+    if path:
+        key += '/' + path
+    if query:
+        key += '?' + urlencode(sorted(query))
+    return key
+
+def group_rows_by_site(urls):
+    """Group row indices by canonical site.
+
+    Args:
+        urls (pd.Series): URL per row, indexed like the dataframe
+
+    Returns:
+        dict: canonical key -> list of row indices (first index is the one to crawl)
+    """
+    groups = {}
+    for index, url in urls.items():
+        key = canonical_site_key(url)
+        if key:
+            groups.setdefault(key, []).append(index)
+    return groups
+
+# Column names that hold a company's website, in order of preference
+URL_COLUMN_CANDIDATES = [
+    'Website URL', 'website url', 'url', 'domain', 'website', 'company_url', 'site', 'Website', 'URL', 'Domain',
+    'Website Url', 'website_url', 'Company Website', 'Site URL', 'company website', 'Company URL'
+]
+URL_COLUMN_KEYWORDS = ('url', 'website', 'site', 'domain')
+
+def find_url_column(df, partial_match=False):
+    """
+    Find the website URL column in a dataframe
+
+    Args:
+        df (pd.DataFrame): Table to inspect
+        partial_match (bool): Fall back to the first column whose name contains
+            'url', 'website', 'site' or 'domain'
+
+    Returns:
+        str: Column name, or None if there isn't one
+    """
+    for col in URL_COLUMN_CANDIDATES:
+        if col in df.columns:
+            return col
+    if partial_match:
+        for col in df.columns:
+            if any(keyword in str(col).lower() for keyword in URL_COLUMN_KEYWORDS):
+                return col
+    return None